@@ -0,0 +1,296 @@
+"""
+Reproducible benchmarks for the Game of Life engines, rendering and cycle detection.
+
+Run from the repository root:
+
+    $ python3 -m benchmarks.benchmark_game run --output benchmarks/results.json
+    $ python3 -m benchmarks.benchmark_game compare benchmarks/baseline.json benchmarks/results.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Any, Callable, Optional
+
+import game
+
+BENCHMARK_SEED = 1234
+DEFAULT_SIZES = ((32, 32), (128, 128), (512, 512))
+QUICK_SIZES = ((32, 32), (64, 64))
+DEFAULT_DENSITIES = (0.1, 0.5)
+DEFAULT_REPEATS = 3
+DEFAULT_REGRESSION_THRESHOLD = 0.1
+RESULT_KEY_FIELDS = ('name', 'engine', 'rows', 'cols', 'density')
+
+
+def seeded_grid(num_rows: int, num_cols: int, density: float) -> list[list[int]]:
+    """Create a reproducible list-of-lists grid with the given fill probability."""
+    generator = random.Random(BENCHMARK_SEED)
+    return [
+        [1 if generator.random() < density else 0 for _ in range(num_cols)]
+        for _ in range(num_rows)
+    ]
+
+
+def engine_grids_from_rows(engine_name: str, grid: list[list[int]]) -> tuple[Any, Any]:
+    """Convert a list-of-lists grid into an engine's current and future grids."""
+    num_rows, num_cols = len(grid), len(grid[0])
+    empty_grid = [[0] * num_cols for _ in range(num_rows)]
+    if engine_name == 'numpy':
+        current_grid = game.np.array(grid, dtype=game.np.uint8)
+        return current_grid, game.np.zeros_like(current_grid)
+    if engine_name == 'bitboard':
+        return game.bitboard_from_rows(grid), game.bitboard_from_rows(empty_grid)
+    if engine_name in ('sparse', 'sparse-unbounded'):
+        wrap = engine_name == 'sparse'
+        return game.sparse_from_rows(grid, wrap), game.sparse_from_rows(empty_grid, wrap)
+    if engine_name == 'flat':
+        return game.flat_from_rows(grid), game.flat_from_rows(empty_grid)
+    if engine_name == 'active':
+        return game.ActiveGrid([row[:] for row in grid]), game.ActiveGrid(empty_grid)
+    if engine_name == 'parallel':
+        return game.shared_from_rows(grid), game.shared_from_rows(empty_grid)
+    return [row[:] for row in grid], empty_grid
+
+
+def time_call(function: Callable[[], Any], repeats: int) -> dict[str, float]:
+    """Time `repeats` calls of a function and return the best and median seconds per call."""
+    timings = []
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started_at)
+    return {'seconds': min(timings), 'median_seconds': statistics.median(timings)}
+
+
+def benchmark_state_transition(
+    engine_name: str, grid: list[list[int]], repeats: int
+) -> dict[str, float]:
+    """Time one generation of an engine, swapping its grids between calls."""
+    engine = game.ENGINES[engine_name]
+    grids = list(engine_grids_from_rows(engine_name, grid))
+
+    def step() -> None:
+        engine.state_transition(grids[0], grids[1])
+        grids.reverse()
+
+    try:
+        return time_call(step, repeats)
+    finally:
+        game.release_grids(engine, *grids)
+
+
+def benchmark_cycle_detection(
+    engine_name: str, grid: list[list[int]], repeats: int
+) -> dict[str, dict[str, float]]:
+    """ Time starting an engine's cycle search, and adding a changed generation to it.
+
+    The timed generation is the second one of the search, so it shows the per-generation cost of
+    the check rather than the cost of moving the checkpoint, which the first one always does.
+    """
+    engine = game.ENGINES[engine_name]
+    grids = engine_grids_from_rows(engine_name, grid)
+    activities = (
+        game.engine_activity(engine, grids[0]),
+        engine.state_transition(grids[0], grids[1]),
+    )
+    cycle_detector = game.CycleDetector()
+
+    def add_generation() -> None:
+        game.is_engine_cycle(cycle_detector, engine, grids[0], activities[0])
+
+    try:
+        timings = {'reset_engine_cycle_search': time_call(
+            lambda: game.reset_engine_cycle_search(cycle_detector, engine, grids[0]),
+            repeats,
+        )}
+        check_timings = []
+        for _ in range(repeats):
+            game.reset_engine_cycle_search(cycle_detector, engine, grids[0])
+            game.is_engine_cycle(cycle_detector, engine, grids[1], activities[1])
+            check_timings.append(time_call(add_generation, 1)['seconds'])
+        timings['is_engine_cycle'] = {
+            'seconds': min(check_timings),
+            'median_seconds': statistics.median(check_timings),
+        }
+        return timings
+    finally:
+        game.release_grids(engine, *grids)
+
+
+def available_engines() -> list[str]:
+    """List the engines that can run here, leaving out NumPy when it is not installed."""
+    return [name for name in sorted(game.ENGINES) if name != 'numpy' or game.np is not None]
+
+
+def run_benchmarks(
+    sizes: tuple[tuple[int, int], ...] = DEFAULT_SIZES,
+    densities: tuple[float, ...] = DEFAULT_DENSITIES,
+    engines: Optional[list[str]] = None,
+    repeats: int = DEFAULT_REPEATS,
+) -> dict[str, Any]:
+    """ Run every benchmark over the matrix of grid sizes and densities.
+
+    Args:
+        sizes (tuple): (rows, cols) grid sizes.
+        densities (tuple): Fill probabilities of the benchmark grids.
+        engines (list): Engine names whose `state_transition` and cycle search are timed,
+            defaulting to all.
+        repeats (int): Timed calls per benchmark.
+
+    Returns:
+        dict: Run metadata and one result per benchmark, size, density and engine.
+
+    """
+    engines = available_engines() if engines is None else engines
+    results = []
+
+    def add_result(name: str, engine: Optional[str], num_rows: int, num_cols: int,
+                   density: Optional[float], timing: dict[str, float]) -> None:
+        results.append(dict({
+            'name': name,
+            'engine': engine,
+            'rows': num_rows,
+            'cols': num_cols,
+            'density': density,
+            'repeats': repeats,
+        }, **timing))
+
+    for num_rows, num_cols in sizes:
+        random.seed(BENCHMARK_SEED)
+        add_result('rand_init_grid', None, num_rows, num_cols, None, time_call(
+            lambda: game.rand_init_grid(num_rows, num_cols),
+            repeats,
+        ))
+        for density in densities:
+            grid = seeded_grid(num_rows, num_cols, density)
+            for engine_name in engines:
+                add_result('state_transition', engine_name, num_rows, num_cols, density,
+                           benchmark_state_transition(engine_name, grid, repeats))
+                cycle_timings = benchmark_cycle_detection(engine_name, grid, repeats)
+                for name, timing in cycle_timings.items():
+                    add_result(name, engine_name, num_rows, num_cols, density, timing)
+            add_result('print_grid', None, num_rows, num_cols, density, time_call(
+                lambda: game.print_grid(grid),
+                repeats,
+            ))
+
+    return {
+        'metadata': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': BENCHMARK_SEED,
+            'repeats': repeats,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def result_key(result: dict[str, Any]) -> tuple[Any, ...]:
+    """Identify a benchmark result independently of its timings."""
+    return tuple(result[field] for field in RESULT_KEY_FIELDS)
+
+
+def compare_results(
+    baseline: dict[str, Any],
+    current: dict[str, Any],
+    threshold: float = DEFAULT_REGRESSION_THRESHOLD,
+) -> list[dict[str, Any]]:
+    """ Compare the best timings of two runs.
+
+    Args:
+        baseline (dict): A saved benchmark run.
+        current (dict): The benchmark run to check.
+        threshold (float): The slowdown fraction above which a result is a regression.
+
+    Returns:
+        list: One comparison per benchmark present in both runs, with its timing ratio and
+            whether it regressed.
+
+    """
+    baseline_results = {result_key(result): result for result in baseline['results']}
+    comparisons = []
+    for result in current['results']:
+        baseline_result = baseline_results.get(result_key(result))
+        if baseline_result is None:
+            continue
+        baseline_seconds = baseline_result['seconds']
+        ratio = result['seconds'] / baseline_seconds if baseline_seconds else 1.0
+        comparisons.append(dict(
+            zip(RESULT_KEY_FIELDS, result_key(result)),
+            baseline_seconds=baseline_seconds,
+            seconds=result['seconds'],
+            ratio=ratio,
+            regression=ratio > 1 + threshold,
+        ))
+    return comparisons
+
+
+def parse_sizes(sizes: str) -> tuple[tuple[int, int], ...]:
+    """Parse grid sizes written as ROWSxCOLS, separated by commas."""
+    return tuple(
+        (int(rows), int(cols))
+        for rows, cols in (size.lower().split('x') for size in sizes.split(','))
+    )
+
+
+def parse_densities(densities: str) -> tuple[float, ...]:
+    """Parse fill probabilities separated by commas."""
+    return tuple(float(density) for density in densities.split(','))
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Run the benchmark or comparison command and return the process exit status."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help='run the benchmarks and write JSON results')
+    run_parser.add_argument('--output', default='-')
+    run_parser.add_argument('--sizes', type=parse_sizes)
+    run_parser.add_argument('--densities', type=parse_densities, default=DEFAULT_DENSITIES)
+    run_parser.add_argument('--engines', type=lambda engines: engines.split(','))
+    run_parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS)
+    run_parser.add_argument('--quick', action='store_true')
+    compare_parser = commands.add_parser('compare', help='flag regressions against a baseline')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD)
+    arguments = parser.parse_args(argv)
+
+    if arguments.command == 'run':
+        sizes = arguments.sizes or (QUICK_SIZES if arguments.quick else DEFAULT_SIZES)
+        results = run_benchmarks(sizes, arguments.densities, arguments.engines, arguments.repeats)
+        if arguments.output == '-':
+            json.dump(results, sys.stdout, indent=2)
+            sys.stdout.write('\n')
+        else:
+            with open(arguments.output, 'w') as output_file:
+                json.dump(results, output_file, indent=2)
+        return 0
+
+    with open(arguments.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    with open(arguments.current) as current_file:
+        current = json.load(current_file)
+    comparisons = compare_results(baseline, current, arguments.threshold)
+    for comparison in comparisons:
+        print('{:<4} {:<18} {:<16} {:>5}x{:<5} density={:<5} {:.6f}s -> {:.6f}s ({:.2f}x)'.format(
+            'FAIL' if comparison['regression'] else 'ok',
+            comparison['name'],
+            comparison['engine'] or '-',
+            comparison['rows'],
+            comparison['cols'],
+            '-' if comparison['density'] is None else comparison['density'],
+            comparison['baseline_seconds'],
+            comparison['seconds'],
+            comparison['ratio'],
+        ))
+    return 1 if any(comparison['regression'] for comparison in comparisons) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,26 +7,67 @@ import random
 import sys
 import time
 import argparse
+import atexit
+import bisect
+import csv
 import curses
+import functools
+import itertools
+import json
+import mmap
+import multiprocessing
+import operator
 import os
-import subprocess
+import queue
+import re
+import resource
+import shutil
+import struct
+import threading
 import traceback
-from collections import deque
+import zlib
+from array import array
+from dataclasses import dataclass, field
+from collections import Counter, deque
 from curses import wrapper
+from multiprocessing import shared_memory
 import locale
-from typing import Deque, Optional, Union
+from typing import (
+    Any, Callable, Deque, Hashable, Iterable, Iterator, NamedTuple, Optional, Sequence, Union,
+)
 
 try:
     range_compat = xrange
 except NameError:
     range_compat = range
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 locale.setlocale(locale.LC_ALL, '')
 locale.getpreferredencoding()
 
 ESC_KEY = 27
 ESC_DELAY_MS = 1
 EXIT_KEYS = (ord('q'), ord('Q'), ESC_KEY)
+SAVE_KEYS = (ord('s'), ord('S'))
+PAN_KEYS = {
+    curses.KEY_UP: (-1, 0),
+    curses.KEY_DOWN: (1, 0),
+    curses.KEY_LEFT: (0, -1),
+    curses.KEY_RIGHT: (0, 1),
+}
+ZOOM_IN_KEYS = (ord('+'), ord('='))
+ZOOM_OUT_KEYS = (ord('-'), ord('_'))
+SPEED_KEYS = {ord('1'): 1, ord('2'): 10, ord('3'): 100, ord('4'): 1000}
+PAUSE_KEYS = (ord(' '), ord('p'), ord('P'))
+SINGLE_STEP_KEYS = (ord('n'), ord('N'))
+# Each arrow key press moves the viewport by this fraction of its span.
+PAN_STEP_FRACTION = 4
+STATUS_LINE_ROWS = 1
+RATE_WINDOW_SECONDS = 1.0
 DEFAULT_FOREGROUND_COLOR = 'green'
 DEFAULT_BACKGROUND_COLOR = 'black'
 COLOR_NAME_TO_CURSES = {
@@ -42,14 +83,406 @@ COLOR_NAME_TO_CURSES = {
 MAX_EXTENDED_COLOR = 255
 RESTART_DELAY_SECONDS = 1
 MEMORY_LOG_INTERVAL_SECONDS = 1
-MAX_TRACKED_STATES = 5
+STATM_PATH = '/proc/self/statm'
+PHASES = ('transition', 'cycle_check', 'render', 'input')
+PHASE_TIMING_WINDOW = 1024
+PHASE_PERCENTILES = (50, 95, 99)
+PHASE_TIMING_LOG_INTERVAL_SECONDS = 10
+DEBUG_LOG_FLUSH_BYTES = 64 * 1024
+DEBUG_LOG_FLUSH_INTERVAL_SECONDS = 0.5
+DEBUG_LOG_MAX_BYTES = 10 * 1024 * 1024
+DEBUG_LOG_BACKUP_COUNT = 3
+DEBUG_LOG_DRAIN_TIMEOUT_SECONDS = 5
+ZOBRIST_SEED = 0x5EED
+HASHLIFE_MAX_NODES = 1000000
+ACTIVE_REGION_FULL_SWEEP_FRACTION = 0.2
+ACTIVITY_BAND_ROWS = 256
+PARALLEL_BANDS_PER_WORKER = 4
+PARALLEL_SPEEDUP_GENERATIONS = 20
+PARALLEL_SPEEDUP_DEFAULT_SIZE = 1000
+FULL_REPAINT_INTERVAL_FRAMES = 300
+DIFF_RUN_MERGE_GAP = 2
+DEFAULT_RENDERER = 'diff'
+RENDERERS = ('diff', 'full')
+DEFAULT_OUTPUT = 'curses'
+OUTPUTS = ('ansi', 'curses')
+ANSI_SKIP_MIN_COLUMNS = 8
+HEADLESS_DEFAULT_ROWS = 256
+HEADLESS_DEFAULT_COLS = 256
+HEADLESS_DEFAULT_STEPS = 1000
+SOUP_DEFAULT_ROWS = 64
+SOUP_DEFAULT_COLS = 64
+SOUP_DEFAULT_GENERATIONS = 10000
+SOUP_DEFAULT_COUNT = 1000
+SOUP_CHUNK_SIZE = 8
+DEFAULT_SOUP_RESULTS_PATH = 'soups.jsonl'
+SOUP_RESULT_FIELDS = ('seed', 'lifespan', 'period', 'population')
+ANSI_START_SEQUENCE = b'\x1b[?25l\x1b[2J'
+ANSI_END_SEQUENCE = b'\x1b[0m\x1b[?25h\n'
 DEBUG_LOG_PATH = os.path.join(os.path.dirname(__file__), 'game_debug.log')
+DEFAULT_CHECKPOINT_PATH = 'game_checkpoint.bin'
+CHECKPOINT_MAGIC = b'GOLCKPT\x00'
+CHECKPOINT_VERSION = 2
+# magic, version, has_seed, has_cycle_checkpoint, rows, cols, generation, seed, Brent power and
+# steps; the packed grid and cycle checkpoint grid follow.
+CHECKPOINT_HEADER = struct.Struct('<8sHBBQQQqQQ')
+CHECKPOINT_SEED_RANGE = range(-2 ** 63, 2 ** 63)
+RECORDING_MAGIC = b'GOLREC\x00\x00'
+RECORDING_VERSION = 1
+RECORDING_KEYFRAME_INTERVAL = 256
+RECORDING_COMPRESSION_LEVEL = 1
+# magic, version, rows, cols and keyframe interval.
+RECORDING_HEADER = struct.Struct('<8sHQQI')
+# frame kind and compressed payload length.
+RECORDING_FRAME = struct.Struct('<BI')
+RECORDING_KEYFRAME = 0
+RECORDING_DELTA = 1
+RECORDING_INDEX = 2
+# generation and file offset of a keyframe.
+RECORDING_INDEX_ENTRY = struct.Struct('<QQ')
+# file offset of the index record, frame count, and the magic again to mark a clean close.
+RECORDING_TRAILER = struct.Struct('<QQ8s')
+DEFAULT_ENGINE = 'list'
+DEFAULT_DENSITY = 0.5
+DEFAULT_RULE = 'B3/S23'
+RULE_PATTERN = re.compile(r'B([0-8]*)/S([0-8]*)', re.IGNORECASE)
+DENSITY_BITS = 16
+RLE_TOKEN_PATTERN = re.compile(r'\d+|\S')
 ColorValue = Union[int, str]
 StateSignature = tuple[tuple[int, ...], ...]
+BIT_CHARACTER_TO_CELL = bytes.maketrans(b'01', b'\x00\x01')
+CELL_TO_BIT_CHARACTER = bytes.maketrans(b'\x00\x01', b'01')
+NEIGHBOR_OFFSETS = (
+    (-1, -1), (-1, 0), (-1, 1),
+    (0, -1), (0, 1),
+    (1, -1), (1, 0), (1, 1),
+)
+CELL_GLYPHS = (b' ', u'\u2584'.encode('UTF-8'))
+HALF_BLOCK_GLYPHS = (
+    b' ',
+    u'\u2580'.encode('UTF-8'),
+    u'\u2584'.encode('UTF-8'),
+    u'\u2588'.encode('UTF-8'),
+)
+# Zoomed-out cells are shaded by the fraction of live cells in their block, rounded up.
+DENSITY_GLYPHS = (
+    b' ',
+    u'\u2591'.encode('UTF-8'),
+    u'\u2592'.encode('UTF-8'),
+    u'\u2593'.encode('UTF-8'),
+    u'\u2588'.encode('UTF-8'),
+)
+TILE_POOLS: dict[int, Any] = {}
+HASHLIFE_UNIVERSES: dict['Rule', 'HashLife'] = {}
+ATTACHED_SHARED_MEMORY: dict[str, shared_memory.SharedMemory] = {}
+
+
+class Rule(NamedTuple):
+    """A life-like rule in B/S notation, compiled into lookup tables.
+
+    `neighbor_table` maps `9 * alive + live neighbor count` to the next state of a cell.
+    `lane_table` maps a byte lane value, the cell's 3x3 block sum plus 16 when it is alive, to the
+    next state of the cell. The block sum tuples split the 3x3 block sums, the cell included, that
+    give a live cell into those that do so whatever the cell's state, only for a dead cell, and
+    only for a live cell, for engines that test them with equality masks.
+    """
+
+    birth: frozenset[int]
+    survival: frozenset[int]
+    neighbor_table: bytes
+    lane_table: bytes
+    either_block_sums: tuple[int, ...]
+    birth_block_sums: tuple[int, ...]
+    survival_block_sums: tuple[int, ...]
+
+
+class Activity(NamedTuple):
+    """A generation's live cells, births and deaths, and the bounding box of its live cells.
+
+    The box spans rows `top` to `bottom` and columns `left` to `right`, ends exclusive, and is
+    empty (all zeros) when nothing is alive.
+    """
+
+    population: int
+    births: int
+    deaths: int
+    top: int = 0
+    left: int = 0
+    bottom: int = 0
+    right: int = 0
+
+
+class BitboardGrid(NamedTuple):
+    """A grid stored as one Python int per row, with bit `col` holding column `col`."""
+
+    num_cols: int
+    rows: list[int]
+
+
+class SparseGrid(NamedTuple):
+    """A grid stored as the set of (row, col) coordinates of its live cells.
+
+    `num_rows` and `num_cols` are the wrap-around size when `wrap` is set, and otherwise only the
+    window that is rendered from an unbounded universe.
+    """
+
+    num_rows: int
+    num_cols: int
+    cells: set[tuple[int, int]]
+    wrap: bool = True
+
+
+@dataclass
+class ActiveGrid:
+    """A list-of-lists grid with the cells that changed to produce it.
+
+    `changed_cells` is None when the changes are unknown, such as for a fresh random grid.
+    `row_counts` and `col_counts` hold the live cells per row and column, which keep `activity`
+    up to date from the changed cells alone.
+    """
+
+    cells: list[list[int]]
+    changed_cells: Optional[set[tuple[int, int]]] = None
+    evaluated_count: int = 0
+    activity: Optional[Activity] = None
+    row_counts: Optional[list[int]] = None
+    col_counts: Optional[list[int]] = None
+
+
+class SharedGrid(NamedTuple):
+    """A grid of one 0/1 byte per cell in shared memory, transitioned in bands of rows."""
+
+    num_rows: int
+    num_cols: int
+    memory: shared_memory.SharedMemory
+    workers: int
+    tile_rows: int
+
+
+class FlatGrid(NamedTuple):
+    """A grid stored as one 0/1 byte per cell in a single row-major bytearray.
+
+    Row `row` starts at offset `(row + padding) * stride + padding`. With a padding of 1, a ring
+    of cells around the grid mirrors its opposite edges, so every neighbor of a cell is at a fixed
+    offset and toroidal lookups need no wrapping.
+    """
+
+    num_rows: int
+    num_cols: int
+    stride: int
+    padding: int
+    cells: bytearray
+
+
+@dataclass
+class FrameState:
+    """The last frame drawn by `draw_frame`, and what drawing it wrote."""
+
+    previous_rows: Optional[list[list[int]]] = None
+    frames_since_repaint: int = 0
+    cells_written: int = 0
+    bytes_written: int = 0
+
+
+class GridWindow(NamedTuple):
+    """The rows `top` to `bottom` and columns `left` to `right` of a grid, ends exclusive."""
+
+    top: int
+    left: int
+    bottom: int
+    right: int
+
+
+@dataclass
+class Viewport:
+    """The part of the universe drawn in `screen_rows` by `screen_cols` characters of the screen.
+
+    `top` and `left` are the universe cell in the top-left corner. At a `zoom` of N above 1, each
+    character summarizes an NxN block of cells with a density glyph.
+    """
+
+    screen_rows: int
+    screen_cols: int
+    half_block: bool = False
+    top: int = 0
+    left: int = 0
+    zoom: int = 1
+
+
+@dataclass
+class FrameBuffer:
+    """The newest generation handed from the simulation thread to the render loop.
+
+    The render loop sets `wanted` when it takes a frame, and the simulation hands over fresh rows
+    of the next generation it finishes in `rows`. Only the frame being drawn and the one waiting
+    here exist at once; the generations in between are never converted. The render loop asks for
+    the part of the universe in view with `window`, and `frame_window` is the part `rows` holds,
+    or None for the whole universe.
+    """
+
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    rows: Optional[list[list[int]]] = None
+    generation: int = 0
+    activity: Optional[Activity] = None
+    wanted: bool = True
+    window: Optional[GridWindow] = None
+    frame_window: Optional[GridWindow] = None
+
+
+@dataclass
+class CycleDetector:
+    """Brent's cycle search, over engine signatures or a Zobrist hash of list-of-lists rows.
+
+    Only the checkpoint state is stored. It moves to the current state whenever `steps` reaches
+    `power`, which then doubles, so a cycle of any period is found once the checkpoint is on it.
+    The engine search keeps the checkpoint grid bit-packed in `checkpoint_packed` for saving.
+    The Zobrist search, used for engines without a signature, keeps its hash up to date from the
+    cells that changed since `previous_rows`, and `previous_activity`, when known, bounds the rows
+    compared. The checkpoint is compared in full only when `checkpoint_hash` matches.
+    """
+
+    keys: tuple[array, ...] = ()
+    previous_rows: Optional[list[list[int]]] = None
+    previous_activity: Optional[Activity] = None
+    state_hash: int = 0
+    checkpoint: Optional[Hashable] = None
+    checkpoint_packed: Optional[bytes] = None
+    checkpoint_hash: int = 0
+    power: int = 1
+    steps: int = 0
+    period: int = 0
+
+    @property
+    def tracked_state_count(self) -> int:
+        """The number of grids held for confirming cycles."""
+        return 0 if self.checkpoint is None else 1
+
+
+@dataclass
+class PhaseTimings:
+    """Rolling windows of the most recent per-generation phase durations, in nanoseconds."""
+
+    samples: dict[str, Deque[int]] = field(default_factory=lambda: {
+        phase: deque(maxlen=PHASE_TIMING_WINDOW) for phase in PHASES
+    })
+
+
+class SoupTask(NamedTuple):
+    """One random soup for a soup search worker to run until it settles."""
+
+    seed: int
+    num_rows: int
+    num_cols: int
+    max_generations: int
+    engine: 'Engine'
+
+
+class CheckpointHeader(NamedTuple):
+    """The fixed-size header of a checkpoint file, ahead of its bit-packed grids."""
+
+    num_rows: int
+    num_cols: int
+    generation: int
+    seed: Optional[int]
+    power: int
+    steps: int
+    has_cycle_checkpoint: bool
+
+
+class Engine(NamedTuple):
+    """The grid constructor, transition and row view used by one simulation backend.
+
+    `stats`, when set, returns engine-specific counters for a grid that are added to the debug log.
+    `release`, when set, frees the resources of a grid that is no longer used.
+    `from_cells`, when set, builds a grid of a given size from (row, col) live cells, wrapping cells
+    that fall outside it. Patterns are loaded into list-of-lists grids for engines without one.
+    `to_packed` and `from_packed`, when set, convert a grid to and from rows of one bit per cell,
+    least significant bit first, without going through list-of-lists rows.
+    `signature`, when set, returns a hashable value that is equal for equal grid states, cheaper
+    to compute than the signature of `to_rows`, for cycle checks during `step_generations`.
+    `refill`, when set, refills a current and a future grid in place with a fresh random state,
+    so that a restart reuses the grids instead of making new ones.
+    `window_rows`, when set, converts only the cells of a grid inside a window to rows, for
+    drawing part of a large universe.
+    `step`, when set, writes the state of a current grid a number of generations ahead into a
+    future grid in one jump, so that `step_generations` need not visit every generation.
+    """
+
+    make_grids: Callable[[int, int], tuple[Any, Any]]
+    state_transition: Callable[..., None]
+    to_rows: Callable[[Any], list[list[int]]]
+    stats: Optional[Callable[[Any], dict[str, int]]] = None
+    release: Optional[Callable[[Any], None]] = None
+    from_cells: Optional[Callable[[int, int, Iterable[tuple[int, int]]], Any]] = None
+    to_packed: Optional[Callable[[Any], bytes]] = None
+    from_packed: Optional[Callable[[int, int, Any], Any]] = None
+    signature: Optional[Callable[[Any], Hashable]] = None
+    refill: Optional[Callable[[Any, Any], None]] = None
+    window_rows: Optional[Callable[[Any, int, int, int, int], list[list[int]]]] = None
+    step: Optional[Callable[[Any, Any, int], None]] = None
+
+
+def random_bits(num_bits: int, density: float = DEFAULT_DENSITY) -> int:
+    """ Return a random int whose low `num_bits` bits are each set with probability `density`.
+
+    The density is rounded to DENSITY_BITS binary digits. Working from the lowest digit up, each
+    fresh word of random bits is ORed in for a 1 digit and ANDed in for a 0 digit, which halves
+    the probability and then adds the digit. A density of 0.5 costs a single `getrandbits` call.
+
+    Args:
+        num_bits (int): Number of random bits.
+        density (float): Probability that each bit is set.
+
+    Returns:
+        int: The random bits.
+
+    """
+    scaled_density = round(density * (1 << DENSITY_BITS))
+    if num_bits <= 0 or scaled_density <= 0:
+        return 0
+    if scaled_density >= 1 << DENSITY_BITS:
+        return (1 << num_bits) - 1
+    digit_count = DENSITY_BITS
+    while not scaled_density & 1:
+        scaled_density >>= 1
+        digit_count -= 1
+    bits = 0
+    for _ in range_compat(digit_count):
+        if scaled_density & 1:
+            bits |= random.getrandbits(num_bits)
+        else:
+            bits &= random.getrandbits(num_bits)
+        scaled_density >>= 1
+    return bits
+
+
+def random_bit_rows(
+    num_rows: int, num_cols: int, density: float = DEFAULT_DENSITY, with_border: bool = False
+) -> list[int]:
+    """Return random rows as ints, bit `col` holding column `col`, optionally with dead edges."""
+    if not with_border:
+        return [random_bits(num_cols, density) for _ in range_compat(num_rows)]
+    interior_mask = ((1 << num_cols) - 1) & ~1 & ~(1 << num_cols - 1) if num_cols else 0
+    return [
+        random_bits(num_cols, density) & interior_mask if 0 < row_num < num_rows - 1 else 0
+        for row_num in range_compat(num_rows)
+    ]
+
+
+def bits_to_cells(bits: int, num_cols: int) -> list[int]:
+    """Unpack the low `num_cols` bits of an int into a row of 0s and 1s, column 0 first."""
+    if num_cols == 0:
+        return []
+    return list(format(bits, '0{}b'.format(num_cols))[::-1].encode('ascii').translate(
+        BIT_CHARACTER_TO_CELL
+    ))
 
 
 def rand_init_grid(
-    num_rows: int, num_cols: int, with_border: bool = False
+    num_rows: int,
+    num_cols: int,
+    with_border: bool = False,
+    density: float = DEFAULT_DENSITY,
 ) -> list[list[int]]:
     """ Initialize a grid randomly with 0s and 1s.
 
@@ -57,27 +490,25 @@ def rand_init_grid(
         num_rows (int): Number of rows in the grid.
         num_cols (int): Number of columns in the grid.
         with_border (bool): Whether to border the grid with 0s.
+        density (float): Probability that each cell starts alive.
 
     Returns:
         list: A 2-D grid represented by a list of lists.
 
     """
     num_rows, num_cols = int(num_rows), int(num_cols)
-    if with_border:
-        return [[
-            random.randint(0, 1) if col_index > 0 and col_index < num_cols - 1 else 0
-            for col_index in range_compat(num_cols)
-        ] if row_index > 0 and row_index < num_rows - 1 else [0] * num_cols
-            for row_index in range_compat(num_rows)]
-    return [[random.randint(0, 1) for _ in range_compat(num_cols)] for _ in range_compat(num_rows)]
+    return [
+        bits_to_cells(row, num_cols)
+        for row in random_bit_rows(num_rows, num_cols, density, with_border)
+    ]
 
 def print_grid(
-    grid: list[list[int]], symbol_live: str = u'\u2584', symbol_dead: str = ' '
+    grid: Union[list[list[int]], FlatGrid], symbol_live: str = u'\u2584', symbol_dead: str = ' '
 ) -> bytes:
     """ Create a string byte representation of the grid.
 
     Args:
-        grid (list): A 2-d grid represented by a list of lists.
+        grid (list): A 2-d grid represented by a list of lists, or a flat grid.
         symbol_live(str): The symbol used to represent live cells.
         symbol_dead(str): The symbol used to represent dead cells.
 
@@ -85,47 +516,593 @@ def print_grid(
         bytes: A string of bytes representing the grid.
 
     """
+    rows = flat_rows(grid) if isinstance(grid, FlatGrid) else grid
     return b'\n'.join([b' '.join([
         symbol_live.encode('UTF-8') if cell else symbol_dead.encode('UTF-8')
         for cell in row
-    ]) for row in grid])
+    ]) for row in rows])
+
+
+def half_block_rows(grid: list[list[int]]) -> list[list[int]]:
+    """ Pair up grid rows into half-block display rows.
+
+    Args:
+        grid (list): A 2-d grid represented by a list of lists.
+
+    Returns:
+        list: One display row per two grid rows, where each cell is the upper grid cell plus
+            twice the lower one, an index into `HALF_BLOCK_GLYPHS`.
+
+    """
+    display_rows = []
+    for row_num in range_compat(0, len(grid), 2):
+        upper_row = grid[row_num]
+        lower_row = grid[row_num + 1] if row_num + 1 < len(grid) else [0] * len(upper_row)
+        display_rows.append([upper + 2 * lower for upper, lower in zip(upper_row, lower_row)])
+    return display_rows
+
+
+def print_grid_half_block(grid: list[list[int]]) -> bytes:
+    """ Create a byte representation of the grid with two rows per line and no column spacing.
+
+    Args:
+        grid (list): A 2-d grid represented by a list of lists.
+
+    Returns:
+        bytes: A string of bytes representing the grid.
+
+    """
+    return b'\n'.join([
+        b''.join([HALF_BLOCK_GLYPHS[cell] for cell in row]) for row in half_block_rows(grid)
+    ])
+
+
+def changed_runs(
+    previous_row: list[int], row: list[int], merge_gap: int = DIFF_RUN_MERGE_GAP
+) -> list[tuple[int, int]]:
+    """ Find the runs of cells that differ between two rows.
+
+    Args:
+        previous_row (list): The row as it was last drawn.
+        row (list): The row to draw.
+        merge_gap (int): Runs separated by at most this many equal cells are merged, since
+            rewriting a few cells is cheaper than another cursor move.
+
+    Returns:
+        list: (start, end) column ranges, end exclusive.
+
+    """
+    runs: list[tuple[int, int]] = []
+    for col_num, (previous_cell, cell) in enumerate(zip(previous_row, row)):
+        if previous_cell != cell:
+            if runs and col_num - runs[-1][1] <= merge_gap:
+                runs[-1] = (runs[-1][0], col_num + 1)
+            else:
+                runs.append((col_num, col_num + 1))
+    return runs
+
+
+def draw_frame(
+    stdscr: curses.window,
+    rows: list[list[int]],
+    frame_state: FrameState,
+    color_pair: int,
+    glyphs: tuple[bytes, ...] = CELL_GLYPHS,
+    separator: bytes = b' ',
+) -> None:
+    """ Draw only the runs of cells that changed since the previous frame.
+
+    Every `FULL_REPAINT_INTERVAL_FRAMES` frames, or when there is no usable previous frame,
+    every row is rewritten and curses is told to repaint the whole window.
+
+    Args:
+        stdscr (WindowObject): A representation of the screen provided by ncurses' wrapper.
+        rows (list): The display cells to draw, each an index into `glyphs`.
+        frame_state (FrameState): The previous frame and counters, updated in place.
+        color_pair (int): The curses attribute used for every glyph.
+        glyphs (tuple): The encoded symbol for each display cell value.
+        separator (bytes): The encoded symbol drawn between adjacent cells.
+
+    Returns:
+        None
+
+    """
+    cell_width = 1 + len(separator.decode('UTF-8'))
+    previous_rows = frame_state.previous_rows
+    full_repaint = (
+        previous_rows is None
+        or len(previous_rows) != len(rows)
+        or frame_state.frames_since_repaint >= FULL_REPAINT_INTERVAL_FRAMES
+    )
+    if full_repaint:
+        stdscr.redrawwin()
+        frame_state.frames_since_repaint = 0
+    else:
+        frame_state.frames_since_repaint += 1
+
+    cells_written = bytes_written = 0
+    for row_num, row in enumerate(rows):
+        if full_repaint or len(previous_rows[row_num]) != len(row):
+            runs = [(0, len(row))]
+        elif previous_rows[row_num] == row:
+            continue
+        else:
+            runs = changed_runs(previous_rows[row_num], row)
+        for run_start, run_end in runs:
+            text = separator.join([glyphs[cell] for cell in row[run_start:run_end]])
+            stdscr.addstr(row_num, run_start * cell_width, text, color_pair)
+            cells_written += run_end - run_start
+            bytes_written += len(text)
+
+    frame_state.previous_rows = [list(row) for row in rows]
+    frame_state.cells_written = cells_written
+    frame_state.bytes_written = bytes_written
+
+
+def render_grid(
+    stdscr: curses.window,
+    rows: list[list[int]],
+    frame_state: FrameState,
+    color_pair: int,
+    renderer: str = DEFAULT_RENDERER,
+    half_block: bool = False,
+    viewport: Optional[Viewport] = None,
+    activity: Optional[Activity] = None,
+    window: Optional[GridWindow] = None,
+) -> None:
+    """Draw a grid, or the part of it in a viewport, with the chosen renderer and cell size.
+
+    A zoomed-out viewport only counts the blocks inside the bounding box of `activity`, if given.
+    When `rows` hold only the cells inside `window`, the viewport and the bounding box are moved
+    to the window's coordinates.
+    """
+    if viewport is not None and window is not None:
+        viewport = Viewport(
+            viewport.screen_rows,
+            viewport.screen_cols,
+            viewport.half_block,
+            viewport.top - window.top,
+            viewport.left - window.left,
+            viewport.zoom,
+        )
+        if activity is not None:
+            activity = activity._replace(
+                top=activity.top - window.top,
+                left=activity.left - window.left,
+                bottom=activity.bottom - window.top,
+                right=activity.right - window.left,
+            )
+    if viewport is not None and viewport.zoom > 1:
+        rows = block_density_rows(rows, viewport, activity)
+        if renderer == 'diff':
+            draw_frame(stdscr, rows, frame_state, color_pair, DENSITY_GLYPHS)
+        else:
+            stdscr.addstr(0, 0, b'\n'.join([
+                b' '.join([DENSITY_GLYPHS[cell] for cell in row]) for row in rows
+            ]), color_pair)
+        return
+    if viewport is not None:
+        rows = visible_rows(rows, viewport)
+    if renderer == 'diff':
+        if half_block:
+            draw_frame(stdscr, half_block_rows(rows), frame_state, color_pair, HALF_BLOCK_GLYPHS, b'')
+        else:
+            draw_frame(stdscr, rows, frame_state, color_pair)
+    elif half_block:
+        stdscr.addstr(0, 0, print_grid_half_block(rows), color_pair)
+    else:
+        stdscr.addstr(0, 0, print_grid(rows), color_pair)
+
+
+def viewport_span(viewport: Viewport) -> tuple[int, int]:
+    """Return how many universe rows and columns a viewport shows at its zoom."""
+    if viewport.zoom == 1:
+        return default_grid_size(viewport.screen_rows, viewport.screen_cols, viewport.half_block)
+    block_rows, block_cols = default_grid_size(viewport.screen_rows, viewport.screen_cols)
+    return block_rows * viewport.zoom, block_cols * viewport.zoom
+
+
+def viewport_window(viewport: Viewport, num_rows: int, num_cols: int) -> GridWindow:
+    """Return the part of a universe a viewport shows."""
+    span_rows, span_cols = viewport_span(viewport)
+    return GridWindow(
+        viewport.top,
+        viewport.left,
+        min(num_rows, viewport.top + span_rows),
+        min(num_cols, viewport.left + span_cols),
+    )
+
+
+def clamp_viewport(viewport: Viewport, num_rows: int, num_cols: int) -> None:
+    """Keep a viewport's top-left corner where the viewport stays inside the universe."""
+    span_rows, span_cols = viewport_span(viewport)
+    viewport.top = max(0, min(viewport.top, num_rows - span_rows))
+    viewport.left = max(0, min(viewport.left, num_cols - span_cols))
+
+
+def handle_viewport_key(
+    viewport: Viewport, key_pressed: int, num_rows: int, num_cols: int
+) -> bool:
+    """ Pan a viewport with the arrow keys, or zoom it in and out around its centre.
+
+    Zooming doubles or halves the cells per character, and stops zooming out once the whole
+    universe fits on screen.
+
+    Args:
+        viewport (Viewport): The viewport, updated in place.
+        key_pressed (int): The key read from curses.
+        num_rows (int): Number of rows in the universe.
+        num_cols (int): Number of columns in the universe.
+
+    Returns:
+        bool: Whether the key moved or zoomed the viewport.
+
+    """
+    previous_view = (viewport.top, viewport.left, viewport.zoom)
+    span_rows, span_cols = viewport_span(viewport)
+    if key_pressed in PAN_KEYS:
+        row_direction, col_direction = PAN_KEYS[key_pressed]
+        viewport.top += row_direction * max(1, span_rows // PAN_STEP_FRACTION)
+        viewport.left += col_direction * max(1, span_cols // PAN_STEP_FRACTION)
+    elif key_pressed in ZOOM_IN_KEYS or (
+        key_pressed in ZOOM_OUT_KEYS and (span_rows < num_rows or span_cols < num_cols)
+    ):
+        centre_row, centre_col = viewport.top + span_rows // 2, viewport.left + span_cols // 2
+        if key_pressed in ZOOM_IN_KEYS:
+            viewport.zoom = max(1, viewport.zoom // 2)
+        else:
+            viewport.zoom *= 2
+        span_rows, span_cols = viewport_span(viewport)
+        viewport.top, viewport.left = centre_row - span_rows // 2, centre_col - span_cols // 2
+    clamp_viewport(viewport, num_rows, num_cols)
+    return (viewport.top, viewport.left, viewport.zoom) != previous_view
+
+
+def update_viewport(
+    stdscr: curses.window,
+    viewport: Viewport,
+    frame_state: FrameState,
+    key_pressed: int,
+    num_rows: int,
+    num_cols: int,
+) -> bool:
+    """Apply a pan, zoom or terminal resize to a viewport, clearing the screen when it changes."""
+    if key_pressed == curses.KEY_RESIZE:
+        screen_rows, viewport.screen_cols = stdscr.getmaxyx()
+        viewport.screen_rows = max(1, screen_rows - STATUS_LINE_ROWS)
+        clamp_viewport(viewport, num_rows, num_cols)
+    elif not handle_viewport_key(viewport, key_pressed, num_rows, num_cols):
+        return False
+    stdscr.erase()
+    frame_state.previous_rows = None
+    return True
+
 
+def visible_rows(rows: list[list[int]], viewport: Viewport) -> list[list[int]]:
+    """Slice out the cells a viewport shows at full size."""
+    span_rows, span_cols = viewport_span(viewport)
+    return [
+        row[viewport.left:viewport.left + span_cols]
+        for row in rows[viewport.top:viewport.top + span_rows]
+    ]
 
-def make_grids(num_rows: int, num_cols: int) -> tuple[list[list[int]], list[list[int]]]:
+
+def block_density_rows(
+    rows: list[list[int]], viewport: Viewport, activity: Optional[Activity] = None
+) -> list[list[int]]:
+    """ Summarize each zoom x zoom block a viewport shows as an index into `DENSITY_GLYPHS`.
+
+    Any live cell in a block gives it at least the lightest shade, and a full block the darkest.
+    Each grid row is turned into bytes once and its blocks are counted with `bytes.count`. Blocks
+    outside the bounding box of `activity` are empty and are not counted.
+
+    Args:
+        rows (list): The universe, or the part of it the viewport coordinates refer to, as a
+            2-d grid represented by a list of lists.
+        viewport (Viewport): The viewport, with a zoom above 1.
+        activity (Activity): The counts and bounding box of the live cells in `rows`, if known.
+
+    Returns:
+        list: One display row per block row, each cell a density level.
+
+    """
+    zoom = viewport.zoom
+    span_rows, span_cols = viewport_span(viewport)
+    span_cols = min(span_cols, len(rows[0]) - viewport.left) if rows else 0
+    num_blocks = len(range_compat(0, span_cols, zoom))
+    first_block, end_block = 0, num_blocks
+    live_top, live_bottom = 0, len(rows)
+    if activity is not None:
+        first_block = min(num_blocks, max(0, (activity.left - viewport.left) // zoom))
+        end_block = max(first_block, min(num_blocks, -(-(activity.right - viewport.left) // zoom)))
+        live_top, live_bottom = activity.top, max(0, activity.bottom)
+    block_starts = range_compat(first_block * zoom, end_block * zoom, zoom)
+    block_ends = range_compat((first_block + 1) * zoom, (end_block + 1) * zoom, zoom)
+    levels, block_cells = len(DENSITY_GLYPHS) - 1, zoom * zoom
+    right = viewport.left + min(span_cols, end_block * zoom)
+    display_rows = []
+    for block_top in range_compat(viewport.top, min(viewport.top + span_rows, len(rows)), zoom):
+        counts = [0] * len(block_starts)
+        for row in rows[max(block_top, live_top):min(block_top + zoom, live_bottom)]:
+            cells = bytes(row[viewport.left:right])
+            counts = list(map(
+                operator.add,
+                counts,
+                map(cells.count, itertools.repeat(1), block_starts, block_ends),
+            ))
+        display_rows.append(
+            [0] * first_block
+            + [-(-count * levels // block_cells) for count in counts]
+            + [0] * (num_blocks - end_block)
+        )
+    return display_rows
+
+
+def frame_stats(frame_state: FrameState) -> dict[str, int]:
+    """Report the cells and bytes written for the last frame."""
+    return {
+        'cells_written': frame_state.cells_written,
+        'bytes_written': frame_state.bytes_written,
+    }
+
+
+def make_grids(
+    num_rows: int, num_cols: int, density: float = DEFAULT_DENSITY
+) -> tuple[list[list[int]], list[list[int]]]:
     """Create the current grid and an empty future grid."""
-    current_grid = rand_init_grid(num_rows, num_cols)
+    current_grid = rand_init_grid(num_rows, num_cols, density=density)
     future_grid = [[0 for _ in range_compat(num_cols)] for _ in range_compat(num_rows)]
     return current_grid, future_grid
 
 
-def grid_signature(grid: list[list[int]]) -> StateSignature:
+def grid_signature(grid: Union[list[list[int]], FlatGrid]) -> Hashable:
     """Create a hashable signature for a grid state."""
+    if isinstance(grid, FlatGrid):
+        return flat_signature(grid)
     return tuple(tuple(row) for row in grid)
 
 
-def is_repeated_state(
-    recent_states: Deque[StateSignature],
-    grid: list[list[int]],
+@functools.lru_cache(maxsize=4)
+def zobrist_keys(num_rows: int, num_cols: int) -> tuple[array, ...]:
+    """Return one reproducible random 64-bit key per cell, as a row of keys per grid row."""
+    generator = random.Random(ZOBRIST_SEED)
+    return tuple(
+        array('Q', generator.randbytes(8 * num_cols))
+        for _ in range_compat(num_rows)
+    )
+
+
+def zobrist_hash(keys: tuple[array, ...], grid: list[list[int]]) -> int:
+    """Hash a grid as the XOR of the keys of its live cells."""
+    return functools.reduce(
+        operator.xor,
+        itertools.chain.from_iterable(map(itertools.compress, keys, grid)),
+        0,
+    )
+
+
+def reset_cycle_detector(cycle_detector: CycleDetector, grid: list[list[int]]) -> None:
+    """Start a fresh cycle search with a grid as the first checkpoint."""
+    cycle_detector.keys = zobrist_keys(len(grid), len(grid[0]))
+    cycle_detector.previous_rows = grid
+    cycle_detector.previous_activity = None
+    cycle_detector.state_hash = zobrist_hash(cycle_detector.keys, grid)
+    cycle_detector.checkpoint = grid_signature(grid)
+    cycle_detector.checkpoint_hash = cycle_detector.state_hash
+    cycle_detector.power = 1
+    cycle_detector.steps = 0
+    cycle_detector.period = 0
+
+
+def is_cycle(
+    cycle_detector: CycleDetector, grid: list[list[int]], activity: Optional[Activity] = None
 ) -> bool:
-    """Report whether a grid state has already been seen."""
-    return grid_signature(grid) in recent_states
+    """ Add the next generation to a cycle search and report whether it repeats the checkpoint.
+
+    The hash is updated from the cells that differ from the previous generation, so `grid` must
+    be a new list of rows or the other buffer of a double-buffered engine, not the previous rows
+    modified in place. When the activity of both generations is known, only the rows inside
+    their bounding boxes are compared, since the rows outside are empty in both. The checkpoint
+    grid is only compared when the hashes match.
+
+    Args:
+        cycle_detector (CycleDetector): The search state, updated in place.
+        grid (list): The rows of the next generation.
+        activity (Activity): The counts and bounding box of the next generation, if known.
+
+    Returns:
+        bool: Whether the grid repeats the checkpoint, with the period in `cycle_detector.period`.
+
+    """
+    row_start, row_end = 0, len(grid)
+    if activity is not None and cycle_detector.previous_activity is not None:
+        live_box = merge_activity((cycle_detector.previous_activity, activity))
+        row_start, row_end = live_box.top, live_box.bottom
+    for keys, previous_row, row in zip(
+        cycle_detector.keys[row_start:row_end],
+        cycle_detector.previous_rows[row_start:row_end],
+        grid[row_start:row_end],
+    ):
+        if previous_row != row:
+            cycle_detector.state_hash = functools.reduce(
+                operator.xor,
+                itertools.compress(keys, map(operator.ne, previous_row, row)),
+                cycle_detector.state_hash,
+            )
+    cycle_detector.previous_rows = grid
+    cycle_detector.previous_activity = activity
+    cycle_detector.steps += 1
+    if (
+        cycle_detector.state_hash == cycle_detector.checkpoint_hash
+        and grid_signature(grid) == cycle_detector.checkpoint
+    ):
+        cycle_detector.period = cycle_detector.steps
+        return True
+    if cycle_detector.steps == cycle_detector.power:
+        cycle_detector.checkpoint = grid_signature(grid)
+        cycle_detector.checkpoint_hash = cycle_detector.state_hash
+        cycle_detector.power *= 2
+        cycle_detector.steps = 0
+    return False
+
+
+def reset_signature_search(cycle_detector: CycleDetector, signature: Hashable) -> None:
+    """Start a fresh cycle search over whole-grid signatures, which keeps no Zobrist hash."""
+    cycle_detector.checkpoint = signature
+    cycle_detector.power = 1
+    cycle_detector.steps = 0
+    cycle_detector.period = 0
 
 
-def record_state(recent_states: Deque[StateSignature], grid: list[list[int]]) -> None:
-    """Record a grid state in the bounded recent-state history."""
-    recent_states.append(grid_signature(grid))
+def is_signature_cycle(cycle_detector: CycleDetector, signature: Hashable) -> bool:
+    """Add the signature of the next generation to a search started by `reset_signature_search`."""
+    cycle_detector.steps += 1
+    if signature == cycle_detector.checkpoint:
+        cycle_detector.period = cycle_detector.steps
+        return True
+    if cycle_detector.steps == cycle_detector.power:
+        cycle_detector.checkpoint = signature
+        cycle_detector.power *= 2
+        cycle_detector.steps = 0
+    return False
 
 
-def restart_grids(num_rows: int, num_cols: int) -> tuple[list[list[int]], list[list[int]]]:
-    """Pause briefly before restarting with a fresh random grid."""
+def restart_grids(
+    num_rows: int, num_cols: int, engine: Optional[Engine] = None, grids: tuple[Any, ...] = ()
+) -> tuple[Any, Any]:
+    """Pause briefly before restarting with a fresh random grid.
+
+    The current and future `grids` are refilled in place when the engine can refill them, and
+    are otherwise released and replaced by new ones.
+    """
     time.sleep(RESTART_DELAY_SECONDS)
-    return make_grids(num_rows, num_cols)
+    if engine is not None and engine.refill and grids:
+        engine.refill(*grids)
+        return grids[0], grids[1]
+    if engine is not None:
+        release_grids(engine, *grids)
+    return make_engine_grids(num_rows, num_cols, engine)
+
+
+class DrainRequest(NamedTuple):
+    """Asks the debug log thread to write everything queued before it, then set `done`."""
+
+    done: threading.Event
+    close_files: bool
+
+
+class DebugLogWriter(object):
+    """ Writes debug log messages from a background thread, so logging costs the caller a queue put.
+
+    Messages are written in batches once `flush_bytes` are pending or `flush_interval` seconds
+    have passed. Log files stay open between batches and are rotated to `<path>.1` and onwards
+    once they reach `max_bytes`, keeping `backup_count` old files.
+    """
+
+    def __init__(
+        self,
+        flush_bytes: int = DEBUG_LOG_FLUSH_BYTES,
+        flush_interval: float = DEBUG_LOG_FLUSH_INTERVAL_SECONDS,
+        max_bytes: int = DEBUG_LOG_MAX_BYTES,
+        backup_count: int = DEBUG_LOG_BACKUP_COUNT,
+    ) -> None:
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.messages: queue.SimpleQueue = queue.SimpleQueue()
+        self.files: dict[str, Any] = {}
+        self.thread: Optional[threading.Thread] = None
+        self.thread_lock = threading.Lock()
+
+    def write(self, message: str, log_path: str) -> None:
+        """Queue a message for a log file, starting the writer thread on first use."""
+        if self.thread is None or not self.thread.is_alive():
+            with self.thread_lock:
+                if self.thread is None or not self.thread.is_alive():
+                    if self.thread is None:
+                        atexit.register(self.drain, True)
+                    self.thread = threading.Thread(
+                        target=self.run,
+                        name='debug-log-writer',
+                        daemon=True,
+                    )
+                    self.thread.start()
+        self.messages.put((log_path, message))
+
+    def drain(self, close_files: bool = False) -> None:
+        """Wait until every queued message is written, optionally closing the log files."""
+        if self.thread is None or not self.thread.is_alive():
+            return
+        drain_request = DrainRequest(threading.Event(), close_files)
+        self.messages.put((None, drain_request))
+        drain_request.done.wait(DEBUG_LOG_DRAIN_TIMEOUT_SECONDS)
+
+    def run(self) -> None:
+        """Batch queued messages and write them until the process exits."""
+        pending: dict[str, list[str]] = {}
+        pending_bytes = 0
+        last_flushed_at = time.monotonic()
+        while True:
+            timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flushed_at))
+            try:
+                log_path, message = self.messages.get(timeout=timeout)
+            except queue.Empty:
+                log_path = message = None
+            if isinstance(message, str):
+                pending.setdefault(log_path, []).append(message + '\n')
+                pending_bytes += len(message) + 1
+                if (
+                    pending_bytes < self.flush_bytes
+                    and time.monotonic() - last_flushed_at < self.flush_interval
+                ):
+                    continue
+            for pending_path, lines in pending.items():
+                self.write_lines(pending_path, lines)
+            pending = {}
+            pending_bytes = 0
+            last_flushed_at = time.monotonic()
+            if isinstance(message, DrainRequest):
+                if message.close_files:
+                    while self.files:
+                        self.files.popitem()[1].close()
+                message.done.set()
+
+    def write_lines(self, log_path: str, lines: list[str]) -> None:
+        """Append lines to an open log file, rotating it once it is full."""
+        try:
+            log_file = self.files.get(log_path)
+            if log_file is None:
+                log_file = self.files[log_path] = open(log_path, 'a')
+            log_file.write(''.join(lines))
+            log_file.flush()
+            if log_file.tell() >= self.max_bytes:
+                log_file.close()
+                del self.files[log_path]
+                for backup_number in range_compat(self.backup_count - 1, 0, -1):
+                    backup_path = '{}.{}'.format(log_path, backup_number)
+                    if os.path.exists(backup_path):
+                        os.replace(backup_path, '{}.{}'.format(log_path, backup_number + 1))
+                if self.backup_count:
+                    os.replace(log_path, log_path + '.1')
+                else:
+                    os.remove(log_path)
+        except OSError:
+            # The debug log must never stop the game; a batch that cannot be written is dropped.
+            self.files.pop(log_path, None)
+
+
+DEBUG_LOG_WRITER = DebugLogWriter()
 
 
 def append_debug_log(message: str, log_path: str = DEBUG_LOG_PATH) -> None:
-    """Append a debug message to the log file."""
-    with open(log_path, 'a') as debug_log:
-        debug_log.write(message + '\n')
+    """Queue a debug message for the background log writer."""
+    DEBUG_LOG_WRITER.write(message, log_path)
+
+
+def drain_debug_log(close_files: bool = False) -> None:
+    """Block until every queued debug message has been written."""
+    DEBUG_LOG_WRITER.drain(close_files)
 
 
 def current_timestamp() -> str:
@@ -133,13 +1110,48 @@ def current_timestamp() -> str:
     return time.strftime('%Y-%m-%dT%H:%M:%S')
 
 
-def get_memory_usage_kb() -> int:
-    """Return the current process resident set size in kilobytes."""
-    output = subprocess.check_output(
-        ['ps', '-o', 'rss=', '-p', str(os.getpid())],
-        universal_newlines=True,
-    )
-    return int(output.strip())
+def get_memory_usage_kb(statm_path: str = STATM_PATH) -> int:
+    """Return the current process resident set size in kilobytes, without starting a process.
+
+    Where `/proc` is unavailable, such as on macOS, the peak resident set size is returned instead.
+    """
+    try:
+        with open(statm_path) as statm_file:
+            resident_pages = int(statm_file.read().split()[1])
+    except OSError:
+        return get_peak_memory_usage_kb()
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') // 1024
+
+
+def get_peak_memory_usage_kb() -> int:
+    """Return the peak resident set size of this process in kilobytes."""
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes where Linux reports kilobytes.
+    return peak_rss // 1024 if sys.platform == 'darwin' else peak_rss
+
+
+def record_phase(phase_timings: Optional[PhaseTimings], phase: str, started_ns: int) -> int:
+    """Record the time since `started_ns` for a phase and return the time the next one starts."""
+    now_ns = time.perf_counter_ns()
+    if phase_timings is not None:
+        phase_timings.samples[phase].append(now_ns - started_ns)
+    return now_ns
+
+
+def phase_percentiles(phase_timings: PhaseTimings) -> dict[str, int]:
+    """Return nearest-rank percentiles of each recorded phase, in microseconds."""
+    percentiles = {}
+    for phase, samples in phase_timings.samples.items():
+        ordered_samples = sorted(samples)
+        for percentile in PHASE_PERCENTILES if ordered_samples else ():
+            rank = max(1, -(-percentile * len(ordered_samples) // 100))
+            percentiles['{}_p{}_us'.format(phase, percentile)] = ordered_samples[rank - 1] // 1000
+    return percentiles
+
+
+def format_log_fields(fields: Optional[dict[str, int]]) -> str:
+    """Format extra debug log fields as space-prefixed key=value pairs."""
+    return ''.join(' {}={}'.format(name, value) for name, value in (fields or {}).items())
 
 
 def log_memory_usage(
@@ -147,17 +1159,19 @@ def log_memory_usage(
     tracked_state_count: int,
     log_path: str = DEBUG_LOG_PATH,
     current_time: Optional[float] = None,
+    extra_fields: Optional[dict[str, int]] = None,
 ) -> float:
-    """Write a periodic memory usage sample to the debug log."""
+    """Write a periodic memory usage sample, with any extra counters, to the debug log."""
     current_time = time.monotonic() if current_time is None else current_time
     if current_time - last_logged_at < MEMORY_LOG_INTERVAL_SECONDS:
         return last_logged_at
     try:
         append_debug_log(
-            '[{}] rss_kb={} tracked_states={}'.format(
+            '[{}] rss_kb={} tracked_states={}{}'.format(
                 current_timestamp(),
                 get_memory_usage_kb(),
                 tracked_state_count,
+                format_log_fields(extra_fields),
             ),
             log_path,
         )
@@ -172,6 +1186,26 @@ def log_memory_usage(
     return current_time
 
 
+def log_phase_timings(
+    last_logged_at: float,
+    phase_timings: PhaseTimings,
+    log_path: str = DEBUG_LOG_PATH,
+    current_time: Optional[float] = None,
+    force: bool = False,
+) -> float:
+    """Write a periodic summary of phase timing percentiles, or one right away when forced."""
+    current_time = time.monotonic() if current_time is None else current_time
+    if not force and current_time - last_logged_at < PHASE_TIMING_LOG_INTERVAL_SECONDS:
+        return last_logged_at
+    percentiles = phase_percentiles(phase_timings)
+    if percentiles:
+        append_debug_log(
+            '[{}] phase_timings{}'.format(current_timestamp(), format_log_fields(percentiles)),
+            log_path,
+        )
+    return current_time
+
+
 def log_unhandled_exception(log_path: str = DEBUG_LOG_PATH) -> None:
     """Write the active exception traceback to the debug log."""
     append_debug_log(
@@ -181,73 +1215,228 @@ def log_unhandled_exception(log_path: str = DEBUG_LOG_PATH) -> None:
         ),
         log_path,
     )
+    drain_debug_log()
 
-# Assuming grids are rectangular
-def state_transition(
-    current_grid: list[list[int]],
-    future_grid: list[list[int]],
-    with_border: bool = False,
-) -> None:
-    """ Transition between grids.
+
+def compile_rule(birth: Iterable[int], survival: Iterable[int]) -> Rule:
+    """ Compile the neighbor counts of a rule into its lookup tables.
 
     Args:
-        current_grid (list): The 2-d grid representation of the current state of the simulation.
-        future_grid (list): The 2-d grid that will store the representation of the next state \
-                of the simulation.
-        with_border (bool): Whether to preserve a dead border around the grid.
+        birth (iterable): Live neighbor counts at which a dead cell becomes alive.
+        survival (iterable): Live neighbor counts at which a live cell stays alive.
 
     Returns:
-        None
+        Rule: The rule with its lookup tables and block sums.
 
     """
-    row_start = 1 if with_border else 0
-    row_end = len(current_grid) - 1 if with_border else len(current_grid)
-    col_start = 1 if with_border else 0
-    col_end = len(current_grid[0]) - 1 if with_border else len(current_grid[0])
+    birth, survival = frozenset(birth), frozenset(survival)
+    neighbor_table = bytes(
+        1 if live_count in (survival if alive else birth) else 0
+        for alive in (0, 1)
+        for live_count in range_compat(9)
+    )
+    lane_table = bytes(
+        neighbor_table[9 + lane_value - 17] if 17 <= lane_value <= 25
+        else neighbor_table[lane_value] if lane_value <= 8
+        else 0
+        for lane_value in range_compat(256)
+    )
+    survival_block_sums = {live_count + 1 for live_count in survival}
+    return Rule(
+        birth,
+        survival,
+        neighbor_table,
+        lane_table,
+        tuple(sorted(birth & survival_block_sums)),
+        tuple(sorted(birth - survival_block_sums)),
+        tuple(sorted(survival_block_sums - birth)),
+    )
 
-    if with_border:
-        for row_num in range_compat(len(current_grid)):
-            future_grid[row_num][0] = 0
+
+CONWAY_RULE = compile_rule((3,), (2, 3))
+
+
+def parse_rule(rule: str) -> Rule:
+    """Parse and compile a rule written in B/S notation, such as B36/S23."""
+    match = RULE_PATTERN.fullmatch(rule.strip())
+    if match is None:
+        raise ValueError('Unsupported rule: {}'.format(rule))
+    return compile_rule(map(int, match.group(1)), map(int, match.group(2)))
+
+
+def format_rule(rule: Rule) -> str:
+    """Write a rule in B/S notation."""
+    return 'B{}/S{}'.format(
+        ''.join(map(str, sorted(rule.birth))),
+        ''.join(map(str, sorted(rule.survival))),
+    )
+
+
+def rows_activity(
+    rows: Sequence[Sequence[int]],
+    previous_rows: Optional[Sequence[Sequence[int]]] = None,
+    row_start: int = 0,
+) -> Activity:
+    """ Count the live cells, births and deaths in rows of 0/1 cells, and box the live cells.
+
+    Works on lists of ints and on bytes alike, with the counting done by `count`, `index` and
+    `map`. Births and deaths are only counted in rows that differ from their previous row.
+
+    Args:
+        rows (Sequence): The rows of a generation.
+        previous_rows (Sequence): The same rows one generation earlier, or None to count no
+            births or deaths.
+        row_start (int): The grid row of `rows[0]`, when the rows are one band of a grid.
+
+    Returns:
+        Activity: The counts and bounding box of the rows.
+
+    """
+    population = births = deaths = 0
+    top = bottom = left = right = 0
+    for row_num, row in enumerate(rows, row_start):
+        row_population = row.count(1)
+        if row_population:
+            if not population:
+                top, left, right = row_num, len(row), 0
+            population += row_population
+            bottom = row_num + 1
+            left = min(left, row.index(1))
+            right = max(right, len(row) - row[::-1].index(1))
+        if previous_rows is not None:
+            previous_row = previous_rows[row_num - row_start]
+            if previous_row != row:
+                row_births = sum(map(operator.gt, row, previous_row))
+                births += row_births
+                deaths += row_births + previous_row.count(1) - row_population
+    return Activity(population, births, deaths, top, left, bottom, right)
+
+
+def merge_activity(parts: Iterable[Activity]) -> Activity:
+    """Add up the activity of disjoint parts of a grid, boxing the live cells of all of them."""
+    population = births = deaths = 0
+    boxes = []
+    for part in parts:
+        population += part.population
+        births += part.births
+        deaths += part.deaths
+        if part.population:
+            boxes.append(part)
+    if not boxes:
+        return Activity(population, births, deaths)
+    return Activity(
+        population,
+        births,
+        deaths,
+        min(box.top for box in boxes),
+        min(box.left for box in boxes),
+        max(box.bottom for box in boxes),
+        max(box.right for box in boxes),
+    )
+
+
+def count_bounds(counts: list[int]) -> tuple[int, int]:
+    """Return the first index with a nonzero count and one past the last, or (0, 0) if none."""
+    first = next(itertools.compress(itertools.count(), counts), None)
+    if first is None:
+        return 0, 0
+    last = next(itertools.compress(range_compat(len(counts) - 1, -1, -1), reversed(counts)))
+    return first, last + 1
+
+
+def activity_fields(activity: Activity) -> dict[str, int]:
+    """Name the counts and bounding box of an activity for the debug log."""
+    return {
+        'population': activity.population,
+        'births': activity.births,
+        'deaths': activity.deaths,
+        'bbox_top': activity.top,
+        'bbox_left': activity.left,
+        'bbox_bottom': activity.bottom,
+        'bbox_right': activity.right,
+    }
+
+
+# Assuming grids are rectangular
+def state_transition(
+    current_grid: Union[list[list[int]], FlatGrid],
+    future_grid: Union[list[list[int]], FlatGrid],
+    with_border: bool = False,
+    rule: Rule = CONWAY_RULE,
+    count_activity: bool = True,
+) -> Optional[Activity]:
+    """ Transition between grids.
+
+    Args:
+        current_grid (list): The 2-d grid representation of the current state of the simulation,
+            or a flat grid.
+        future_grid (list): The 2-d grid that will store the representation of the next state \
+                of the simulation, a flat grid when the current grid is one.
+        with_border (bool): Whether to preserve a dead border around the grid.
+        rule (Rule): The compiled rule to apply.
+        count_activity (bool): Whether to count and box the live cells of the next state.
+
+    Returns:
+        Activity: The population, births, deaths and bounding box of the next state, or None
+            when not counted.
+
+    """
+    if isinstance(current_grid, FlatGrid):
+        return flat_state_transition(current_grid, future_grid, with_border, rule, count_activity)
+    row_start = 1 if with_border else 0
+    row_end = len(current_grid) - 1 if with_border else len(current_grid)
+    col_start = 1 if with_border else 0
+    col_end = len(current_grid[0]) - 1 if with_border else len(current_grid[0])
+
+    if with_border:
+        for row_num in range_compat(len(current_grid)):
+            future_grid[row_num][0] = 0
             future_grid[row_num][-1] = 0
         for col_num in range_compat(len(current_grid[0])):
             future_grid[0][col_num] = 0
             future_grid[-1][col_num] = 0
 
+    population = births = deaths = 0
+    top = bottom = left = right = 0
     for row_num in range_compat(row_start, row_end):
+        current_row, future_row = current_grid[row_num], future_grid[row_num]
         for col_num in range_compat(col_start, col_end):
-            future_grid[row_num][col_num] = cell_transition(row_num, col_num, current_grid)
+            alive = cell_transition(row_num, col_num, current_grid, rule)
+            future_row[col_num] = alive
+            if not count_activity:
+                continue
+            if alive:
+                if not population:
+                    top, left, right = row_num, col_num, col_num + 1
+                population += 1
+                bottom = row_num + 1
+                left = min(left, col_num)
+                right = max(right, col_num + 1)
+                if not current_row[col_num]:
+                    births += 1
+            elif current_row[col_num]:
+                deaths += 1
+    if not count_activity:
+        return None
+    return Activity(population, births, deaths, top, left, bottom, right)
 
-def cell_transition(row_num: int, col_num: int, grid: list[list[int]]) -> int:
-    """ Uses Conway's rules to determine whether a cell should live (1) or die (0).
+def cell_transition(
+    row_num: int, col_num: int, grid: list[list[int]], rule: Rule = CONWAY_RULE
+) -> int:
+    """ Look up whether a cell should live (1) or die (0) in the rule's neighbor-count table.
 
     Args:
         row_num (int): The row position of the cell.
         col_num (int): The column position of the cell.
         grid (list): A 2-d grid represented by a list of lists.
+        rule (Rule): The compiled rule to apply, Conway's by default.
 
     Returns:
         int: 1 for alive. 0 for dead.
 
     """
     live_count = live_neighbor_count(row_num, col_num, grid)
-    living_status = grid[row_num][col_num]
-
-    # Any live cell with fewer than two live neighbours dies, as if by underpopulation.
-    if living_status and live_count < 2:
-        return 0
-
-    # Any live cell with two or three live neighbours lives on to the next generation.
-    elif living_status and live_count == 2 or live_count == 3:
-        return 1
-
-    # Any live cell with more than three live neighbours dies, as if by overpopulation.
-    elif living_status and live_count > 3:
-        return 0
-
-    # Any dead cell with exactly three live neighbours becomes a live cell, as if by reproduction.
-    elif not living_status and live_count == 3:
-        return 1
-    return living_status
+    return rule.neighbor_table[9 * grid[row_num][col_num] + live_count]
 
 # Naive way
 def live_neighbor_count(row_num: int, col_num: int, grid: list[list[int]]) -> int:
@@ -258,49 +1447,2294 @@ def live_neighbor_count(row_num: int, col_num: int, grid: list[list[int]]) -> in
         col_num (int): The column position of the cell.
         grid (list): A 2-d grid represented by a list of lists.
 
-    Returns:
-        int: Number of neighboring cells that are alive.
+    Returns:
+        int: Number of neighboring cells that are alive.
+
+    """
+    count = 0
+    wrap_vertical, wrap_horizontal = len(grid), len(grid[0])
+
+    # Top left
+    if grid[(row_num - 1) % wrap_vertical][(col_num - 1) % wrap_horizontal]:
+        count += 1
+    # Top middle
+    if grid[(row_num - 1) % wrap_vertical][col_num]:
+        count += 1
+    # Top right
+    if grid[(row_num - 1) % wrap_vertical][(col_num + 1) % wrap_horizontal]:
+        count += 1
+
+    # Bottom right
+    if grid[(row_num + 1) % wrap_vertical][(col_num - 1) % wrap_horizontal]:
+        count += 1
+    # Bottom middle
+    if grid[(row_num + 1) % wrap_vertical][col_num]:
+        count += 1
+    # Bottom right
+    if grid[(row_num + 1) % wrap_vertical][(col_num + 1) % wrap_horizontal]:
+        count += 1
+
+    # Middle left
+    if grid[row_num % wrap_vertical][(col_num - 1) % wrap_horizontal]:
+        count += 1
+    # Middle right
+    if grid[row_num % wrap_vertical][(col_num + 1) % wrap_horizontal]:
+        count += 1
+
+    return count
+
+
+def numpy_make_grids(
+    num_rows: int, num_cols: int, density: float = DEFAULT_DENSITY
+) -> tuple[Any, Any]:
+    """Create the current grid and an empty future grid as NumPy arrays.
+
+    The NumPy Generator is seeded from `random`, so `--seed` covers this engine too.
+    """
+    generator = np.random.default_rng(random.getrandbits(64))
+    shape = (int(num_rows), int(num_cols))
+    if density == DEFAULT_DENSITY:
+        current_grid = generator.integers(0, 2, size=shape, dtype=np.uint8)
+    else:
+        current_grid = (generator.random(shape) < density).view(np.uint8)
+    future_grid = np.zeros((int(num_rows), int(num_cols)), dtype=np.uint8)
+    return current_grid, future_grid
+
+
+def numpy_block_sums(grid: Any) -> Any:
+    """ Compute the 3x3 block sum of every cell, itself included, with wrapped whole-array shifts.
+
+    Args:
+        grid (ndarray): A 2-d grid of 0s and 1s.
+
+    Returns:
+        ndarray: The number of live cells in the 3x3 block centered on each cell.
+
+    """
+    row_sums = grid + np.roll(grid, 1, axis=1) + np.roll(grid, -1, axis=1)
+    return row_sums + np.roll(row_sums, 1, axis=0) + np.roll(row_sums, -1, axis=0)
+
+
+def numpy_sum_mask(block_sums: Any, matching_sums: tuple[int, ...]) -> Any:
+    """Return a boolean array of the cells whose block sum is one of `matching_sums`."""
+    masks = [block_sums == block_sum for block_sum in matching_sums]
+    return functools.reduce(np.logical_or, masks) if masks else np.zeros(block_sums.shape, bool)
+
+
+def numpy_state_transition(
+    current_grid: Any,
+    future_grid: Any,
+    with_border: bool = False,
+    rule: Rule = CONWAY_RULE,
+    count_activity: bool = True,
+) -> Optional[Activity]:
+    """ Transition between NumPy grids, matching `state_transition` cell for cell.
+
+    Args:
+        current_grid (ndarray): The 2-d grid representation of the current state of the simulation.
+        future_grid (ndarray): The 2-d grid that will store the representation of the next state \
+                of the simulation.
+        with_border (bool): Whether to preserve a dead border around the grid.
+        rule (Rule): The compiled rule to apply.
+        count_activity (bool): Whether to count and box the live cells of the next state.
+
+    Returns:
+        Activity: The population, births, deaths and bounding box of the next state, or None
+            when not counted.
+
+    """
+    block_sums = numpy_block_sums(current_grid)
+    dead = current_grid == 0
+    next_state = numpy_sum_mask(block_sums, rule.either_block_sums)
+    if rule.birth_block_sums:
+        next_state |= numpy_sum_mask(block_sums, rule.birth_block_sums) & dead
+    if rule.survival_block_sums:
+        next_state |= numpy_sum_mask(block_sums, rule.survival_block_sums) & ~dead
+    if with_border:
+        next_state[0, :] = False
+        next_state[-1, :] = False
+        next_state[:, 0] = False
+        next_state[:, -1] = False
+    future_grid[...] = next_state
+    return numpy_activity(next_state, dead) if count_activity else None
+
+
+def numpy_activity(next_state: Any, dead: Any) -> Activity:
+    """Count and box a NumPy generation from the masks of its live cells and the previous dead."""
+    population = int(np.count_nonzero(next_state))
+    births = int(np.count_nonzero(next_state & dead))
+    deaths = births + dead.size - int(np.count_nonzero(dead)) - population
+    if not population:
+        return Activity(population, births, deaths)
+    live_rows = np.flatnonzero(next_state.any(axis=1))
+    live_cols = np.flatnonzero(next_state.any(axis=0))
+    return Activity(
+        population,
+        births,
+        deaths,
+        int(live_rows[0]),
+        int(live_cols[0]),
+        int(live_rows[-1]) + 1,
+        int(live_cols[-1]) + 1,
+    )
+
+
+def numpy_from_cells(num_rows: int, num_cols: int, cells: Iterable[tuple[int, int]]) -> Any:
+    """Create a NumPy grid with the given live cells."""
+    return np.array(list_from_cells(num_rows, num_cols, cells), dtype=np.uint8)
+
+
+def numpy_to_packed(grid: Any) -> bytes:
+    """Pack a NumPy grid into rows of one bit per cell."""
+    return np.packbits(grid, axis=1, bitorder='little').tobytes()
+
+
+def numpy_from_packed(num_rows: int, num_cols: int, packed: Any) -> Any:
+    """Unpack rows of one bit per cell, such as a memory-mapped checkpoint, into a NumPy grid."""
+    packed_rows = np.frombuffer(packed, dtype=np.uint8, count=num_rows * packed_row_bytes(num_cols))
+    return np.unpackbits(
+        packed_rows.reshape(num_rows, packed_row_bytes(num_cols)),
+        axis=1,
+        count=num_cols,
+        bitorder='little',
+    )
+
+
+def numpy_signature(grid: Any) -> bytes:
+    """Return the cells of a NumPy grid as bytes, for comparing grid states."""
+    return grid.tobytes()
+
+
+def numpy_to_rows(grid: Any) -> list[list[int]]:
+    """Convert a NumPy grid to the list-of-lists rows used for rendering."""
+    return grid.tolist()
+
+
+def numpy_window_rows(
+    grid: Any, top: int, left: int, bottom: int, right: int
+) -> list[list[int]]:
+    """Convert the cells of a NumPy grid inside a window to list-of-lists rows."""
+    return grid[top:bottom, left:right].tolist()
+
+
+def bitboard_make_grids(
+    num_rows: int, num_cols: int, density: float = DEFAULT_DENSITY
+) -> tuple[BitboardGrid, BitboardGrid]:
+    """Create the current grid and an empty future grid as bitboards."""
+    num_rows, num_cols = int(num_rows), int(num_cols)
+    current_grid = BitboardGrid(num_cols, random_bit_rows(num_rows, num_cols, density))
+    future_grid = BitboardGrid(num_cols, [0] * num_rows)
+    return current_grid, future_grid
+
+
+def bitboard_from_rows(grid: list[list[int]]) -> BitboardGrid:
+    """Pack a list-of-lists grid into a bitboard."""
+    return BitboardGrid(
+        len(grid[0]),
+        [int(''.join('1' if cell else '0' for cell in reversed(row)), 2) for row in grid],
+    )
+
+
+def bitboard_from_cells(
+    num_rows: int, num_cols: int, cells: Iterable[tuple[int, int]]
+) -> BitboardGrid:
+    """Create a bitboard with the given live cells."""
+    rows = [0] * num_rows
+    for row_num, col_num in cells:
+        rows[row_num % num_rows] |= 1 << col_num % num_cols
+    return BitboardGrid(num_cols, rows)
+
+
+def packed_row_bytes(num_cols: int) -> int:
+    """Return the bytes taken by one bit-packed row."""
+    return (num_cols + 7) // 8
+
+
+def bitboard_to_packed(grid: BitboardGrid) -> bytes:
+    """Pack a bitboard into rows of one bit per cell."""
+    row_bytes = packed_row_bytes(grid.num_cols)
+    return b''.join(row.to_bytes(row_bytes, 'little') for row in grid.rows)
+
+
+def bitboard_from_packed(num_rows: int, num_cols: int, packed: Any) -> BitboardGrid:
+    """Read rows of one bit per cell, such as a memory-mapped checkpoint, into a bitboard."""
+    row_bytes = packed_row_bytes(num_cols)
+    return BitboardGrid(num_cols, [
+        int.from_bytes(packed[row_num * row_bytes:(row_num + 1) * row_bytes], 'little')
+        for row_num in range_compat(num_rows)
+    ])
+
+
+def cells_from_packed(num_rows: int, num_cols: int, packed: Any) -> Iterator[tuple[int, int]]:
+    """Stream the live cells of rows of one bit per cell."""
+    row_bytes = packed_row_bytes(num_cols)
+    for row_num in range_compat(num_rows):
+        row = int.from_bytes(packed[row_num * row_bytes:(row_num + 1) * row_bytes], 'little')
+        while row:
+            low_bit = row & -row
+            yield row_num, low_bit.bit_length() - 1
+            row ^= low_bit
+
+
+def bitboard_to_rows(grid: BitboardGrid) -> list[list[int]]:
+    """Unpack a bitboard into the list-of-lists rows used for rendering."""
+    row_format = '0{}b'.format(grid.num_cols)
+    return [
+        list(format(row, row_format)[::-1].encode('ascii').translate(BIT_CHARACTER_TO_CELL))
+        for row in grid.rows
+    ]
+
+
+def bitboard_window_rows(
+    grid: BitboardGrid, top: int, left: int, bottom: int, right: int
+) -> list[list[int]]:
+    """Unpack the cells of a bitboard inside a window into list-of-lists rows."""
+    width = max(0, right - left)
+    row_format = '0{}b'.format(width)
+    mask = (1 << width) - 1
+    return [
+        list(
+            format(row >> left & mask, row_format)[::-1].encode('ascii')
+            .translate(BIT_CHARACTER_TO_CELL)
+        ) if width else []
+        for row in grid.rows[top:bottom]
+    ]
+
+
+def bitboard_signature(grid: BitboardGrid) -> tuple[int, ...]:
+    """Return the row integers of a bitboard grid, for comparing grid states."""
+    return tuple(grid.rows)
+
+
+def bitboard_row_sums(row: int, num_cols: int, mask: int) -> tuple[int, int]:
+    """ Add each cell of a bitboard row to its left and right neighbors.
+
+    Args:
+        row (int): The row, with bit `col` holding column `col`.
+        num_cols (int): Number of columns in the row.
+        mask (int): A mask with the low `num_cols` bits set.
+
+    Returns:
+        tuple: The low and high bit planes of the 0-3 sums, one bit per column.
+
+    """
+    left = ((row << 1) | (row >> (num_cols - 1))) & mask
+    right = (row >> 1) | ((row & 1) << (num_cols - 1))
+    partial = left ^ right
+    return partial ^ row, (left & right) | (partial & row)
+
+
+def bitboard_sum_masks(
+    block_sums: tuple[int, ...],
+    planes: tuple[list[int], ...],
+    inverted_planes: dict[int, list[int]],
+) -> list[int]:
+    """ Select, row by row, the columns whose 3x3 block sum is one of `block_sums`.
+
+    The rows are combined with `map` over `operator` functions, so the loop over the rule's
+    block sums runs once per generation rather than once per row. Since a block sum is at most 9,
+    the eights plane only needs testing for sums below 2, and sums of 8 and 9 only need the ones
+    and eights planes.
+
+    Args:
+        block_sums (tuple): The block sums to match.
+        planes (tuple): The ones, twos, fours and eights bit planes of every row's block sums.
+        inverted_planes (dict): Inverted planes by index, filled in and reused across calls.
+
+    Returns:
+        list: For each row, the columns whose block sum matches. Matches of a block sum of 0 are
+            negative ints, with every bit above the row set too.
+
+    """
+    matches: Optional[list[int]] = None
+    for block_sum in block_sums:
+        if block_sum >= 8:
+            plane_indices: tuple[int, ...] = (0, 3)
+        elif block_sum >= 2:
+            plane_indices = (0, 1, 2)
+        else:
+            plane_indices = (0, 1, 2, 3)
+        terms = []
+        for plane_index in plane_indices:
+            if block_sum >> plane_index & 1:
+                terms.append(planes[plane_index])
+            else:
+                if plane_index not in inverted_planes:
+                    inverted_planes[plane_index] = list(map(operator.invert, planes[plane_index]))
+                terms.append(inverted_planes[plane_index])
+        sum_matches = functools.reduce(lambda left, right: map(operator.and_, left, right), terms)
+        matches = list(sum_matches if matches is None else map(operator.or_, matches, sum_matches))
+    return [0] * len(planes[0]) if matches is None else matches
+
+
+def bitboard_state_transition(
+    current_grid: BitboardGrid,
+    future_grid: BitboardGrid,
+    with_border: bool = False,
+    rule: Rule = CONWAY_RULE,
+    count_activity: bool = True,
+) -> Optional[Activity]:
+    """ Transition between bitboards, matching `state_transition` cell for cell.
+
+    Each cell's 3x3 block sum (itself included) is built with full adders over the row sums of
+    the rows above, at and below it. Equality masks over that sum then select the dead cells at a
+    birth count and the live cells at a survival count plus one.
+
+    Args:
+        current_grid (BitboardGrid): The bitboard holding the current state of the simulation.
+        future_grid (BitboardGrid): The bitboard that will store the next state of the simulation.
+        with_border (bool): Whether to preserve a dead border around the grid.
+        rule (Rule): The compiled rule to apply.
+        count_activity (bool): Whether to count and box the live cells of the next state.
+
+    Returns:
+        Activity: The population, births, deaths and bounding box of the next state, or None
+            when not counted.
+
+    """
+    num_cols, rows = current_grid.num_cols, current_grid.rows
+    num_rows = len(rows)
+    mask = (1 << num_cols) - 1
+    middle_low, middle_high = map(list, zip(*[bitboard_row_sums(row, num_cols, mask) for row in rows]))
+    above_low, above_high = middle_low[-1:] + middle_low[:-1], middle_high[-1:] + middle_high[:-1]
+    below_low, below_high = middle_low[1:] + middle_low[:1], middle_high[1:] + middle_high[:1]
+
+    # The same full adders as one row at a time, applied to every row at once.
+    partial_low = list(map(operator.xor, above_low, middle_low))
+    ones_carry = list(map(
+        operator.or_,
+        map(operator.and_, above_low, middle_low),
+        map(operator.and_, partial_low, below_low),
+    ))
+    partial_high = list(map(operator.xor, above_high, middle_high))
+    twos_sum = list(map(operator.xor, partial_high, below_high))
+    twos_carry = list(map(
+        operator.or_,
+        map(operator.and_, above_high, middle_high),
+        map(operator.and_, partial_high, below_high),
+    ))
+    planes = (
+        list(map(operator.xor, partial_low, below_low)),
+        list(map(operator.xor, twos_sum, ones_carry)),
+        list(map(operator.xor, twos_carry, map(operator.and_, twos_sum, ones_carry))),
+        list(map(operator.and_, twos_carry, map(operator.and_, twos_sum, ones_carry))),
+    )
+    inverted_planes: dict[int, list[int]] = {}
+    future_rows = bitboard_sum_masks(rule.either_block_sums, planes, inverted_planes)
+    if rule.birth_block_sums:
+        future_rows = list(map(operator.or_, future_rows, map(
+            operator.and_,
+            map(operator.invert, rows),
+            bitboard_sum_masks(rule.birth_block_sums, planes, inverted_planes),
+        )))
+    if rule.survival_block_sums:
+        future_rows = list(map(operator.or_, future_rows, map(
+            operator.and_,
+            rows,
+            bitboard_sum_masks(rule.survival_block_sums, planes, inverted_planes),
+        )))
+    if 0 in rule.birth:
+        future_rows = list(map(operator.and_, future_rows, itertools.repeat(mask)))
+    future_grid.rows[:] = future_rows
+
+    if with_border:
+        future_rows = future_grid.rows
+        inner_mask = mask & ~1 & ~(1 << (num_cols - 1))
+        for row_num in range_compat(num_rows):
+            future_rows[row_num] &= inner_mask
+        future_rows[0] = 0
+        future_rows[-1] = 0
+    return bitboard_activity(rows, future_grid.rows) if count_activity else None
+
+
+def bitboard_activity(rows: list[int], future_rows: list[int]) -> Activity:
+    """Count and box the live cells of a bitboard generation with one popcount per row."""
+    population = sum(map(int.bit_count, future_rows))
+    births = sum(map(int.bit_count, map(operator.and_, future_rows, map(operator.invert, rows))))
+    deaths = births + sum(map(int.bit_count, rows)) - population
+    if not population:
+        return Activity(population, births, deaths)
+    top, bottom = count_bounds(future_rows)
+    live_cols = functools.reduce(operator.or_, future_rows)
+    return Activity(
+        population,
+        births,
+        deaths,
+        top,
+        (live_cols & -live_cols).bit_length() - 1,
+        bottom,
+        live_cols.bit_length(),
+    )
+
+
+def sparse_make_grids(
+    num_rows: int, num_cols: int, wrap: bool = True, density: float = DEFAULT_DENSITY
+) -> tuple[SparseGrid, SparseGrid]:
+    """Create the current grid and an empty future grid as live-cell sets."""
+    num_rows, num_cols = int(num_rows), int(num_cols)
+    cells = set()
+    for row_num, row in enumerate(random_bit_rows(num_rows, num_cols, density)):
+        while row:
+            low_bit = row & -row
+            cells.add((row_num, low_bit.bit_length() - 1))
+            row ^= low_bit
+    return SparseGrid(num_rows, num_cols, cells, wrap), SparseGrid(num_rows, num_cols, set(), wrap)
+
+
+def sparse_unbounded_make_grids(
+    num_rows: int, num_cols: int, density: float = DEFAULT_DENSITY
+) -> tuple[SparseGrid, SparseGrid]:
+    """Create live-cell set grids for an unbounded universe seen through a window."""
+    return sparse_make_grids(num_rows, num_cols, wrap=False, density=density)
+
+
+def sparse_from_rows(grid: list[list[int]], wrap: bool = True) -> SparseGrid:
+    """Collect the live cells of a list-of-lists grid into a live-cell set grid."""
+    return SparseGrid(
+        len(grid),
+        len(grid[0]),
+        {(row_num, col_num) for row_num, row in enumerate(grid) for col_num, cell in enumerate(row) if cell},
+        wrap,
+    )
+
+
+def sparse_from_cells(
+    num_rows: int, num_cols: int, cells: Iterable[tuple[int, int]], wrap: bool = True
+) -> SparseGrid:
+    """Create a live-cell set grid, keeping cells outside the window when it does not wrap."""
+    if wrap:
+        cells = ((row_num % num_rows, col_num % num_cols) for row_num, col_num in cells)
+    return SparseGrid(num_rows, num_cols, set(cells), wrap)
+
+
+def sparse_unbounded_from_cells(
+    num_rows: int, num_cols: int, cells: Iterable[tuple[int, int]]
+) -> SparseGrid:
+    """Create a live-cell set grid for an unbounded universe seen through a window."""
+    return sparse_from_cells(num_rows, num_cols, cells, wrap=False)
+
+
+def sparse_to_rows(grid: SparseGrid) -> list[list[int]]:
+    """Render the live cells inside the grid window as list-of-lists rows."""
+    rows = [[0] * grid.num_cols for _ in range_compat(grid.num_rows)]
+    for row_num, col_num in grid.cells:
+        if 0 <= row_num < grid.num_rows and 0 <= col_num < grid.num_cols:
+            rows[row_num][col_num] = 1
+    return rows
+
+
+def sparse_window_rows(
+    grid: SparseGrid, top: int, left: int, bottom: int, right: int
+) -> list[list[int]]:
+    """Render the live cells of a sparse grid inside a window as list-of-lists rows."""
+    rows = [[0] * max(0, right - left) for _ in range_compat(max(0, bottom - top))]
+    for row_num, col_num in grid.cells:
+        if top <= row_num < bottom and left <= col_num < right:
+            rows[row_num - top][col_num - left] = 1
+    return rows
+
+
+def sparse_signature(grid: SparseGrid) -> frozenset[tuple[int, int]]:
+    """Return the live cells of a sparse grid inside its window, for comparing grid states."""
+    if grid.wrap:
+        return frozenset(grid.cells)
+    return frozenset(
+        (row_num, col_num) for row_num, col_num in grid.cells
+        if 0 <= row_num < grid.num_rows and 0 <= col_num < grid.num_cols
+    )
+
+
+def sparse_state_transition(
+    current_grid: SparseGrid,
+    future_grid: SparseGrid,
+    with_border: bool = False,
+    rule: Rule = CONWAY_RULE,
+    count_activity: bool = True,
+) -> Optional[Activity]:
+    """ Transition between live-cell sets, visiting only live cells and their neighbors.
+
+    Args:
+        current_grid (SparseGrid): The live cells of the current state of the simulation.
+        future_grid (SparseGrid): The grid whose live cells will be replaced with the next state.
+        with_border (bool): Whether to preserve a dead border around the grid window.
+        rule (Rule): The compiled rule to apply. Rules with B0 raise a ValueError, since every
+            dead cell far from the live ones would be born.
+        count_activity (bool): Whether to count and box the live cells of the next state.
+
+    Returns:
+        Activity: The population, births and deaths of the next state, and the bounding box of
+            its live cells inside the grid window, or None when not counted.
+
+    """
+    if 0 in rule.birth:
+        raise ValueError('The sparse engines do not support rules with B0')
+    live_cells = current_grid.cells
+    if current_grid.wrap:
+        num_rows, num_cols = current_grid.num_rows, current_grid.num_cols
+        live_counts = Counter(
+            ((row_num + row_offset) % num_rows, (col_num + col_offset) % num_cols)
+            for row_num, col_num in live_cells
+            for row_offset, col_offset in NEIGHBOR_OFFSETS
+        )
+    else:
+        live_counts = Counter(
+            (row_num + row_offset, col_num + col_offset)
+            for row_num, col_num in live_cells
+            for row_offset, col_offset in NEIGHBOR_OFFSETS
+        )
+
+    future_cells = future_grid.cells
+    future_cells.clear()
+    # Looking up the cell's own state only for the counts where it matters beats a table lookup
+    # that needs it for every neighbor.
+    either_counts = rule.birth & rule.survival
+    birth_counts, survival_counts = rule.birth - either_counts, rule.survival - either_counts
+    future_cells.update(
+        cell for cell, live_count in live_counts.items()
+        if live_count in either_counts
+        or live_count in survival_counts and cell in live_cells
+        or live_count in birth_counts and cell not in live_cells
+    )
+    if 0 in rule.survival:
+        future_cells.update(cell for cell in live_cells if cell not in live_counts)
+    if with_border:
+        future_cells.difference_update([
+            (row_num, col_num) for row_num, col_num in future_cells
+            if not 0 < row_num < current_grid.num_rows - 1
+            or not 0 < col_num < current_grid.num_cols - 1
+        ])
+    return sparse_activity(current_grid, future_grid) if count_activity else None
+
+
+def sparse_activity(current_grid: SparseGrid, future_grid: SparseGrid) -> Activity:
+    """Count a sparse generation's live cells from its sets, and box the ones in its window."""
+    live_cells, future_cells = current_grid.cells, future_grid.cells
+    population = len(future_cells)
+    births = len(future_cells.difference(live_cells))
+    deaths = births + len(live_cells) - population
+    window_cells = future_cells if future_grid.wrap else sparse_signature(future_grid)
+    if not window_cells:
+        return Activity(population, births, deaths)
+    live_cols = list(map(operator.itemgetter(1), window_cells))
+    return Activity(
+        population,
+        births,
+        deaths,
+        min(window_cells)[0],
+        min(live_cols),
+        max(window_cells)[0] + 1,
+        max(live_cols) + 1,
+    )
+
+
+class HashLifeNode(object):
+    """A canonical quadtree node; equal subtrees share one node, so identity is equality."""
+
+    __slots__ = ('level', 'nw', 'ne', 'sw', 'se', 'population')
+
+    def __init__(
+        self,
+        level: int,
+        nw: Optional['HashLifeNode'],
+        ne: Optional['HashLifeNode'],
+        sw: Optional['HashLifeNode'],
+        se: Optional['HashLifeNode'],
+        population: int,
+    ) -> None:
+        self.level = level
+        self.nw = nw
+        self.ne = ne
+        self.sw = sw
+        self.se = se
+        self.population = population
+
+
+class HashLife(object):
+    """ A HashLife universe of canonical quadtree nodes with memoized RESULT nodes.
+
+    A node of level `k` covers a 2**k square. Its RESULT for a step exponent `j` is the centered
+    2**(k-1) square after 2**j generations, and is cached per (node, j). The universe is unbounded:
+    a grid passed to `advance` is a window onto an otherwise empty plane, so it does not wrap.
+    When the node table outgrows `max_nodes`, nodes unreachable from the pattern being advanced
+    are dropped along with the RESULT cache. Rules with B0 are rejected, since empty space would
+    not stay empty.
+    """
+
+    def __init__(self, max_nodes: int = HASHLIFE_MAX_NODES, rule: Rule = CONWAY_RULE) -> None:
+        if 0 in rule.birth:
+            raise ValueError('HashLife does not support rules with B0')
+        self.max_nodes = max_nodes
+        self.rule = rule
+        self.dead_leaf = HashLifeNode(0, None, None, None, None, 0)
+        self.live_leaf = HashLifeNode(0, None, None, None, None, 1)
+        self.nodes: dict[tuple[HashLifeNode, ...], HashLifeNode] = {}
+        self.results: dict[tuple[HashLifeNode, int], HashLifeNode] = {}
+        self.empty_nodes = [self.dead_leaf]
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.collections = 0
+
+    def join(
+        self, nw: HashLifeNode, ne: HashLifeNode, sw: HashLifeNode, se: HashLifeNode
+    ) -> HashLifeNode:
+        """Return the canonical node with the given quadrants."""
+        key = (nw, ne, sw, se)
+        node = self.nodes.get(key)
+        if node is None:
+            node = HashLifeNode(
+                nw.level + 1,
+                nw,
+                ne,
+                sw,
+                se,
+                nw.population + ne.population + sw.population + se.population,
+            )
+            self.nodes[key] = node
+        return node
+
+    def empty(self, level: int) -> HashLifeNode:
+        """Return the canonical empty node of a level."""
+        while len(self.empty_nodes) <= level:
+            empty_node = self.empty_nodes[-1]
+            self.empty_nodes.append(self.join(empty_node, empty_node, empty_node, empty_node))
+        return self.empty_nodes[level]
+
+    def centre(self, node: HashLifeNode) -> HashLifeNode:
+        """Return the node one level up with `node` in its middle and empty space around it."""
+        empty_node = self.empty(node.level - 1)
+        return self.join(
+            self.join(empty_node, empty_node, empty_node, node.nw),
+            self.join(empty_node, empty_node, node.ne, empty_node),
+            self.join(empty_node, node.sw, empty_node, empty_node),
+            self.join(node.se, empty_node, empty_node, empty_node),
+        )
+
+    def is_padded(self, node: HashLifeNode) -> bool:
+        """Report whether all live cells of a level 3+ node lie in its central quarter."""
+        return (
+            node.nw.population == node.nw.se.se.population
+            and node.ne.population == node.ne.sw.sw.population
+            and node.sw.population == node.sw.ne.ne.population
+            and node.se.population == node.se.nw.nw.population
+        )
+
+    def step_level_two(self, node: HashLifeNode) -> HashLifeNode:
+        """Compute the centered 2x2 of a 4x4 node one generation ahead by brute force."""
+        cells = [
+            [node.nw.nw, node.nw.ne, node.ne.nw, node.ne.ne],
+            [node.nw.sw, node.nw.se, node.ne.sw, node.ne.se],
+            [node.sw.nw, node.sw.ne, node.se.nw, node.se.ne],
+            [node.sw.sw, node.sw.se, node.se.sw, node.se.se],
+        ]
+        neighbor_table = self.rule.neighbor_table
+        next_cells = []
+        for row_num, col_num in ((1, 1), (1, 2), (2, 1), (2, 2)):
+            live_count = sum(
+                cells[row_num + row_offset][col_num + col_offset].population
+                for row_offset, col_offset in NEIGHBOR_OFFSETS
+            )
+            alive = cells[row_num][col_num].population
+            next_cells.append(
+                self.live_leaf if neighbor_table[9 * alive + live_count] else self.dead_leaf
+            )
+        return self.join(*next_cells)
+
+    def successor(self, node: HashLifeNode, step_exponent: int) -> HashLifeNode:
+        """ Return the RESULT of a level 2+ node after 2**step_exponent generations.
+
+        Args:
+            node (HashLifeNode): The node to advance.
+            step_exponent (int): The base-2 logarithm of the generation count, clamped to
+                `node.level - 2`.
+
+        Returns:
+            HashLifeNode: The centered node one level down, advanced in time.
+
+        """
+        step_exponent = min(step_exponent, node.level - 2)
+        key = (node, step_exponent)
+        result = self.results.get(key)
+        if result is not None:
+            self.cache_hits += 1
+            return result
+        self.cache_misses += 1
+
+        if node.population == 0:
+            result = self.empty(node.level - 1)
+        elif node.level == 2:
+            result = self.step_level_two(node)
+        else:
+            nw, ne, sw, se = node.nw, node.ne, node.sw, node.se
+            join, successor = self.join, self.successor
+            c1 = successor(nw, step_exponent)
+            c2 = successor(join(nw.ne, ne.nw, nw.se, ne.sw), step_exponent)
+            c3 = successor(ne, step_exponent)
+            c4 = successor(join(nw.sw, nw.se, sw.nw, sw.ne), step_exponent)
+            c5 = successor(join(nw.se, ne.sw, sw.ne, se.nw), step_exponent)
+            c6 = successor(join(ne.sw, ne.se, se.nw, se.ne), step_exponent)
+            c7 = successor(sw, step_exponent)
+            c8 = successor(join(sw.ne, se.nw, sw.se, se.sw), step_exponent)
+            c9 = successor(se, step_exponent)
+            if step_exponent < node.level - 2:
+                # The nine sub-results are already 2**j generations ahead; just reassemble.
+                result = join(
+                    join(c1.se, c2.sw, c4.ne, c5.nw),
+                    join(c2.se, c3.sw, c5.ne, c6.nw),
+                    join(c4.se, c5.sw, c7.ne, c8.nw),
+                    join(c5.se, c6.sw, c8.ne, c9.nw),
+                )
+            else:
+                # Full speed: two half-steps of 2**(k-3) generations each.
+                result = join(
+                    successor(join(c1, c2, c4, c5), step_exponent),
+                    successor(join(c2, c3, c5, c6), step_exponent),
+                    successor(join(c4, c5, c7, c8), step_exponent),
+                    successor(join(c5, c6, c8, c9), step_exponent),
+                )
+
+        self.results[key] = result
+        return result
+
+    def collect_garbage(self, root: HashLifeNode) -> None:
+        """Keep only the nodes reachable from `root` and the empty nodes, and clear RESULTs."""
+        reachable: dict[tuple[HashLifeNode, ...], HashLifeNode] = {}
+        pending = [root] + self.empty_nodes[1:]
+        while pending:
+            node = pending.pop()
+            if node.level == 0:
+                continue
+            key = (node.nw, node.ne, node.sw, node.se)
+            if key in reachable:
+                continue
+            reachable[key] = node
+            pending.extend(key)
+        self.nodes = reachable
+        self.results = {}
+        self.collections += 1
+
+    def node_from_rows(
+        self, grid: list[list[int]], level: int, top: int = 0, left: int = 0
+    ) -> HashLifeNode:
+        """Build the node of a level whose top-left corner is at (top, left) of a grid."""
+        if top >= len(grid) or left >= len(grid[0]):
+            return self.empty(level)
+        if level == 0:
+            return self.live_leaf if grid[top][left] else self.dead_leaf
+        half = 1 << (level - 1)
+        return self.join(
+            self.node_from_rows(grid, level - 1, top, left),
+            self.node_from_rows(grid, level - 1, top, left + half),
+            self.node_from_rows(grid, level - 1, top + half, left),
+            self.node_from_rows(grid, level - 1, top + half, left + half),
+        )
+
+    def node_from_cells(
+        self, cells: list[tuple[int, int]], level: int, top: int, left: int
+    ) -> HashLifeNode:
+        """Build the node of a level whose top-left corner is at (top, left) from its live cells."""
+        if not cells:
+            return self.empty(level)
+        if level == 0:
+            return self.live_leaf
+        half = 1 << (level - 1)
+        middle_row, middle_col = top + half, left + half
+        quadrants: tuple[list[tuple[int, int]], ...] = ([], [], [], [])
+        for cell in cells:
+            quadrants[2 * (cell[0] >= middle_row) + (cell[1] >= middle_col)].append(cell)
+        return self.join(
+            self.node_from_cells(quadrants[0], level - 1, top, left),
+            self.node_from_cells(quadrants[1], level - 1, top, middle_col),
+            self.node_from_cells(quadrants[2], level - 1, middle_row, left),
+            self.node_from_cells(quadrants[3], level - 1, middle_row, middle_col),
+        )
+
+    def write_cells(
+        self, node: HashLifeNode, top: int, left: int, cells: set[tuple[int, int]]
+    ) -> None:
+        """Add the live cells of a node at (top, left) to a set of (row, col) cells."""
+        if node.population == 0:
+            return
+        if node.level == 0:
+            cells.add((top, left))
+            return
+        half = 1 << (node.level - 1)
+        self.write_cells(node.nw, top, left, cells)
+        self.write_cells(node.ne, top, left + half, cells)
+        self.write_cells(node.sw, top + half, left, cells)
+        self.write_cells(node.se, top + half, left + half, cells)
+
+    def write_rows(
+        self, node: HashLifeNode, top: int, left: int, rows: list[list[int]]
+    ) -> None:
+        """Set the live cells of a node at (top, left) that fall inside `rows` to 1."""
+        size = 1 << node.level
+        if (
+            node.population == 0
+            or top >= len(rows)
+            or left >= len(rows[0])
+            or top + size <= 0
+            or left + size <= 0
+        ):
+            return
+        if node.level == 0:
+            rows[top][left] = 1
+            return
+        half = size >> 1
+        self.write_rows(node.nw, top, left, rows)
+        self.write_rows(node.ne, top, left + half, rows)
+        self.write_rows(node.sw, top + half, left, rows)
+        self.write_rows(node.se, top + half, left + half, rows)
+
+    def advance_node(
+        self, node: HashLifeNode, top: int, left: int, generations: int
+    ) -> tuple[HashLifeNode, int, int]:
+        """ Advance a node whose top-left corner is at (top, left) by any number of generations.
+
+        Args:
+            node (HashLifeNode): The node holding the pattern.
+            top (int): The row of the node's top-left corner.
+            left (int): The column of the node's top-left corner.
+            generations (int): Number of generations to advance.
+
+        Returns:
+            tuple: The advanced node and the row and column of its top-left corner.
+
+        """
+        step_exponent = 0
+        while generations:
+            if generations & 1:
+                while node.level < max(3, step_exponent + 2) or not self.is_padded(node):
+                    half = 1 << (node.level - 1)
+                    node, top, left = self.centre(node), top - half, left - half
+                # The RESULT of the centred node covers exactly the area of `node` again.
+                node = self.successor(self.centre(node), step_exponent)
+                if len(self.nodes) > self.max_nodes:
+                    self.collect_garbage(node)
+            generations >>= 1
+            step_exponent += 1
+        return node, top, left
+
+    def advance(self, grid: list[list[int]], generations: int) -> list[list[int]]:
+        """ Advance a grid window by any number of generations.
+
+        Args:
+            grid (list): A 2-d grid represented by a list of lists.
+            generations (int): Number of generations to advance.
+
+        Returns:
+            list: The same window of the universe after `generations` generations.
+
+        """
+        level = max(1, (max(len(grid), len(grid[0])) - 1).bit_length())
+        node, top, left = self.advance_node(self.node_from_rows(grid, level), 0, 0, generations)
+        rows = [[0] * len(grid[0]) for _ in range_compat(len(grid))]
+        self.write_rows(node, top, left, rows)
+        return rows
+
+    def stats(self) -> dict[str, int]:
+        """Return node-count and RESULT cache statistics for tuning memory use."""
+        return {
+            'nodes': len(self.nodes),
+            'cached_results': len(self.results),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'collections': self.collections,
+        }
+
+
+def hashlife_advance(
+    grid: list[list[int]],
+    generations: int,
+    universe: Optional[HashLife] = None,
+    rule: Rule = CONWAY_RULE,
+) -> list[list[int]]:
+    """Advance a grid window of an unbounded universe with HashLife."""
+    return (HashLife(rule=rule) if universe is None else universe).advance(grid, generations)
+
+
+def sparse_unbounded_step(
+    current_grid: SparseGrid,
+    future_grid: SparseGrid,
+    generations: int,
+    rule: Rule = CONWAY_RULE,
+) -> None:
+    """ Jump the live cells of an unbounded sparse grid several generations ahead with HashLife.
+
+    The HashLife universe of the rule is kept in HASHLIFE_UNIVERSES, so its memoized RESULT
+    nodes carry over from one jump to the next.
+
+    Args:
+        current_grid (SparseGrid): The live cells of the current state of the simulation.
+        future_grid (SparseGrid): The grid whose live cells will be replaced with the state
+            `generations` generations ahead.
+        generations (int): Number of generations to advance.
+        rule (Rule): The compiled rule to apply. Rules with B0 raise a ValueError.
+
+    """
+    universe = HASHLIFE_UNIVERSES.get(rule)
+    if universe is None:
+        universe = HASHLIFE_UNIVERSES[rule] = HashLife(rule=rule)
+    live_cells = current_grid.cells
+    future_cells = future_grid.cells
+    future_cells.clear()
+    if not live_cells:
+        return
+    live_rows = list(map(operator.itemgetter(0), live_cells))
+    live_cols = list(map(operator.itemgetter(1), live_cells))
+    top, left = min(live_rows), min(live_cols)
+    level = max(1, max(max(live_rows) - top, max(live_cols) - left).bit_length())
+    node, top, left = universe.advance_node(
+        universe.node_from_cells(list(live_cells), level, top, left), top, left, generations
+    )
+    universe.write_cells(node, top, left, future_cells)
+
+
+def active_make_grids(
+    num_rows: int, num_cols: int, density: float = DEFAULT_DENSITY
+) -> tuple[ActiveGrid, ActiveGrid]:
+    """Create the current grid and an empty future grid for the active-region engine."""
+    current_grid, future_grid = make_grids(num_rows, num_cols, density)
+    return ActiveGrid(current_grid), ActiveGrid(future_grid)
+
+
+def changed_cells_between(
+    previous_grid: list[list[int]], next_grid: list[list[int]]
+) -> set[tuple[int, int]]:
+    """Collect the cells that differ between two grids, skipping rows that are equal."""
+    changed_cells = set()
+    for row_num, (previous_row, next_row) in enumerate(zip(previous_grid, next_grid)):
+        if previous_row != next_row:
+            changed_cells.update(
+                (row_num, col_num)
+                for col_num, (previous_cell, next_cell) in enumerate(zip(previous_row, next_row))
+                if previous_cell != next_cell
+            )
+    return changed_cells
+
+
+def active_state_transition(
+    current_grid: ActiveGrid,
+    future_grid: ActiveGrid,
+    with_border: bool = False,
+    rule: Rule = CONWAY_RULE,
+    count_activity: bool = True,
+) -> Optional[Activity]:
+    """ Transition between grids, re-evaluating only cells near the last generation's changes.
+
+    The future grid must hold the generation before the current one (as it does when the two
+    grids are swapped every generation), since cells that are not re-evaluated keep its values.
+    A full sweep is used instead when the changes are unknown or cover too much of the grid.
+
+    Args:
+        current_grid (ActiveGrid): The current state of the simulation and its changed cells.
+        future_grid (ActiveGrid): The grid that will store the next state of the simulation.
+        with_border (bool): Whether to preserve a dead border around the grid.
+        rule (Rule): The compiled rule to apply.
+        count_activity (bool): Whether to count and box the live cells of the next state. When
+            not, the counts are rebuilt from the whole grid the next time they are wanted.
+
+    Returns:
+        Activity: The population, births, deaths and bounding box of the next state, updated from
+            the changed cells and the live cells per row and column, or None when not counted.
+
+    """
+    cells, future_cells = current_grid.cells, future_grid.cells
+    num_rows, num_cols = len(cells), len(cells[0])
+    changed_cells = current_grid.changed_cells
+
+    if (
+        changed_cells is None
+        or len(changed_cells) > num_rows * num_cols * ACTIVE_REGION_FULL_SWEEP_FRACTION
+    ):
+        future_grid.activity = state_transition(
+            cells, future_cells, with_border, rule, count_activity
+        )
+        future_grid.changed_cells = changed_cells_between(cells, future_cells)
+        future_grid.evaluated_count = num_rows * num_cols
+        if count_activity:
+            future_grid.row_counts = list(map(sum, future_cells))
+            future_grid.col_counts = list(map(sum, zip(*future_cells)))
+        return future_grid.activity
+
+    candidate_cells = {
+        ((row_num + row_offset) % num_rows, (col_num + col_offset) % num_cols)
+        for row_num, col_num in changed_cells
+        for row_offset, col_offset in ((0, 0),) + NEIGHBOR_OFFSETS
+    }
+    if with_border:
+        candidate_cells = {
+            (row_num, col_num) for row_num, col_num in candidate_cells
+            if 0 < row_num < num_rows - 1 and 0 < col_num < num_cols - 1
+        }
+
+    next_changed_cells = set()
+    for row_num, col_num in candidate_cells:
+        living_status = cell_transition(row_num, col_num, cells, rule)
+        future_cells[row_num][col_num] = living_status
+        if living_status != cells[row_num][col_num]:
+            next_changed_cells.add((row_num, col_num))
+    future_grid.changed_cells = next_changed_cells
+    future_grid.evaluated_count = len(candidate_cells)
+    future_grid.activity = None
+    if not count_activity:
+        return None
+
+    if current_grid.activity is None:
+        current_grid.activity = rows_activity(cells)
+        current_grid.row_counts = list(map(sum, cells))
+        current_grid.col_counts = list(map(sum, zip(*cells)))
+    row_counts, col_counts = list(current_grid.row_counts), list(current_grid.col_counts)
+    births = 0
+    for row_num, col_num in next_changed_cells:
+        change = 2 * future_cells[row_num][col_num] - 1
+        row_counts[row_num] += change
+        col_counts[col_num] += change
+        births += change > 0
+    deaths = len(next_changed_cells) - births
+    top, bottom = count_bounds(row_counts)
+    left, right = count_bounds(col_counts)
+    future_grid.row_counts, future_grid.col_counts = row_counts, col_counts
+    future_grid.activity = Activity(
+        current_grid.activity.population + births - deaths,
+        births,
+        deaths,
+        top,
+        left,
+        bottom,
+        right,
+    )
+    return future_grid.activity
+
+
+def active_from_cells(
+    num_rows: int, num_cols: int, cells: Iterable[tuple[int, int]]
+) -> ActiveGrid:
+    """Create an active-region grid with the given live cells."""
+    return ActiveGrid(list_from_cells(num_rows, num_cols, cells))
+
+
+def active_to_rows(grid: ActiveGrid) -> list[list[int]]:
+    """Return the list-of-lists cells of an active-region grid."""
+    return grid.cells
+
+
+def active_stats(grid: ActiveGrid) -> dict[str, int]:
+    """Report how many cells were evaluated and changed to produce a grid."""
+    return {
+        'evaluated_cells': grid.evaluated_count,
+        'changed_cells': len(grid.changed_cells or ()),
+    }
+
+
+def random_cell_bytes(num_cells: int, density: float = DEFAULT_DENSITY) -> bytes:
+    """Return `num_cells` random bytes, each 1 with probability `density` and otherwise 0."""
+    if num_cells == 0:
+        return b''
+    return format(random_bits(num_cells, density), '0{}b'.format(num_cells)).encode(
+        'ascii'
+    ).translate(BIT_CHARACTER_TO_CELL)
+
+
+def byte_row_transition(
+    above_row: bytes, row: bytes, below_row: bytes, rule_table: bytes = CONWAY_RULE.lane_table
+) -> bytes:
+    """ Compute the next state of a row stored as one 0/1 byte per cell.
+
+    The three rows are read as little-endian ints so that each cell owns one byte lane; the 3x3
+    block sums then fit in their lanes without carries, and `rule_table` maps each lane's
+    `block sum + 16 * alive` to the next state.
+
+    Args:
+        above_row (bytes): The row above, wrapped around at the top edge.
+        row (bytes): The row to transition.
+        below_row (bytes): The row below, wrapped around at the bottom edge.
+        rule_table (bytes): A 256-entry translation table from lane values to cell states, such as
+            a rule's `lane_table`.
+
+    Returns:
+        bytes: The next state of `row`, one 0/1 byte per cell.
+
+    """
+    num_cols = len(row)
+    lane_mask = (1 << (8 * num_cols)) - 1
+    top_lane_shift = 8 * (num_cols - 1)
+    block_sum = 0
+    for lane_row in (above_row, row, below_row):
+        cells = int.from_bytes(lane_row, 'little')
+        block_sum += (
+            cells
+            + (((cells << 8) | (cells >> top_lane_shift)) & lane_mask)
+            + ((cells >> 8) | ((cells & 0xFF) << top_lane_shift))
+        )
+    center = int.from_bytes(row, 'little')
+    return (block_sum + (center << 4)).to_bytes(num_cols, 'little').translate(rule_table)
+
+
+def tile_transition(
+    current_cells: Any,
+    future_cells: Any,
+    num_rows: int,
+    num_cols: int,
+    row_start: int,
+    row_end: int,
+    with_border: bool = False,
+    rule_table: bytes = CONWAY_RULE.lane_table,
+    count_activity: bool = True,
+) -> Optional[Activity]:
+    """ Transition one band of rows after copying it and its one-row halos out of the buffer.
+
+    Args:
+        current_cells (memoryview): The current grid, one 0/1 byte per cell, row-major.
+        future_cells (memoryview): The buffer that receives the band's next state.
+        num_rows (int): Number of rows in the grid.
+        num_cols (int): Number of columns in the grid.
+        row_start (int): First row of the band.
+        row_end (int): Row after the last row of the band.
+        with_border (bool): Whether to preserve a dead border around the grid.
+        rule_table (bytes): The lane table of the rule to apply.
+        count_activity (bool): Whether to count and box the live cells of the band's next state.
+
+    Returns:
+        Activity: The population, births, deaths and bounding box of the band's next state, or
+            None when not counted.
+
+    """
+    halo_above = bytes(current_cells[((row_start - 1) % num_rows) * num_cols:][:num_cols])
+    band = bytes(current_cells[row_start * num_cols:row_end * num_cols])
+    halo_below = bytes(current_cells[(row_end % num_rows) * num_cols:][:num_cols])
+    rows = [halo_above] + [
+        band[offset:offset + num_cols] for offset in range_compat(0, len(band), num_cols)
+    ] + [halo_below]
+
+    next_rows = []
+    population = births = deaths = 0
+    top = bottom = left = right = 0
+    for index in range_compat(1, len(rows) - 1):
+        row = rows[index]
+        next_row = byte_row_transition(rows[index - 1], row, rows[index + 1], rule_table)
+        row_num = row_start + index - 1
+        if with_border:
+            if row_num == 0 or row_num == num_rows - 1:
+                next_row = bytes(num_cols)
+            else:
+                next_row = b'\x00' + next_row[1:-1] + b'\x00'
+        next_rows.append(next_row)
+        if not count_activity:
+            continue
+        row_population = next_row.count(1)
+        if row_population:
+            if not population:
+                top, left, right = row_num, num_cols, 0
+            population += row_population
+            bottom = row_num + 1
+            left = min(left, next_row.index(1))
+            right = max(right, next_row.rindex(1) + 1)
+        if next_row != row:
+            # Each cell is a 0/1 byte, so the births are the bits set in the next row only.
+            row_births = (
+                int.from_bytes(next_row, 'little') & ~int.from_bytes(row, 'little')
+            ).bit_count()
+            births += row_births
+            deaths += row_births + row.count(1) - row_population
+    future_cells[row_start * num_cols:row_end * num_cols] = b''.join(next_rows)
+    if not count_activity:
+        return None
+    return Activity(population, births, deaths, top, left, bottom, right)
+
+
+def attach_shared_memory(name: str, keep_names: tuple[str, ...]) -> shared_memory.SharedMemory:
+    """Attach to a shared memory block in a pool worker, closing blocks no longer in use."""
+    if name not in ATTACHED_SHARED_MEMORY:
+        for attached_name in list(ATTACHED_SHARED_MEMORY):
+            if attached_name not in keep_names:
+                ATTACHED_SHARED_MEMORY.pop(attached_name).close()
+        ATTACHED_SHARED_MEMORY[name] = shared_memory.SharedMemory(name=name)
+    return ATTACHED_SHARED_MEMORY[name]
+
+
+def shared_tile_transition(
+    task: tuple[str, str, int, int, int, int, bool, bytes, bool]
+) -> Optional[Activity]:
+    """Transition one band of shared memory grids inside a pool worker."""
+    (
+        current_name,
+        future_name,
+        num_rows,
+        num_cols,
+        row_start,
+        row_end,
+        with_border,
+        rule_table,
+        count_activity,
+    ) = task
+    names = (current_name, future_name)
+    return tile_transition(
+        attach_shared_memory(current_name, names).buf,
+        attach_shared_memory(future_name, names).buf,
+        num_rows,
+        num_cols,
+        row_start,
+        row_end,
+        with_border,
+        rule_table,
+        count_activity,
+    )
+
+
+def get_tile_pool(workers: int) -> Any:
+    """Return the persistent process pool for a worker count, starting it on first use."""
+    if workers not in TILE_POOLS:
+        if not TILE_POOLS:
+            atexit.register(close_tile_pools)
+        TILE_POOLS[workers] = multiprocessing.Pool(workers)
+    return TILE_POOLS[workers]
+
+
+def close_tile_pools() -> None:
+    """Stop every persistent tile pool."""
+    while TILE_POOLS:
+        _, pool = TILE_POOLS.popitem()
+        pool.terminate()
+        pool.join()
+
+
+def row_bands(num_rows: int, tile_rows: int) -> list[tuple[int, int]]:
+    """Split the rows of a grid into bands of at most `tile_rows` rows."""
+    return [
+        (row_start, min(row_start + tile_rows, num_rows))
+        for row_start in range_compat(0, num_rows, tile_rows)
+    ]
+
+
+def shared_empty_grid(
+    num_rows: int, num_cols: int, workers: Optional[int] = None, tile_rows: Optional[int] = None
+) -> SharedGrid:
+    """Create an all-dead grid in new shared memory, which the OS hands out zero-filled."""
+    num_rows, num_cols = int(num_rows), int(num_cols)
+    workers = workers or os.cpu_count() or 1
+    tile_rows = tile_rows or max(1, -(-num_rows // (workers * PARALLEL_BANDS_PER_WORKER)))
+    memory = shared_memory.SharedMemory(create=True, size=max(1, num_rows * num_cols))
+    return SharedGrid(num_rows, num_cols, memory, workers, tile_rows)
+
+
+def shared_make_grids(
+    num_rows: int,
+    num_cols: int,
+    workers: Optional[int] = None,
+    tile_rows: Optional[int] = None,
+    density: float = DEFAULT_DENSITY,
+) -> tuple[SharedGrid, SharedGrid]:
+    """ Create the current grid and an empty future grid in shared memory.
+
+    Args:
+        num_rows (int): Number of rows in the grid.
+        num_cols (int): Number of columns in the grid.
+        workers (int): Number of pool processes, defaulting to the CPU count.
+        tile_rows (int): Rows per band, defaulting to four bands per worker.
+        density (float): Probability that each cell starts alive.
+
+    Returns:
+        tuple: The current and future shared grids.
+
+    """
+    current_grid = shared_empty_grid(num_rows, num_cols, workers, tile_rows)
+    future_grid = shared_empty_grid(num_rows, num_cols, workers, tile_rows)
+    num_cells = current_grid.num_rows * current_grid.num_cols
+    current_grid.memory.buf[:num_cells] = random_cell_bytes(num_cells, density)
+    return current_grid, future_grid
+
+
+def shared_state_transition(
+    current_grid: SharedGrid,
+    future_grid: SharedGrid,
+    with_border: bool = False,
+    rule: Rule = CONWAY_RULE,
+    count_activity: bool = True,
+) -> Optional[Activity]:
+    """ Transition between shared memory grids, one band of rows per pool task.
+
+    Args:
+        current_grid (SharedGrid): The shared grid holding the current state of the simulation.
+        future_grid (SharedGrid): The shared grid that will store the next state of the simulation.
+        with_border (bool): Whether to preserve a dead border around the grid.
+        rule (Rule): The compiled rule to apply.
+        count_activity (bool): Whether to count and box the live cells of the next state.
+
+    Returns:
+        Activity: The population, births, deaths and bounding box of the next state, merged from
+            those of the bands, or None when not counted.
+
+    """
+    num_rows, num_cols = current_grid.num_rows, current_grid.num_cols
+    bands = row_bands(num_rows, current_grid.tile_rows)
+    if current_grid.workers == 1:
+        band_activities = [
+            tile_transition(
+                current_grid.memory.buf,
+                future_grid.memory.buf,
+                num_rows,
+                num_cols,
+                row_start,
+                row_end,
+                with_border,
+                rule.lane_table,
+                count_activity,
+            )
+            for row_start, row_end in bands
+        ]
+    else:
+        band_activities = get_tile_pool(current_grid.workers).map(shared_tile_transition, [
+            (
+                current_grid.memory.name,
+                future_grid.memory.name,
+                num_rows,
+                num_cols,
+                row_start,
+                row_end,
+                with_border,
+                rule.lane_table,
+                count_activity,
+            )
+            for row_start, row_end in bands
+        ])
+    return merge_activity(band_activities) if count_activity else None
+
+
+def shared_from_rows(
+    grid: list[list[int]], workers: Optional[int] = None, tile_rows: Optional[int] = None
+) -> SharedGrid:
+    """Copy a list-of-lists grid into a new shared memory grid."""
+    shared_grid = shared_empty_grid(len(grid), len(grid[0]), workers, tile_rows)
+    shared_grid.memory.buf[:len(grid) * len(grid[0])] = bytes(
+        cell for row in grid for cell in row
+    )
+    return shared_grid
+
+
+def shared_from_cells(
+    num_rows: int,
+    num_cols: int,
+    cells: Iterable[tuple[int, int]],
+    workers: Optional[int] = None,
+    tile_rows: Optional[int] = None,
+) -> SharedGrid:
+    """Create a shared memory grid with the given live cells."""
+    shared_grid = shared_empty_grid(num_rows, num_cols, workers, tile_rows)
+    memory = shared_grid.memory.buf
+    for row_num, col_num in cells:
+        memory[row_num % num_rows * num_cols + col_num % num_cols] = 1
+    return shared_grid
+
+
+def shared_to_rows(grid: SharedGrid) -> list[list[int]]:
+    """Copy a shared memory grid out to list-of-lists rows."""
+    cells = grid.memory.buf
+    return [
+        list(cells[row_num * grid.num_cols:(row_num + 1) * grid.num_cols])
+        for row_num in range_compat(grid.num_rows)
+    ]
+
+
+def shared_window_rows(
+    grid: SharedGrid, top: int, left: int, bottom: int, right: int
+) -> list[list[int]]:
+    """Copy the cells of a shared memory grid inside a window out to list-of-lists rows."""
+    cells = grid.memory.buf
+    return [
+        list(cells[row_num * grid.num_cols + left:row_num * grid.num_cols + right])
+        for row_num in range_compat(top, bottom)
+    ]
+
+
+def shared_signature(grid: SharedGrid) -> bytes:
+    """Return the cells of a shared memory grid as bytes, for comparing grid states."""
+    return bytes(grid.memory.buf[:grid.num_rows * grid.num_cols])
+
+
+def shared_release(grid: SharedGrid) -> None:
+    """Close and unlink the shared memory behind a grid."""
+    grid.memory.close()
+    grid.memory.unlink()
+
+
+def parallel_speedup(
+    num_rows: int,
+    num_cols: int,
+    generations: int,
+    workers: Optional[int] = None,
+    tile_rows: Optional[int] = None,
+) -> dict[str, float]:
+    """ Time the tiled engine in one process and across the pool on the same random grid.
+
+    Args:
+        num_rows (int): Number of rows in the grid.
+        num_cols (int): Number of columns in the grid.
+        generations (int): Number of generations to time.
+        workers (int): Number of pool processes, defaulting to the CPU count.
+        tile_rows (int): Rows per band, defaulting to four bands per worker.
+
+    Returns:
+        dict: The worker count, both wall times in seconds and the speedup.
+
+    """
+    parallel_grids = shared_make_grids(num_rows, num_cols, workers, tile_rows)
+    serial_grids = shared_make_grids(num_rows, num_cols, 1, parallel_grids[0].tile_rows)
+    serial_grids[0].memory.buf[:] = parallel_grids[0].memory.buf
+    timings = []
+    try:
+        for current_grid, future_grid in (serial_grids, parallel_grids):
+            shared_state_transition(current_grid, future_grid)
+            started_at = time.perf_counter()
+            for _ in range_compat(generations):
+                shared_state_transition(current_grid, future_grid)
+                current_grid, future_grid = future_grid, current_grid
+            timings.append(time.perf_counter() - started_at)
+    finally:
+        for grid in serial_grids + parallel_grids:
+            shared_release(grid)
+    return {
+        'workers': parallel_grids[0].workers,
+        'serial_seconds': timings[0],
+        'parallel_seconds': timings[1],
+        'speedup': timings[0] / timings[1] if timings[1] else 0.0,
+    }
+
+
+def flat_empty_grid(num_rows: int, num_cols: int, padded: bool = True) -> FlatGrid:
+    """Create an all-dead flat grid, with a one-cell padding ring unless `padded` is False."""
+    num_rows, num_cols = int(num_rows), int(num_cols)
+    padding = 1 if padded else 0
+    stride = num_cols + 2 * padding
+    return FlatGrid(
+        num_rows, num_cols, stride, padding, bytearray(stride * (num_rows + 2 * padding))
+    )
+
+
+def flat_row_offsets(grid: FlatGrid) -> range:
+    """Return the buffer offset of the first cell of each row of a flat grid."""
+    first_offset = grid.padding * (grid.stride + 1)
+    return range_compat(first_offset, first_offset + grid.num_rows * grid.stride, grid.stride)
+
+
+def flat_rows(grid: FlatGrid) -> list[memoryview]:
+    """Return a view of each row of a flat grid, sharing its buffer."""
+    cells = memoryview(grid.cells)
+    return [cells[offset:offset + grid.num_cols] for offset in flat_row_offsets(grid)]
+
+
+def flat_wrap_padding(grid: FlatGrid) -> None:
+    """Copy the opposite edges of a padded flat grid into its padding ring, rows first."""
+    if not grid.padding:
+        return
+    cells, stride = grid.cells, grid.stride
+    last_row_offset = grid.num_rows * stride
+    cells[:stride] = cells[last_row_offset:last_row_offset + stride]
+    cells[last_row_offset + stride:] = cells[stride:2 * stride]
+    cells[::stride] = cells[grid.num_cols::stride]
+    cells[grid.num_cols + 1::stride] = cells[1::stride]
+
+
+def flat_clear_border(grid: FlatGrid) -> None:
+    """Kill the cells on the edges of a flat grid, leaving its padding ring alone."""
+    cells, num_rows, num_cols = grid.cells, grid.num_rows, grid.num_cols
+    offsets = flat_row_offsets(grid)
+    first_offset, last_offset = offsets[0], offsets[-1]
+    cells[first_offset:first_offset + num_cols] = bytes(num_cols)
+    cells[last_offset:last_offset + num_cols] = bytes(num_cols)
+    cells[first_offset:last_offset + 1:grid.stride] = bytes(num_rows)
+    cells[first_offset + num_cols - 1:last_offset + num_cols:grid.stride] = bytes(num_rows)
+
+
+def flat_refill(
+    current_grid: FlatGrid, future_grid: FlatGrid, density: float = DEFAULT_DENSITY
+) -> None:
+    """Refill the current flat grid with random cells in place.
+
+    The future grid is left as it is, since the next transition overwrites all of it.
+    """
+    num_cols, cells = current_grid.num_cols, current_grid.cells
+    row_format = '0{}b'.format(num_cols)
+    for offset, row in zip(
+        flat_row_offsets(current_grid),
+        random_bit_rows(current_grid.num_rows, num_cols, density),
+    ):
+        cells[offset:offset + num_cols] = format(row, row_format)[::-1].encode(
+            'ascii'
+        ).translate(BIT_CHARACTER_TO_CELL)
+    flat_wrap_padding(current_grid)
+
+
+def flat_make_grids(
+    num_rows: int, num_cols: int, density: float = DEFAULT_DENSITY, padded: bool = True
+) -> tuple[FlatGrid, FlatGrid]:
+    """Create the current grid and an empty future grid as flat grids."""
+    current_grid = flat_empty_grid(num_rows, num_cols, padded)
+    future_grid = flat_empty_grid(num_rows, num_cols, padded)
+    flat_refill(current_grid, future_grid, density)
+    return current_grid, future_grid
+
+
+def flat_from_cells(
+    num_rows: int, num_cols: int, cells: Iterable[tuple[int, int]], padded: bool = True
+) -> FlatGrid:
+    """Create a flat grid with the given live cells."""
+    grid = flat_empty_grid(num_rows, num_cols, padded)
+    offsets = flat_row_offsets(grid)
+    for row_num, col_num in cells:
+        grid.cells[offsets[row_num % num_rows] + col_num % num_cols] = 1
+    flat_wrap_padding(grid)
+    return grid
+
+
+def flat_from_rows(grid: list[list[int]], padded: bool = True) -> FlatGrid:
+    """Copy a list-of-lists grid into a flat grid."""
+    flat_grid = flat_empty_grid(len(grid), len(grid[0]), padded)
+    for offset, row in zip(flat_row_offsets(flat_grid), grid):
+        flat_grid.cells[offset:offset + flat_grid.num_cols] = bytes(row)
+    flat_wrap_padding(flat_grid)
+    return flat_grid
+
+
+def flat_to_rows(grid: FlatGrid) -> list[list[int]]:
+    """Copy the cells of a flat grid into the list-of-lists rows used for rendering."""
+    return [list(row) for row in flat_rows(grid)]
+
+
+def flat_window_rows(
+    grid: FlatGrid, top: int, left: int, bottom: int, right: int
+) -> list[list[int]]:
+    """Copy the cells of a flat grid inside a window into list-of-lists rows."""
+    cells = memoryview(grid.cells)
+    return [
+        list(cells[offset + left:offset + max(left, right)])
+        for offset in flat_row_offsets(grid)[top:bottom]
+    ]
+
+
+def flat_to_packed(grid: FlatGrid) -> bytes:
+    """Pack a flat grid into rows of one bit per cell, one buffer slice at a time."""
+    row_bytes = packed_row_bytes(grid.num_cols)
+    cells = grid.cells
+    return b''.join(
+        int(cells[offset:offset + grid.num_cols].translate(CELL_TO_BIT_CHARACTER)[::-1], 2)
+        .to_bytes(row_bytes, 'little')
+        for offset in flat_row_offsets(grid)
+    )
+
+
+def flat_from_packed(num_rows: int, num_cols: int, packed: Any) -> FlatGrid:
+    """Read rows of one bit per cell, such as a memory-mapped checkpoint, into a flat grid."""
+    grid = flat_empty_grid(num_rows, num_cols)
+    row_bytes = packed_row_bytes(num_cols)
+    row_format = '0{}b'.format(num_cols)
+    row_mask = (1 << num_cols) - 1
+    for row_num, offset in enumerate(flat_row_offsets(grid)):
+        row = int.from_bytes(packed[row_num * row_bytes:(row_num + 1) * row_bytes], 'little')
+        bit_characters = format(row & row_mask, row_format)[::-1].encode('ascii')
+        grid.cells[offset:offset + num_cols] = bit_characters.translate(BIT_CHARACTER_TO_CELL)
+    flat_wrap_padding(grid)
+    return grid
+
+
+def flat_signature(grid: FlatGrid) -> bytes:
+    """Return the buffer of a flat grid, for comparing grid states."""
+    return bytes(grid.cells)
+
+
+def flat_state_transition(
+    current_grid: FlatGrid,
+    future_grid: FlatGrid,
+    with_border: bool = False,
+    rule: Rule = CONWAY_RULE,
+    count_activity: bool = True,
+) -> Optional[Activity]:
+    """ Transition between flat grids with byte-lane arithmetic.
+
+    A padded grid is read as one little-endian int with a byte lane per cell. Its 3x3 block sums
+    are shifted copies of that int added together: the padding ring puts every neighbor at a fixed
+    lane offset and the sums never carry out of their lanes. The lanes of the ring itself are
+    refreshed from the new edges afterwards. Grids without padding are stepped one row at a time
+    by `byte_row_transition`.
+
+    Args:
+        current_grid (FlatGrid): The current state of the simulation.
+        future_grid (FlatGrid): The grid of the same shape that receives the next state.
+        with_border (bool): Whether to preserve a dead border around the grid.
+        rule (Rule): The compiled rule to apply.
+        count_activity (bool): Whether to count and box the live cells of the next state.
+
+    Returns:
+        Activity: The population, births, deaths and bounding box of the next state, or None
+            when not counted.
+
+    """
+    cells, stride = current_grid.cells, current_grid.stride
+    if current_grid.padding:
+        lanes = int.from_bytes(cells, 'little')
+        column_sums = lanes + (lanes << 8 * stride) + (lanes >> 8 * stride)
+        block_sums = column_sums + (column_sums << 8) + (column_sums >> 8) + (lanes << 4)
+        future_grid.cells[:] = memoryview(
+            block_sums.to_bytes(len(cells) + stride + 1, 'little').translate(rule.lane_table)
+        )[:len(cells)]
+    else:
+        num_rows = current_grid.num_rows
+        rows = [bytes(row) for row in flat_rows(current_grid)]
+        future_grid.cells[:] = b''.join(
+            byte_row_transition(
+                rows[row_num - 1], row, rows[(row_num + 1) % num_rows], rule.lane_table
+            )
+            for row_num, row in enumerate(rows)
+        )
+    if with_border:
+        flat_clear_border(future_grid)
+    flat_wrap_padding(future_grid)
+    return flat_activity(current_grid, future_grid) if count_activity else None
+
+
+def flat_activity(current_grid: FlatGrid, future_grid: FlatGrid) -> Activity:
+    """Count and box the live cells of a flat generation, reading each row as an int of byte lanes.
+
+    Each 0/1 lane holds a single bit, so the bitboard popcounts apply as they are and only the
+    columns of the box are converted from bit positions to lanes.
+    """
+    activity = bitboard_activity(
+        [int.from_bytes(row, 'little') for row in flat_rows(current_grid)],
+        [int.from_bytes(row, 'little') for row in flat_rows(future_grid)],
+    )
+    return activity._replace(left=activity.left // 8, right=(activity.right + 7) // 8)
+
+
+def list_from_cells(
+    num_rows: int, num_cols: int, cells: Iterable[tuple[int, int]]
+) -> list[list[int]]:
+    """Create a list-of-lists grid with the given live cells."""
+    grid = [[0] * num_cols for _ in range_compat(num_rows)]
+    for row_num, col_num in cells:
+        grid[row_num % num_rows][col_num % num_cols] = 1
+    return grid
+
+
+def list_to_rows(grid: list[list[int]]) -> list[list[int]]:
+    """Return list-of-lists grids unchanged, since they are already rows."""
+    return grid
+
+
+def list_refill(
+    current_grid: list[list[int]],
+    future_grid: list[list[int]],
+    density: float = DEFAULT_DENSITY,
+) -> None:
+    """Refill the rows of the current list-of-lists grid with random cells in place.
+
+    The future grid is left as it is, since the next transition overwrites all of it.
+    """
+    num_cols = len(current_grid[0])
+    for row, bits in zip(current_grid, random_bit_rows(len(current_grid), num_cols, density)):
+        row[:] = bits_to_cells(bits, num_cols)
+
+
+LIST_ENGINE = Engine(
+    make_grids,
+    state_transition,
+    list_to_rows,
+    from_cells=list_from_cells,
+    refill=list_refill,
+)
+NUMPY_ENGINE = Engine(
+    numpy_make_grids,
+    numpy_state_transition,
+    numpy_to_rows,
+    from_cells=numpy_from_cells,
+    to_packed=numpy_to_packed,
+    from_packed=numpy_from_packed,
+    signature=numpy_signature,
+    window_rows=numpy_window_rows,
+)
+BITBOARD_ENGINE = Engine(
+    bitboard_make_grids,
+    bitboard_state_transition,
+    bitboard_to_rows,
+    from_cells=bitboard_from_cells,
+    to_packed=bitboard_to_packed,
+    from_packed=bitboard_from_packed,
+    signature=bitboard_signature,
+    window_rows=bitboard_window_rows,
+)
+SPARSE_ENGINE = Engine(
+    sparse_make_grids,
+    sparse_state_transition,
+    sparse_to_rows,
+    from_cells=sparse_from_cells,
+    signature=sparse_signature,
+    window_rows=sparse_window_rows,
+)
+SPARSE_UNBOUNDED_ENGINE = Engine(
+    sparse_unbounded_make_grids,
+    sparse_state_transition,
+    sparse_to_rows,
+    from_cells=sparse_unbounded_from_cells,
+    signature=sparse_signature,
+    window_rows=sparse_window_rows,
+    step=sparse_unbounded_step,
+)
+ACTIVE_ENGINE = Engine(
+    active_make_grids,
+    active_state_transition,
+    active_to_rows,
+    active_stats,
+    from_cells=active_from_cells,
+)
+PARALLEL_ENGINE = Engine(
+    shared_make_grids,
+    shared_state_transition,
+    shared_to_rows,
+    release=shared_release,
+    from_cells=shared_from_cells,
+    signature=shared_signature,
+    window_rows=shared_window_rows,
+)
+FLAT_ENGINE = Engine(
+    flat_make_grids,
+    flat_state_transition,
+    flat_to_rows,
+    from_cells=flat_from_cells,
+    to_packed=flat_to_packed,
+    from_packed=flat_from_packed,
+    signature=flat_signature,
+    refill=flat_refill,
+    window_rows=flat_window_rows,
+)
+ENGINES = {
+    'active': ACTIVE_ENGINE,
+    'bitboard': BITBOARD_ENGINE,
+    'flat': FLAT_ENGINE,
+    'list': LIST_ENGINE,
+    'numpy': NUMPY_ENGINE,
+    'parallel': PARALLEL_ENGINE,
+    'sparse': SPARSE_ENGINE,
+    'sparse-unbounded': SPARSE_UNBOUNDED_ENGINE,
+}
+
+
+def parse_engine(engine_name: str) -> str:
+    """Normalize and validate a simulation engine name."""
+    normalized_engine = engine_name.lower()
+    if normalized_engine not in ENGINES:
+        raise ValueError('Unsupported engine: {}'.format(engine_name))
+    if normalized_engine == 'numpy' and np is None:
+        raise ValueError('The numpy engine requires NumPy to be installed')
+    return normalized_engine
+
+
+def select_engine(options: argparse.Namespace) -> Engine:
+    """Return the engine named by the CLI options, configured with any engine options."""
+    engine = ENGINES[options.engine]
+    if options.engine == 'parallel':
+        engine = engine._replace(
+            make_grids=functools.partial(
+                shared_make_grids,
+                workers=options.workers,
+                tile_rows=options.tile_rows,
+            ),
+            from_cells=functools.partial(
+                shared_from_cells,
+                workers=options.workers,
+                tile_rows=options.tile_rows,
+            ),
+        )
+    if options.density != DEFAULT_DENSITY:
+        engine = engine._replace(
+            make_grids=functools.partial(engine.make_grids, density=options.density),
+        )
+        if engine.refill:
+            engine = engine._replace(
+                refill=functools.partial(engine.refill, density=options.density),
+            )
+    if options.rule != CONWAY_RULE:
+        engine = engine._replace(
+            state_transition=functools.partial(engine.state_transition, rule=options.rule),
+        )
+        if engine.step:
+            engine = engine._replace(step=functools.partial(engine.step, rule=options.rule))
+    return engine
+
+
+def release_grids(engine: Engine, *grids: Any) -> None:
+    """Free the resources of grids that are no longer used, for engines that hold any."""
+    if engine.release:
+        for grid in grids:
+            if grid is not None:
+                engine.release(grid)
+
+
+def grid_size(grid: Any) -> tuple[int, int]:
+    """Return the number of rows and columns of a grid of any engine."""
+    if isinstance(grid, list):
+        return len(grid), len(grid[0])
+    if isinstance(grid, BitboardGrid):
+        return len(grid.rows), grid.num_cols
+    if isinstance(grid, ActiveGrid):
+        return len(grid.cells), len(grid.cells[0])
+    if np is not None and isinstance(grid, np.ndarray):
+        return int(grid.shape[0]), int(grid.shape[1])
+    return grid.num_rows, grid.num_cols
+
+
+def engine_window_rows(engine: Engine, grid: Any, window: GridWindow) -> list[list[int]]:
+    """Return new rows holding the cells of a grid inside a window."""
+    top, left, bottom, right = window
+    if engine.window_rows:
+        return engine.window_rows(grid, top, left, bottom, right)
+    return [row[left:right] for row in engine.to_rows(grid)[top:bottom]]
+
+
+def engine_activity(engine: Engine, grid: Any) -> Activity:
+    """Count and box the live cells of a grid, converting `ACTIVITY_BAND_ROWS` rows at a time."""
+    num_rows, num_cols = grid_size(grid)
+    return merge_activity(
+        rows_activity(
+            engine_window_rows(engine, grid, GridWindow(
+                top, 0, min(num_rows, top + ACTIVITY_BAND_ROWS), num_cols
+            )),
+            row_start=top,
+        )
+        for top in range_compat(0, num_rows, ACTIVITY_BAND_ROWS)
+    )
+
+
+def make_engine_grids(
+    num_rows: int,
+    num_cols: int,
+    engine: Optional[Engine] = None,
+    pattern_path: Optional[str] = None,
+    offset: tuple[int, int] = (0, 0),
+    resume_path: Optional[str] = None,
+) -> tuple[Any, Any]:
+    """Create grids for an engine, defaulting to the list-of-lists grids.
+
+    The current grid is random unless a pattern file is given, which is placed at `offset`, or a
+    checkpoint to resume, whose own dimensions replace `num_rows` and `num_cols`.
+    """
+    if resume_path is not None:
+        return load_checkpoint_grids(resume_path, engine)
+    if pattern_path is not None:
+        return load_pattern_grids(num_rows, num_cols, engine, pattern_path, offset)
+    if engine is None:
+        return make_grids(num_rows, num_cols)
+    return engine.make_grids(num_rows, num_cols)
+
+
+def read_rle_cells(lines: Iterable[str]) -> Iterator[tuple[int, int]]:
+    """Stream the live cells of an RLE pattern, whose runs may continue across lines."""
+    row_num = col_num = 0
+    run_length = None
+    seen_header = False
+    for line in lines:
+        if line.startswith('#'):
+            continue
+        if not seen_header and line.lstrip().startswith('x'):
+            seen_header = True
+            continue
+        for token in RLE_TOKEN_PATTERN.findall(line):
+            if token.isdigit():
+                run_length = (run_length or 0) * 10 ** len(token) + int(token)
+                continue
+            run_length, count = None, run_length or 1
+            if token == '!':
+                return
+            if token == '$':
+                row_num += count
+                col_num = 0
+            elif token in 'b.':
+                col_num += count
+            else:
+                for _ in range_compat(count):
+                    yield row_num, col_num
+                    col_num += 1
+
+
+def read_plaintext_cells(lines: Iterable[str]) -> Iterator[tuple[int, int]]:
+    """Stream the live cells of a plaintext `.cells` pattern."""
+    row_num = 0
+    for line in lines:
+        if line.startswith('!'):
+            continue
+        for col_num, cell in enumerate(line.rstrip()):
+            if cell in 'O*':
+                yield row_num, col_num
+        row_num += 1
+
+
+def read_life_106_cells(lines: Iterable[str]) -> Iterator[tuple[int, int]]:
+    """Stream the live cells of a Life 1.06 pattern, which lists one `x y` pair per line."""
+    for line in lines:
+        if line.startswith('#') or not line.strip():
+            continue
+        col_num, row_num = line.split()
+        yield int(row_num), int(col_num)
+
+
+def read_pattern_cells(lines: Iterable[str]) -> Iterator[tuple[int, int]]:
+    """ Stream the live cells of an RLE, plaintext or Life 1.06 pattern.
+
+    The format is recognized from the first line, and the rest is read one line at a time, so
+    large patterns are never held in memory as text.
+
+    Args:
+        lines (iterable): The lines of the pattern, such as an open pattern file.
+
+    Returns:
+        iterator: (row, col) coordinates of the live cells, relative to the pattern origin.
+
+    """
+    lines = iter(lines)
+    first_line = next(lines, '')
+    lines = itertools.chain([first_line], lines)
+    if first_line.startswith('#Life 1.06'):
+        return read_life_106_cells(lines)
+    if first_line.startswith('!') or first_line[:1] in ('.', 'O', '*'):
+        return read_plaintext_cells(lines)
+    return read_rle_cells(lines)
+
+
+def load_pattern_grids(
+    num_rows: int,
+    num_cols: int,
+    engine: Optional[Engine],
+    pattern_path: str,
+    offset: tuple[int, int] = (0, 0),
+) -> tuple[Any, Any]:
+    """ Create an engine's grids with a pattern file placed at an offset in the current grid.
+
+    Args:
+        num_rows (int): Number of rows in the grid.
+        num_cols (int): Number of columns in the grid.
+        engine (Engine): The engine whose grids should be created, or None for list-of-lists.
+        pattern_path (str): Path to an RLE, plaintext or Life 1.06 pattern file.
+        offset (tuple): The (row, col) of the pattern origin in the grid.
+
+    Returns:
+        tuple: The current grid holding the pattern and an empty future grid. Cells beyond the
+            grid wrap around, except in an unbounded universe, where they are kept.
+
+    """
+    from_cells = engine.from_cells if engine and engine.from_cells else list_from_cells
+    row_offset, col_offset = offset
+    with open(pattern_path) as pattern_file:
+        current_grid = from_cells(num_rows, num_cols, (
+            (row_num + row_offset, col_num + col_offset)
+            for row_num, col_num in read_pattern_cells(pattern_file)
+        ))
+    return current_grid, from_cells(num_rows, num_cols, ())
+
+
+def engine_to_packed(engine: Optional[Engine], grid: Any) -> bytes:
+    """Pack an engine's grid into rows of one bit per cell."""
+    if engine is not None and engine.to_packed:
+        return engine.to_packed(grid)
+    rows = engine.to_rows(grid) if engine is not None else grid
+    return bitboard_to_packed(bitboard_from_rows(rows))
+
+
+def engine_from_packed(engine: Optional[Engine], num_rows: int, num_cols: int, packed: Any) -> Any:
+    """Build an engine's grid from rows of one bit per cell."""
+    if engine is not None and engine.from_packed:
+        return engine.from_packed(num_rows, num_cols, packed)
+    from_cells = engine.from_cells if engine and engine.from_cells else list_from_cells
+    return from_cells(num_rows, num_cols, cells_from_packed(num_rows, num_cols, packed))
+
+
+def save_checkpoint(
+    checkpoint_path: str,
+    engine: Optional[Engine],
+    grid: Any,
+    num_rows: int,
+    num_cols: int,
+    generation: int,
+    seed: Optional[int],
+    cycle_detector: CycleDetector,
+) -> None:
+    """ Save a running simulation as a header followed by bit-packed grids.
+
+    The file is written next to its destination and renamed over it, so an interrupted save
+    leaves any earlier checkpoint intact.
+
+    Args:
+        checkpoint_path (str): Where to write the checkpoint.
+        engine (Engine): The engine that owns the grid, or None for list-of-lists.
+        grid: The current grid.
+        num_rows (int): Number of rows in the grid.
+        num_cols (int): Number of columns in the grid.
+        generation (int): The number of generations simulated so far.
+        seed (int): The random seed of the session, or None.
+        cycle_detector (CycleDetector): The engine cycle search state, whose packed checkpoint
+            grid is saved too.
+
+    """
+    has_cycle_checkpoint = cycle_detector.checkpoint_packed is not None
+    header = CHECKPOINT_HEADER.pack(
+        CHECKPOINT_MAGIC,
+        CHECKPOINT_VERSION,
+        seed is not None,
+        has_cycle_checkpoint,
+        num_rows,
+        num_cols,
+        generation,
+        0 if seed is None else seed,
+        cycle_detector.power,
+        cycle_detector.steps,
+    )
+    temporary_path = checkpoint_path + '.tmp'
+    with open(temporary_path, 'wb') as checkpoint_file:
+        checkpoint_file.write(header)
+        checkpoint_file.write(engine_to_packed(engine, grid))
+        if has_cycle_checkpoint:
+            checkpoint_file.write(cycle_detector.checkpoint_packed)
+    os.replace(temporary_path, checkpoint_path)
+
+
+def read_checkpoint_header(checkpoint_path: str) -> CheckpointHeader:
+    """Read and validate the header of a checkpoint file."""
+    with open(checkpoint_path, 'rb') as checkpoint_file:
+        header_bytes = checkpoint_file.read(CHECKPOINT_HEADER.size)
+    if len(header_bytes) < CHECKPOINT_HEADER.size:
+        raise ValueError('Truncated checkpoint: {}'.format(checkpoint_path))
+    (
+        magic,
+        version,
+        has_seed,
+        has_cycle_checkpoint,
+        num_rows,
+        num_cols,
+        generation,
+        seed,
+        power,
+        steps,
+    ) = CHECKPOINT_HEADER.unpack(header_bytes)
+    if magic != CHECKPOINT_MAGIC or version != CHECKPOINT_VERSION:
+        raise ValueError('Unsupported checkpoint: {}'.format(checkpoint_path))
+    return CheckpointHeader(
+        num_rows,
+        num_cols,
+        generation,
+        seed if has_seed else None,
+        power,
+        steps,
+        bool(has_cycle_checkpoint),
+    )
+
+
+def load_checkpoint_grids(checkpoint_path: str, engine: Optional[Engine]) -> tuple[Any, Any]:
+    """Memory-map a checkpoint and build an engine's current grid straight from its packed rows."""
+    header = read_checkpoint_header(checkpoint_path)
+    grid_bytes = header.num_rows * packed_row_bytes(header.num_cols)
+    with open(checkpoint_path, 'rb') as checkpoint_file:
+        with mmap.mmap(checkpoint_file.fileno(), 0, access=mmap.ACCESS_READ) as packed:
+            if len(packed) < CHECKPOINT_HEADER.size + grid_bytes:
+                raise ValueError('Truncated checkpoint: {}'.format(checkpoint_path))
+            grid_end = CHECKPOINT_HEADER.size + grid_bytes
+            with memoryview(packed) as packed_view:
+                with packed_view[CHECKPOINT_HEADER.size:grid_end] as grid_view:
+                    current_grid = engine_from_packed(
+                        engine, header.num_rows, header.num_cols, grid_view
+                    )
+    future_grid = engine_from_packed(engine, header.num_rows, header.num_cols, bytes(grid_bytes))
+    return current_grid, future_grid
+
+
+def restore_cycle_detector(
+    cycle_detector: CycleDetector, checkpoint_path: str, engine: Engine, grid: Any
+) -> None:
+    """Resume the engine cycle search saved in a checkpoint, with `grid` as the current grid."""
+    header = read_checkpoint_header(checkpoint_path)
+    reset_engine_cycle_search(cycle_detector, engine, grid)
+    if not header.has_cycle_checkpoint:
+        return
+    grid_bytes = header.num_rows * packed_row_bytes(header.num_cols)
+    with open(checkpoint_path, 'rb') as checkpoint_file:
+        checkpoint_file.seek(CHECKPOINT_HEADER.size + grid_bytes)
+        packed_checkpoint = checkpoint_file.read(grid_bytes)
+    checkpoint_grid = engine_from_packed(
+        engine, header.num_rows, header.num_cols, packed_checkpoint
+    )
+    try:
+        set_engine_checkpoint(cycle_detector, engine, checkpoint_grid)
+    finally:
+        release_grids(engine, checkpoint_grid)
+    cycle_detector.checkpoint_packed = packed_checkpoint
+    cycle_detector.power = header.power
+    cycle_detector.steps = header.steps
+
+
+class RecordingWriter(object):
+    """ Streams every generation of a run to a file as zlib-compressed keyframes and XOR deltas.
+
+    Frames are bit-packed grids. Every `keyframe_interval`-th frame is stored whole, and the rest
+    as the XOR with the previous frame, which is mostly zero bytes and compresses well. Closing
+    the writer appends an index of keyframe offsets for seeking.
+    """
+
+    def __init__(
+        self,
+        recording_path: str,
+        num_rows: int,
+        num_cols: int,
+        keyframe_interval: int = RECORDING_KEYFRAME_INTERVAL,
+    ) -> None:
+        self.recording_file = open(recording_path, 'wb')
+        self.keyframe_interval = keyframe_interval
+        self.frame_count = 0
+        self.previous_frame = 0
+        self.frame_bytes = num_rows * packed_row_bytes(num_cols)
+        self.keyframes: list[tuple[int, int]] = []
+        self.recording_file.write(RECORDING_HEADER.pack(
+            RECORDING_MAGIC,
+            RECORDING_VERSION,
+            num_rows,
+            num_cols,
+            keyframe_interval,
+        ))
+
+    def write_record(self, kind: int, payload: bytes) -> None:
+        """Append one compressed frame record."""
+        compressed = zlib.compress(payload, RECORDING_COMPRESSION_LEVEL)
+        self.recording_file.write(RECORDING_FRAME.pack(kind, len(compressed)))
+        self.recording_file.write(compressed)
+
+    def write_frame(self, packed: bytes) -> None:
+        """Append the next generation, given as a bit-packed grid."""
+        frame = int.from_bytes(packed, 'little')
+        if self.frame_count % self.keyframe_interval == 0:
+            self.keyframes.append((self.frame_count, self.recording_file.tell()))
+            self.write_record(RECORDING_KEYFRAME, packed)
+        else:
+            self.write_record(
+                RECORDING_DELTA,
+                (frame ^ self.previous_frame).to_bytes(self.frame_bytes, 'little'),
+            )
+        self.previous_frame = frame
+        self.frame_count += 1
+
+    def close(self) -> None:
+        """Append the keyframe index and trailer, and close the file."""
+        if self.recording_file.closed:
+            return
+        index_offset = self.recording_file.tell()
+        self.write_record(RECORDING_INDEX, b''.join(
+            RECORDING_INDEX_ENTRY.pack(generation, offset)
+            for generation, offset in self.keyframes
+        ))
+        self.recording_file.write(RECORDING_TRAILER.pack(
+            index_offset,
+            self.frame_count,
+            RECORDING_MAGIC,
+        ))
+        self.recording_file.close()
+
+
+class RecordingReader(object):
+    """ Plays back a recording, seeking through its keyframe index.
 
+    A recording that was not closed cleanly, such as after a crash, has no index; its frames are
+    scanned once to rebuild one.
     """
-    count = 0
-    wrap_vertical, wrap_horizontal = len(grid), len(grid[0])
 
-    # Top left
-    if grid[(row_num - 1) % wrap_vertical][(col_num - 1) % wrap_horizontal]:
-        count += 1
-    # Top middle
-    if grid[(row_num - 1) % wrap_vertical][col_num]:
-        count += 1
-    # Top right
-    if grid[(row_num - 1) % wrap_vertical][(col_num + 1) % wrap_horizontal]:
-        count += 1
+    def __init__(self, recording_path: str) -> None:
+        self.recording_file = open(recording_path, 'rb')
+        header_bytes = self.recording_file.read(RECORDING_HEADER.size)
+        if len(header_bytes) < RECORDING_HEADER.size:
+            raise ValueError('Truncated recording: {}'.format(recording_path))
+        magic, version, self.num_rows, self.num_cols, self.keyframe_interval = (
+            RECORDING_HEADER.unpack(header_bytes)
+        )
+        if magic != RECORDING_MAGIC or version != RECORDING_VERSION:
+            raise ValueError('Unsupported recording: {}'.format(recording_path))
+        self.frame_bytes = self.num_rows * packed_row_bytes(self.num_cols)
+        self.keyframes = self.read_index()
 
-    # Bottom right
-    if grid[(row_num + 1) % wrap_vertical][(col_num - 1) % wrap_horizontal]:
-        count += 1
-    # Bottom middle
-    if grid[(row_num + 1) % wrap_vertical][col_num]:
-        count += 1
-    # Bottom right
-    if grid[(row_num + 1) % wrap_vertical][(col_num + 1) % wrap_horizontal]:
-        count += 1
+    def read_record(self) -> tuple[Optional[int], bytes]:
+        """Read the record at the current position, returning a None kind at the end of frames."""
+        record_header = self.recording_file.read(RECORDING_FRAME.size)
+        if len(record_header) < RECORDING_FRAME.size:
+            return None, b''
+        kind, length = RECORDING_FRAME.unpack(record_header)
+        compressed = self.recording_file.read(length)
+        if kind == RECORDING_INDEX or len(compressed) < length:
+            return None, b''
+        return kind, zlib.decompress(compressed)
 
-    # Middle left
-    if grid[row_num % wrap_vertical][(col_num - 1) % wrap_horizontal]:
-        count += 1
-    # Middle right
-    if grid[row_num % wrap_vertical][(col_num + 1) % wrap_horizontal]:
-        count += 1
+    def read_index(self) -> list[tuple[int, int]]:
+        """Load the keyframe (generation, offset) index, or rebuild it from the frames."""
+        self.recording_file.seek(0, os.SEEK_END)
+        file_size = self.recording_file.tell()
+        if file_size >= RECORDING_HEADER.size + RECORDING_TRAILER.size:
+            self.recording_file.seek(file_size - RECORDING_TRAILER.size)
+            index_offset, frame_count, magic = RECORDING_TRAILER.unpack(
+                self.recording_file.read(RECORDING_TRAILER.size)
+            )
+            if magic == RECORDING_MAGIC:
+                self.recording_file.seek(index_offset)
+                _, length = RECORDING_FRAME.unpack(self.recording_file.read(RECORDING_FRAME.size))
+                index = zlib.decompress(self.recording_file.read(length))
+                self.frame_count = frame_count
+                return list(RECORDING_INDEX_ENTRY.iter_unpack(index))
+        keyframes = []
+        self.recording_file.seek(RECORDING_HEADER.size)
+        generation = 0
+        while True:
+            offset = self.recording_file.tell()
+            kind, _ = self.read_record()
+            if kind is None:
+                break
+            if kind == RECORDING_KEYFRAME:
+                keyframes.append((generation, offset))
+            generation += 1
+        self.frame_count = generation
+        return keyframes
+
+    def frames(self, start: int = 0) -> Iterator[bytes]:
+        """Yield the bit-packed grid of every generation from `start`, seeking to its keyframe."""
+        keyframe_number = bisect.bisect_right(self.keyframes, (start, sys.maxsize)) - 1
+        if keyframe_number < 0:
+            return
+        generation, offset = self.keyframes[keyframe_number]
+        self.recording_file.seek(offset)
+        frame = 0
+        while True:
+            kind, payload = self.read_record()
+            if kind is None:
+                return
+            if kind == RECORDING_KEYFRAME:
+                frame = int.from_bytes(payload, 'little')
+            else:
+                frame ^= int.from_bytes(payload, 'little')
+            if generation >= start:
+                yield frame.to_bytes(self.frame_bytes, 'little')
+            generation += 1
+
+    def close(self) -> None:
+        """Close the recording file."""
+        self.recording_file.close()
 
-    return count
 
 def init_game(
     stdscr: curses.window,
+    engine: Optional[Engine] = None,
+    half_block: bool = False,
+    pattern_path: Optional[str] = None,
+    offset: tuple[int, int] = (0, 0),
+    resume_path: Optional[str] = None,
 ) -> tuple[list[list[int]], list[list[int]], int, float, ColorValue, ColorValue]:
     """ Initialize the game and values for ncurses.
 
     Args:
         stdscr (WindowObject): A representation of the screen provided by ncurses' wrapper.
+        engine (Engine): The simulation engine whose grids should be created.
+        half_block (bool): Whether the grid is drawn two rows per line and one column per
+            character, which changes the default grid size.
+        pattern_path (str): A pattern file to start from instead of a random grid.
+        offset (tuple): The (row, col) at which the pattern is placed.
+        resume_path (str): A checkpoint to resume, which takes precedence over a pattern.
 
     Returns:
         tuple: A tuple containing the initialized values for the game.
@@ -308,10 +3742,9 @@ def init_game(
     """
     rows, cols = stdscr.getmaxyx()
     rows, cols, steps, refresh_time, foreground_color, background_color = parse_cli_arguments(
-        int(rows),
-        int(cols / 2),
+        *default_grid_size(rows, cols, half_block)
     )
-    grid_1, grid_2 = make_grids(rows, cols)
+    grid_1, grid_2 = make_engine_grids(rows, cols, engine, pattern_path, offset, resume_path)
     return (
         grid_1,
         grid_2,
@@ -335,12 +3768,8 @@ def choose_argument(
     return default_value
 
 
-def parse_cli_arguments(
-    default_rows: int,
-    default_cols: int,
-    argv: Optional[list[str]] = None,
-) -> tuple[int, int, int, float, ColorValue, ColorValue]:
-    """Parse positional and named CLI arguments for the game."""
+def build_argument_parser() -> argparse.ArgumentParser:
+    """Build the parser for positional and named CLI arguments."""
     parser = argparse.ArgumentParser()
     parser.add_argument('rows', nargs='?', type=int)
     parser.add_argument('cols', nargs='?', type=int)
@@ -354,11 +3783,54 @@ def parse_cli_arguments(
     parser.add_argument('--delay', dest='delay_option', type=float)
     parser.add_argument('--fg', dest='foreground_color_option', type=parse_color)
     parser.add_argument('--bg', dest='background_color_option', type=parse_color)
+    parser.add_argument('--engine', type=parse_engine, default=DEFAULT_ENGINE)
+    parser.add_argument('--renderer', choices=RENDERERS, default=DEFAULT_RENDERER)
+    parser.add_argument('--half-block', dest='half_block', action='store_true')
+    parser.add_argument('--output', choices=OUTPUTS, default=DEFAULT_OUTPUT)
+    parser.add_argument('--headless', action='store_true')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--density', type=parse_density, default=DEFAULT_DENSITY)
+    parser.add_argument('--rule', type=parse_rule, default=CONWAY_RULE)
+    parser.add_argument('--pattern')
+    parser.add_argument('--offset', type=parse_offset, default=(0, 0))
+    parser.add_argument('--resume')
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT_PATH)
+    parser.add_argument('--record')
+    parser.add_argument('--play')
+    parser.add_argument('--start', type=int, default=0)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--tile-rows', dest='tile_rows', type=int)
+    parser.add_argument('--parallel-speedup', dest='parallel_speedup', action='store_true')
+    parser.add_argument('--soup-search', dest='soup_search', action='store_true')
+    parser.add_argument('--soups', type=int, default=SOUP_DEFAULT_COUNT)
+    parser.add_argument('--results', default=DEFAULT_SOUP_RESULTS_PATH)
+    return parser
+
+
+def parse_cli_options(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    """Parse the CLI options that select game subsystems, such as the engine."""
+    parser = build_argument_parser()
+    options = parser.parse_args(sys.argv[1:] if argv is None else argv)
+    if 0 in options.rule.birth and options.engine in ('sparse', 'sparse-unbounded'):
+        parser.error('the sparse engines do not support rules with B0')
+    if options.soup_search and options.engine == 'parallel':
+        parser.error('the soup search already runs soups in parallel; choose a serial engine')
+    if options.seed is not None and options.seed not in CHECKPOINT_SEED_RANGE:
+        parser.error('--seed must fit in a signed 64-bit integer to be saved in checkpoints')
+    return options
+
 
-    parsed_arguments = parser.parse_args(sys.argv[1:] if argv is None else argv)
+def parse_cli_arguments(
+    default_rows: int,
+    default_cols: int,
+    argv: Optional[list[str]] = None,
+    default_steps: int = sys.maxsize,
+) -> tuple[int, int, int, float, ColorValue, ColorValue]:
+    """Parse positional and named CLI arguments for the game."""
+    parsed_arguments = parse_cli_options(argv)
     rows = choose_argument(parsed_arguments.rows, parsed_arguments.rows_option, default_rows)
     cols = choose_argument(parsed_arguments.cols, parsed_arguments.cols_option, default_cols)
-    steps = choose_argument(parsed_arguments.steps, parsed_arguments.steps_option, sys.maxsize)
+    steps = choose_argument(parsed_arguments.steps, parsed_arguments.steps_option, default_steps)
     refresh_time = choose_argument(parsed_arguments.delay, parsed_arguments.delay_option, 0.04)
     foreground_color = choose_argument(
         parsed_arguments.foreground_color,
@@ -380,6 +3852,20 @@ def parse_cli_arguments(
     )
 
 
+def parse_offset(offset: str) -> tuple[int, int]:
+    """Parse a pattern offset written as ROW,COL."""
+    row_offset, col_offset = offset.split(',')
+    return int(row_offset), int(col_offset)
+
+
+def parse_density(density: str) -> float:
+    """Parse and validate a fill probability between 0 and 1."""
+    fill_probability = float(density)
+    if not 0 <= fill_probability <= 1:
+        raise ValueError('Density out of range: {}'.format(density))
+    return fill_probability
+
+
 def parse_color(color_name: str) -> ColorValue:
     """Normalize and validate a terminal color name or palette index."""
     normalized_color = color_name.lower()
@@ -426,9 +3912,807 @@ def configure_input(stdscr: curses.window, refresh_time: float) -> None:
     curses.set_escdelay(ESC_DELAY_MS)
     stdscr.timeout(int(refresh_time * 1000))
 
+def next_generation(
+    engine: Engine,
+    current_grid: Any,
+    future_grid: Any,
+    cycle_detector: CycleDetector,
+    phase_timings: Optional[PhaseTimings] = None,
+) -> tuple[Any, Any, Activity]:
+    """ Advance the simulation one generation, restarting when it falls into a cycle.
+
+    No rows are built: the cycle check compares engine signatures, and rendering converts only
+    the part of the grid in view.
+
+    Args:
+        engine (Engine): The simulation engine that owns the grids.
+        current_grid: The grid holding the current state of the simulation.
+        future_grid: The grid that will store the next state of the simulation.
+        cycle_detector (CycleDetector): The search started by `reset_engine_cycle_search`,
+            updated in place.
+        phase_timings (PhaseTimings): Receives the transition and cycle-check durations when set.
+
+    Returns:
+        tuple: The new current and future grids and the activity of the new current grid.
+
+    """
+    phase_started_at = time.perf_counter_ns()
+    activity = engine.state_transition(current_grid, future_grid)
+    phase_started_at = record_phase(phase_timings, 'transition', phase_started_at)
+    found_cycle = is_engine_cycle(cycle_detector, engine, future_grid, activity)
+    record_phase(phase_timings, 'cycle_check', phase_started_at)
+    if found_cycle:
+        return restart_after_cycle(engine, current_grid, future_grid, cycle_detector)
+    return future_grid, current_grid, activity
+
+
+def engine_signature(engine: Engine, grid: Any) -> Hashable:
+    """Return an engine's signature of a grid, falling back to the signature of its rows."""
+    if engine.signature:
+        return engine.signature(grid)
+    return grid_signature(engine.to_rows(grid))
+
+
+def engine_grids_equal(engine: Engine, grid: Any, other_grid: Any) -> bool:
+    """Compare two grids of an engine by signature, or by their rows for engines without one."""
+    if engine.signature:
+        return engine.signature(grid) == engine.signature(other_grid)
+    return engine.to_rows(grid) == engine.to_rows(other_grid)
+
+
+def reset_engine_cycle_search(cycle_detector: CycleDetector, engine: Engine, grid: Any) -> None:
+    """Start a fresh cycle search with a grid of any engine as the first checkpoint.
+
+    Engines with a `signature` are searched over it. The list-of-lists engines have none, and are
+    searched over the Zobrist hash of their rows instead, as in `is_cycle`.
+    """
+    if engine.signature:
+        reset_signature_search(cycle_detector, engine.signature(grid))
+    else:
+        reset_cycle_detector(cycle_detector, engine.to_rows(grid))
+    cycle_detector.checkpoint_packed = engine_to_packed(engine, grid)
+
+
+def set_engine_checkpoint(cycle_detector: CycleDetector, engine: Engine, grid: Any) -> None:
+    """Make a grid the checkpoint of a search started by `reset_engine_cycle_search`."""
+    if engine.signature:
+        cycle_detector.checkpoint = engine.signature(grid)
+        return
+    rows = engine.to_rows(grid)
+    cycle_detector.checkpoint = grid_signature(rows)
+    cycle_detector.checkpoint_hash = zobrist_hash(cycle_detector.keys, rows)
+
+
+def is_engine_cycle(
+    cycle_detector: CycleDetector, engine: Engine, grid: Any, activity: Optional[Activity] = None
+) -> bool:
+    """Add the next generation to a search started by `reset_engine_cycle_search`.
+
+    Grids without an engine signature update the Zobrist hash from their changed cells, only in
+    the rows inside the bounding boxes of this and the previous generation's `activity` when both
+    were counted, and are compared in full only when the hash matches the checkpoint's. The
+    checkpoint grid is packed for saving only when the checkpoint moves, after 1, 2, 4 and so on
+    generations.
+    """
+    if engine.signature:
+        found_cycle = is_signature_cycle(cycle_detector, engine.signature(grid))
+    else:
+        found_cycle = is_cycle(cycle_detector, engine.to_rows(grid), activity)
+    if not found_cycle and cycle_detector.steps == 0:
+        cycle_detector.checkpoint_packed = engine_to_packed(engine, grid)
+    return found_cycle
+
+
+def restart_after_cycle(
+    engine: Engine, current_grid: Any, future_grid: Any, cycle_detector: CycleDetector
+) -> tuple[Any, Any, Activity]:
+    """Restart the grids with a fresh random state and a fresh cycle search, and count it."""
+    num_rows, num_cols = grid_size(current_grid)
+    current_grid, future_grid = restart_grids(
+        num_rows, num_cols, engine, (current_grid, future_grid)
+    )
+    reset_engine_cycle_search(cycle_detector, engine, current_grid)
+    return current_grid, future_grid, engine_activity(engine, current_grid)
+
+
+def step_generations(
+    engine: Engine,
+    current_grid: Any,
+    future_grid: Any,
+    generations: int,
+    cycle_detector: CycleDetector,
+    stop_requested: Optional[threading.Event] = None,
+) -> tuple[Any, Any, int, Activity]:
+    """ Advance the simulation several generations with no rendering or phase timings.
+
+    The jump stops at the first generation that repeats the checkpoint of the engine cycle search
+    and the grids restart as in `next_generation`. `cycle_detector` is carried from one call to
+    the next. Only the last generation's activity is counted by the engine, except for engines
+    without a signature, whose Zobrist hash updates are bounded by every generation's activity.
+    The jump ends early once `stop_requested` is set. Engines with a `step` hook jump to the
+    generation before the last in one call, and check for a cycle only once, at the end.
+
+    Args:
+        engine (Engine): The simulation engine that owns the grids.
+        current_grid: The grid holding the current state of the simulation.
+        future_grid: The grid that will store the next state of the simulation.
+        generations (int): The most generations to advance.
+        cycle_detector (CycleDetector): The search started by `reset_engine_cycle_search`,
+            updated in place.
+        stop_requested (Event): Ends the jump before the next generation once set.
+
+    Returns:
+        tuple: The new current and future grids, the number of generations advanced and the
+            activity of the last one.
+
+    """
+    activity = None
+    if engine.step and generations > 1:
+        if stop_requested is not None and stop_requested.is_set():
+            return current_grid, future_grid, 0, engine_activity(engine, current_grid)
+        engine.step(current_grid, future_grid, generations - 1)
+        activity = engine.state_transition(future_grid, current_grid)
+        if is_engine_cycle(cycle_detector, engine, current_grid, activity):
+            current_grid, future_grid, activity = restart_after_cycle(
+                engine, current_grid, future_grid, cycle_detector
+            )
+        return current_grid, future_grid, generations, activity
+    for generation in range_compat(1, generations + 1):
+        if stop_requested is not None and stop_requested.is_set():
+            return current_grid, future_grid, generation - 1, engine_activity(engine, current_grid)
+        activity = engine.state_transition(
+            current_grid,
+            future_grid,
+            count_activity=generation == generations or not engine.signature,
+        )
+        current_grid, future_grid = future_grid, current_grid
+        if is_engine_cycle(cycle_detector, engine, current_grid, activity):
+            current_grid, future_grid, activity = restart_after_cycle(
+                engine, current_grid, future_grid, cycle_detector
+            )
+            return current_grid, future_grid, generation, activity
+    return current_grid, future_grid, generations, activity
+
+
+def publish_frame(
+    frame_buffer: FrameBuffer,
+    rows: list[list[int]],
+    generation: int,
+    activity: Optional[Activity] = None,
+    window: Optional[GridWindow] = None,
+    force: bool = False,
+) -> bool:
+    """Hand a generation's rows in `window` to the frame buffer if wanted or forced.
+
+    The rows are handed over rather than copied, so they must be fresh rows that the simulation
+    no longer writes to, such as those from `engine_window_rows`.
+    """
+    if not (frame_buffer.wanted or force):
+        return False
+    with frame_buffer.lock:
+        frame_buffer.rows, frame_buffer.generation = rows, generation
+        frame_buffer.activity, frame_buffer.frame_window = activity, window
+        frame_buffer.wanted = False
+    return True
+
+
+def take_frame(
+    frame_buffer: FrameBuffer,
+) -> Optional[tuple[list[list[int]], int, Optional[Activity], Optional[GridWindow]]]:
+    """Take the waiting frame, its generation, activity and window, if any, and ask for the next."""
+    with frame_buffer.lock:
+        rows, frame_buffer.rows = frame_buffer.rows, None
+        frame_buffer.wanted = True
+        if rows is None:
+            return None
+        return rows, frame_buffer.generation, frame_buffer.activity, frame_buffer.frame_window
+
+
+class SimulationWorker(object):
+    """ Runs generations on a background thread, so neither rendering nor input waits on them.
+
+    Each finished generation goes through cycle detection, the recording and the debug log here,
+    and the rows of the newest one inside the frame buffer's `window` are published whenever the
+    render loop asks for a frame. Generations are paced to at most one tick per
+    `generation_interval` seconds, or run flat out when it is 0. Each tick advances
+    `generations_per_tick` generations, jumping over all but the last with `step_generations`
+    unless the run is recorded. While `paused`, only generations asked for with `request_step`
+    run, and the current one is published again when `request_frame` asks for another window.
+    Checkpoints are saved between ticks when requested, since the grids belong to this thread
+    while it runs. `activity` holds the engine's counts for the newest generation, which are
+    published with its frame and written to the debug log.
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        current_grid: Any,
+        future_grid: Any,
+        cycle_detector: CycleDetector,
+        steps: int,
+        generation_interval: float = 0.0,
+        generation: int = 0,
+        phase_timings: Optional[PhaseTimings] = None,
+        recording: Optional['RecordingWriter'] = None,
+        checkpoint_path: str = DEFAULT_CHECKPOINT_PATH,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.engine = engine
+        self.current_grid = current_grid
+        self.future_grid = future_grid
+        self.cycle_detector = cycle_detector
+        self.steps = steps
+        self.generation_interval = generation_interval
+        self.generation = generation
+        self.phase_timings = PhaseTimings() if phase_timings is None else phase_timings
+        self.recording = recording
+        self.checkpoint_path = checkpoint_path
+        self.seed = seed
+        self.activity = engine_activity(engine, current_grid)
+        self.frame_buffer = FrameBuffer(generation=generation, activity=self.activity)
+        self.render_fields: dict[str, int] = {}
+        self.generations_per_tick = 1
+        self.paused = False
+        self.step_requests = threading.Semaphore(0)
+        self.wake = threading.Event()
+        self.save_requested = threading.Event()
+        self.stop_requested = threading.Event()
+        self.error: Optional[BaseException] = None
+        self.thread = threading.Thread(target=self.run, name='simulation', daemon=True)
+
+    def start(self) -> None:
+        """Start running generations."""
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Ask the thread to stop after its current generation and wait for it."""
+        self.stop_requested.set()
+        self.wake.set()
+        if self.thread.is_alive():
+            self.thread.join()
+
+    def is_finished(self) -> bool:
+        """Report whether the thread has run all its generations, stopped or failed."""
+        return not self.thread.is_alive()
+
+    def toggle_pause(self) -> None:
+        """Pause a running simulation, or resume a paused one."""
+        self.paused = not self.paused
+        self.wake.set()
+
+    def request_step(self) -> None:
+        """Pause the simulation and advance it by one generation."""
+        self.paused = True
+        self.step_requests.release()
+        self.wake.set()
+
+    def request_save(self) -> None:
+        """Ask for a checkpoint of the current generation, waking a paused simulation to save it."""
+        self.save_requested.set()
+        self.wake.set()
+
+    def request_frame(self, window: GridWindow) -> None:
+        """Ask for the rows inside a window, from the current generation when paused."""
+        with self.frame_buffer.lock:
+            self.frame_buffer.window = window
+            self.frame_buffer.wanted = True
+        self.wake.set()
+
+    def publish(self, force: bool = False) -> None:
+        """Publish the rows of the current generation inside the wanted window, if wanted."""
+        if not (self.frame_buffer.wanted or force):
+            return
+        window = self.frame_buffer.window
+        rows = engine_window_rows(
+            self.engine,
+            self.current_grid,
+            window or GridWindow(0, 0, *grid_size(self.current_grid)),
+        )
+        publish_frame(self.frame_buffer, rows, self.generation, self.activity, window, force)
+
+    def advance(self, generations: int) -> None:
+        """Advance the given number of generations."""
+        if generations > 1 and self.recording is None:
+            self.current_grid, self.future_grid, generations, self.activity = step_generations(
+                self.engine,
+                self.current_grid,
+                self.future_grid,
+                generations,
+                self.cycle_detector,
+                self.stop_requested,
+            )
+            self.generation += generations
+            return
+        for _ in range_compat(generations):
+            self.current_grid, self.future_grid, self.activity = next_generation(
+                self.engine,
+                self.current_grid,
+                self.future_grid,
+                self.cycle_detector,
+                self.phase_timings,
+            )
+            self.generation += 1
+            if self.recording is not None:
+                self.recording.write_frame(engine_to_packed(self.engine, self.current_grid))
+
+    def save_checkpoint(self) -> None:
+        """Save the current generation to the checkpoint path and note it in the debug log."""
+        num_rows, num_cols = grid_size(self.current_grid)
+        save_checkpoint(
+            self.checkpoint_path,
+            self.engine,
+            self.current_grid,
+            num_rows,
+            num_cols,
+            self.generation,
+            self.seed,
+            self.cycle_detector,
+        )
+        append_debug_log('[{}] checkpoint_saved path={} generation={}'.format(
+            current_timestamp(),
+            self.checkpoint_path,
+            self.generation,
+        ))
+
+    def run(self) -> None:
+        """Advance, publish and log generations until done, stopped or failed."""
+        last_memory_log_at = 0.0
+        last_phase_log_at = time.monotonic()
+        next_generation_at = time.monotonic()
+        first_generation = self.generation
+        last_generation = self.generation + self.steps
+        try:
+            while self.generation < last_generation:
+                if self.stop_requested.is_set():
+                    break
+                if self.save_requested.is_set():
+                    self.save_requested.clear()
+                    self.save_checkpoint()
+                if not self.paused:
+                    generations = min(self.generations_per_tick, last_generation - self.generation)
+                elif self.step_requests.acquire(blocking=False):
+                    generations = 1
+                else:
+                    self.wake.wait()
+                    self.wake.clear()
+                    self.publish()
+                    next_generation_at = time.monotonic()
+                    continue
+                self.advance(generations)
+                self.publish()
+                log_fields = activity_fields(self.activity)
+                if self.engine.stats:
+                    log_fields.update(self.engine.stats(self.current_grid))
+                log_fields.update(self.render_fields)
+                last_memory_log_at = log_memory_usage(
+                    last_memory_log_at,
+                    self.cycle_detector.tracked_state_count,
+                    extra_fields=log_fields,
+                )
+                last_phase_log_at = log_phase_timings(last_phase_log_at, self.phase_timings)
+                if self.generation_interval:
+                    next_generation_at += self.generation_interval
+                    delay = next_generation_at - time.monotonic()
+                    if delay > 0:
+                        self.stop_requested.wait(delay)
+                    else:
+                        next_generation_at = time.monotonic()
+            if self.save_requested.is_set():
+                self.save_checkpoint()
+        except BaseException as error:
+            self.error = error
+        if (
+            self.error is None
+            and self.generation != first_generation
+            and self.frame_buffer.generation != self.generation
+        ):
+            self.publish(force=True)
+
+
+def draw_status_line(
+    stdscr: curses.window, viewport: Viewport, text: str, color_pair: int
+) -> None:
+    """Write a line of status text below the viewport, cut to the screen width.
+
+    Nothing is written when the screen has no row to spare below the viewport.
+    """
+    if stdscr.getmaxyx()[0] <= viewport.screen_rows:
+        return
+    stdscr.addstr(
+        viewport.screen_rows,
+        0,
+        text[:max(0, viewport.screen_cols - 1)].ljust(max(0, viewport.screen_cols - 1)),
+        color_pair,
+    )
+
+
+def ansi_color_codes(foreground_color: ColorValue, background_color: ColorValue) -> bytes:
+    """Return the ANSI escape sequence that selects a named or palette color pair."""
+    parameters = []
+    for color, base_code in ((foreground_color, 30), (background_color, 40)):
+        if isinstance(color, int):
+            parameters.append('{};5;{}'.format(base_code + 8, color))
+        else:
+            parameters.append(str(base_code + COLOR_NAME_TO_CURSES[color]))
+    return '\x1b[0;{}m'.format(';'.join(parameters)).encode('ascii')
+
+
+def encode_ansi_row(
+    row: list[int], glyphs: tuple[bytes, ...] = CELL_GLYPHS, separator: bytes = b' '
+) -> bytes:
+    """ Encode a display row, run-length encoding runs of equal cells.
+
+    Runs of blank cells wide enough to pay for it are erased and skipped with the ECH and CUF
+    escape sequences instead of being written out as spaces.
+
+    Args:
+        row (list): The display cells to draw, each an index into `glyphs`.
+        glyphs (tuple): The encoded symbol for each display cell value.
+        separator (bytes): The encoded symbol drawn after each cell.
+
+    Returns:
+        bytes: The encoded row.
+
+    """
+    cell_width = 1 + len(separator.decode('UTF-8'))
+    parts = []
+    for cell, run in itertools.groupby(row):
+        run_length = sum(1 for _ in run)
+        run_width = run_length * cell_width
+        if glyphs[cell] == b' ' and separator.strip() == b'' and run_width >= ANSI_SKIP_MIN_COLUMNS:
+            parts.append(b'\x1b[%dX\x1b[%dC' % (run_width, run_width))
+        else:
+            parts.append((glyphs[cell] + separator) * run_length)
+    return b''.join(parts)
+
+
+def encode_ansi_frame(
+    rows: list[list[int]],
+    color_codes: bytes,
+    half_block: bool = False,
+) -> bytes:
+    """Encode a whole frame, one cursor-positioned row per grid row or half-block row."""
+    if half_block:
+        display_rows, glyphs, separator = half_block_rows(rows), HALF_BLOCK_GLYPHS, b''
+    else:
+        display_rows, glyphs, separator = rows, CELL_GLYPHS, b' '
+    return color_codes + b''.join([
+        b'\x1b[%d;1H' % (row_num + 1) + encode_ansi_row(row, glyphs, separator)
+        for row_num, row in enumerate(display_rows)
+    ])
+
+
+def default_grid_size(
+    screen_rows: int, screen_cols: int, half_block: bool = False
+) -> tuple[int, int]:
+    """Return the grid size that fills a screen in full-size or half-block cells."""
+    # The bottom-right character cannot be written by curses, so half-block mode leaves the
+    # last column free just like the full-size mode's column spacing does.
+    if half_block:
+        return int(screen_rows) * 2, int(screen_cols) - 1
+    return int(screen_rows), int(screen_cols / 2)
+
+
+def run_ansi(argv: Optional[list[str]] = None, output: Optional[Any] = None) -> dict[str, float]:
+    """ Run the game without curses, streaming ANSI frames to a byte stream such as stdout.
+
+    Each frame is written and flushed in one call, so the stream works through pipes, `script`
+    recordings and high-latency links. Exit with Ctrl-C or by limiting the steps.
+
+    Args:
+        argv (list): The CLI arguments, defaulting to `sys.argv`.
+        output (BinaryIO): The stream to write frames to, defaulting to stdout.
+
+    Returns:
+        dict: The frames written, frames per second and average bytes per frame.
+
+    """
+    output = sys.stdout.buffer if output is None else output
+    options = parse_cli_options(argv)
+    engine = select_engine(options)
+    screen_cols, screen_rows = shutil.get_terminal_size()
+    rows, cols, steps, refresh_time, foreground_color, background_color = parse_cli_arguments(
+        *default_grid_size(screen_rows, screen_cols, options.half_block),
+        argv=argv,
+    )
+    color_codes = ansi_color_codes(foreground_color, background_color)
+    seed_random(options.seed)
+    current_grid, future_grid = make_engine_grids(
+        rows,
+        cols,
+        engine,
+        options.pattern,
+        options.offset,
+        options.resume,
+    )
+    frame_count = bytes_written = 0
+    started_at = time.perf_counter()
+    try:
+        cycle_detector = CycleDetector()
+        if options.resume:
+            restore_cycle_detector(cycle_detector, options.resume, engine, current_grid)
+        else:
+            reset_engine_cycle_search(cycle_detector, engine, current_grid)
+        output.write(ANSI_START_SEQUENCE)
+        for step in range_compat(steps + 1):
+            if step:
+                current_grid, future_grid, _ = next_generation(
+                    engine,
+                    current_grid,
+                    future_grid,
+                    cycle_detector,
+                )
+            frame_started_at = time.perf_counter()
+            frame = encode_ansi_frame(
+                engine.to_rows(current_grid), color_codes, options.half_block
+            )
+            output.write(frame)
+            output.flush()
+            frame_count += 1
+            bytes_written += len(frame)
+            time.sleep(max(0.0, refresh_time - (time.perf_counter() - frame_started_at)))
+    except KeyboardInterrupt:
+        pass
+    except BrokenPipeError:
+        # The reader went away, as with `| head`; stop quietly and keep the interpreter from
+        # failing again when it flushes stdout on exit.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), output.fileno())
+    finally:
+        try:
+            output.write(ANSI_END_SEQUENCE)
+            output.flush()
+        finally:
+            release_grids(engine, current_grid, future_grid)
+    elapsed = time.perf_counter() - started_at
+    return {
+        'frames': frame_count,
+        'fps': frame_count / elapsed if elapsed else 0.0,
+        'bytes_per_frame': bytes_written / frame_count if frame_count else 0.0,
+    }
+
+
+def seed_random(seed: Optional[int]) -> None:
+    """Seed the random generators used for grid initialization, when a seed is given."""
+    if seed is not None:
+        random.seed(seed)
+
+
+def run_headless(argv: Optional[list[str]] = None) -> dict[str, Any]:
+    """ Run the chosen engine as fast as possible, with no terminal, rendering or cycle checks.
+
+    Args:
+        argv (list): The CLI arguments, defaulting to `sys.argv`.
+
+    Returns:
+        dict: The grid size and step count, wall time, generations and cells per second, and
+            peak resident set size.
+
+    """
+    options = parse_cli_options(argv)
+    engine = select_engine(options)
+    rows, cols, steps, *_ = parse_cli_arguments(
+        HEADLESS_DEFAULT_ROWS,
+        HEADLESS_DEFAULT_COLS,
+        argv,
+        default_steps=HEADLESS_DEFAULT_STEPS,
+    )
+    seed_random(options.seed)
+    current_grid, future_grid = make_engine_grids(
+        rows,
+        cols,
+        engine,
+        options.pattern,
+        options.offset,
+        options.resume,
+    )
+    try:
+        started_at = time.perf_counter()
+        for _ in range_compat(steps):
+            engine.state_transition(current_grid, future_grid, count_activity=False)
+            current_grid, future_grid = future_grid, current_grid
+        wall_seconds = time.perf_counter() - started_at
+    finally:
+        release_grids(engine, current_grid, future_grid)
+    generations_per_second = steps / wall_seconds if wall_seconds else 0.0
+    return {
+        'engine': options.engine,
+        'rule': format_rule(options.rule),
+        'rows': rows,
+        'cols': cols,
+        'steps': steps,
+        'seed': options.seed,
+        'wall_seconds': wall_seconds,
+        'generations_per_second': generations_per_second,
+        'cells_per_second': generations_per_second * rows * cols,
+        'peak_rss_kb': get_peak_memory_usage_kb(),
+    }
+
+
+def soup_cycle_start(
+    engine: Engine, num_rows: int, num_cols: int, soup: bytes, period: int
+) -> int:
+    """ Replay a soup to find the first generation that recurs a period later.
+
+    One copy of the soup is run `period` generations ahead, then both copies advance together
+    until their grids are equal, so no generation before the cycle needs to be kept.
+
+    Args:
+        engine (Engine): The simulation engine of the soup.
+        num_rows (int): Number of rows in the grid.
+        num_cols (int): Number of columns in the grid.
+        soup (bytes): The soup's first generation, packed by `engine_to_packed`.
+        period (int): The period of the cycle the soup falls into.
+
+    Returns:
+        int: The number of generations before the cycle starts.
+
+    """
+    grids = [engine_from_packed(engine, num_rows, num_cols, soup) for _ in range_compat(4)]
+    try:
+        trail_grid, trail_future, lead_grid, lead_future = grids
+        for _ in range_compat(period):
+            engine.state_transition(lead_grid, lead_future, count_activity=False)
+            lead_grid, lead_future = lead_future, lead_grid
+        generation = 0
+        while not engine_grids_equal(engine, trail_grid, lead_grid):
+            engine.state_transition(trail_grid, trail_future, count_activity=False)
+            engine.state_transition(lead_grid, lead_future, count_activity=False)
+            trail_grid, trail_future = trail_future, trail_grid
+            lead_grid, lead_future = lead_future, lead_grid
+            generation += 1
+    finally:
+        release_grids(engine, *grids)
+    return generation
+
+
+def run_soup(task: SoupTask) -> dict[str, int]:
+    """ Run one seeded random grid until it falls into a cycle or reaches the generation limit.
+
+    The engine cycle search runs on the engine's own grids. Once it finds the period, the soup is
+    replayed from its packed first generation by `soup_cycle_start` to find where the cycle starts.
+
+    Args:
+        task (SoupTask): The seed, grid size, generation limit and engine of the soup.
+
+    Returns:
+        dict: The seed, the lifespan in generations before the cycle starts, the period (0 when
+            the soup did not settle within the limit) and the final population.
+
+    """
+    engine = task.engine
+    random.seed(task.seed)
+    current_grid, future_grid = engine.make_grids(task.num_rows, task.num_cols)
+    try:
+        soup = engine_to_packed(engine, current_grid)
+        cycle_detector = CycleDetector()
+        reset_engine_cycle_search(cycle_detector, engine, current_grid)
+        period = 0
+        for _ in range_compat(task.max_generations):
+            activity = engine.state_transition(
+                current_grid, future_grid, count_activity=not engine.signature
+            )
+            current_grid, future_grid = future_grid, current_grid
+            if is_engine_cycle(cycle_detector, engine, current_grid, activity):
+                period = cycle_detector.period
+                break
+        population = engine_activity(engine, current_grid).population
+    finally:
+        release_grids(engine, current_grid, future_grid)
+    lifespan = task.max_generations
+    if period:
+        lifespan = soup_cycle_start(engine, task.num_rows, task.num_cols, soup, period)
+    return {
+        'seed': task.seed,
+        'lifespan': lifespan,
+        'period': period,
+        'population': population,
+    }
+
+
+def read_soup_seeds(results_path: str) -> set[int]:
+    """Return the seeds already in a results file, dropping a last line cut off mid-write."""
+    if not os.path.exists(results_path):
+        return set()
+    with open(results_path, 'rb+') as results_file:
+        contents = results_file.read()
+        complete_length = contents.rfind(b'\n') + 1
+        if complete_length < len(contents):
+            results_file.truncate(complete_length)
+    lines = contents[:complete_length].decode().splitlines()
+    if results_path.endswith('.csv'):
+        return {int(result['seed']) for result in csv.DictReader(lines)}
+    return {json.loads(line)['seed'] for line in lines if line}
+
+
+def soup_search(
+    engine: Engine,
+    seeds: Iterable[int],
+    num_rows: int,
+    num_cols: int,
+    max_generations: int,
+    results_path: str = DEFAULT_SOUP_RESULTS_PATH,
+    workers: Optional[int] = None,
+) -> dict[str, Any]:
+    """ Run many random soups across a process pool, streaming one result per soup to a file.
+
+    Results are appended as JSON lines, or as CSV rows when the path ends in `.csv`, and flushed
+    as they arrive, in completion order. Seeds already in the file are skipped, so an interrupted
+    search resumes where it stopped.
+
+    Args:
+        engine (Engine): The engine to run every soup on. Its grids must stay in one process.
+        seeds (Iterable): The random seeds of the soups.
+        num_rows (int): Number of rows in each grid.
+        num_cols (int): Number of columns in each grid.
+        max_generations (int): The generations after which a soup that has not settled stops.
+        results_path (str): The JSONL or CSV file to append results to.
+        workers (int): Number of pool processes, defaulting to the CPU count.
+
+    Returns:
+        dict: The soups run and skipped, wall time, soups per second and the longest lifespan.
+
+    """
+    done_seeds = read_soup_seeds(results_path)
+    tasks = [
+        SoupTask(seed, num_rows, num_cols, max_generations, engine)
+        for seed in seeds if seed not in done_seeds
+    ]
+    csv_format = results_path.endswith('.csv')
+    soups = max_lifespan = 0
+    started_at = time.perf_counter()
+    with open(results_path, 'a', newline='') as results_file:
+        csv_writer = csv.DictWriter(results_file, SOUP_RESULT_FIELDS) if csv_format else None
+        if csv_writer and not results_file.tell():
+            csv_writer.writeheader()
+        with multiprocessing.Pool(workers) as pool:
+            for result in pool.imap_unordered(run_soup, tasks, SOUP_CHUNK_SIZE):
+                if csv_writer:
+                    csv_writer.writerow(result)
+                else:
+                    results_file.write(json.dumps(result) + '\n')
+                results_file.flush()
+                soups += 1
+                max_lifespan = max(max_lifespan, result['lifespan'])
+    wall_seconds = time.perf_counter() - started_at
+    return {
+        'soups': soups,
+        'skipped': len(done_seeds),
+        'wall_seconds': wall_seconds,
+        'soups_per_second': soups / wall_seconds if wall_seconds else 0.0,
+        'max_lifespan': max_lifespan,
+    }
+
+
+def run_soup_search(argv: Optional[list[str]] = None) -> dict[str, Any]:
+    """Run a soup search configured by the CLI options, starting from seed `--seed` or 0."""
+    options = parse_cli_options(argv)
+    rows, cols, steps, *_ = parse_cli_arguments(
+        SOUP_DEFAULT_ROWS,
+        SOUP_DEFAULT_COLS,
+        argv,
+        default_steps=SOUP_DEFAULT_GENERATIONS,
+    )
+    first_seed = options.seed or 0
+    return soup_search(
+        select_engine(options),
+        range_compat(first_seed, first_seed + options.soups),
+        rows,
+        cols,
+        steps,
+        options.results,
+        options.workers,
+    )
+
+
 def run_game(stdscr: curses.window) -> None:
     """ Runs the main game loop.
 
+    Generations run on a `SimulationWorker` thread, while this loop reads input and draws the
+    newest published generation every `refresh_time` seconds, skipping the ones in between. Keys
+    set the generations per tick, pause the simulation or advance it one generation. A status
+    line shows the generation, its population, births, deaths and bounding box size, the speed,
+    the simulation rate and the render rate.
+
     Args:
         stdscr (WindowObject): A representation of the screen provided by ncurses' wrapper.
 
@@ -436,8 +4720,20 @@ def run_game(stdscr: curses.window) -> None:
         None
 
     """
+    engine = LIST_ENGINE
+    current_grid = future_grid = None
+    recording = None
+    worker = None
+    phase_timings = PhaseTimings()
     try:
         stdscr.clear()
+        options = parse_cli_options()
+        engine = select_engine(options)
+        resumed_header = read_checkpoint_header(options.resume) if options.resume else None
+        seed = options.seed
+        if seed is None and resumed_header is not None:
+            seed = resumed_header.seed
+        seed_random(seed)
         (
             grid_1,
             grid_2,
@@ -445,51 +4741,286 @@ def run_game(stdscr: curses.window) -> None:
             refresh_time,
             foreground_color,
             background_color,
-        ) = init_game(stdscr)
+        ) = init_game(
+            stdscr,
+            engine,
+            options.half_block,
+            options.pattern,
+            options.offset,
+            options.resume,
+        )
         curses.curs_set(0)
         color_pair = configure_colors(foreground_color, background_color)
         configure_input(stdscr, refresh_time)
         current_grid, future_grid = grid_1, grid_2
-        recent_states: Deque[StateSignature] = deque(maxlen=MAX_TRACKED_STATES)
-        record_state(recent_states, current_grid)
-        last_memory_log_at = 0.0
+        num_rows, num_cols = grid_size(current_grid)
+        cycle_detector = CycleDetector()
+        if options.resume:
+            restore_cycle_detector(cycle_detector, options.resume, engine, current_grid)
+        else:
+            reset_engine_cycle_search(cycle_detector, engine, current_grid)
+        generation = resumed_header.generation if resumed_header else 0
+        if options.record:
+            recording = RecordingWriter(options.record, num_rows, num_cols)
+            recording.write_frame(engine_to_packed(engine, current_grid))
 
         append_debug_log(
-            '[{}] session_start pid={} rows={} cols={} refresh_time={}'.format(
+            '[{}] session_start pid={} rows={} cols={} refresh_time={} engine={}'.format(
                 current_timestamp(),
                 os.getpid(),
-                len(current_grid),
-                len(current_grid[0]),
+                num_rows,
+                num_cols,
                 refresh_time,
+                options.engine,
             ),
         )
-        last_memory_log_at = log_memory_usage(last_memory_log_at, len(recent_states))
+        log_memory_usage(0.0, cycle_detector.tracked_state_count)
 
-        stdscr.addstr(0, 0, print_grid(current_grid), color_pair)
+        frame_state = FrameState()
+        screen_rows, screen_cols = stdscr.getmaxyx()
+        viewport = Viewport(
+            max(1, screen_rows - STATUS_LINE_ROWS),
+            screen_cols,
+            half_block=options.half_block,
+        )
+        window = viewport_window(viewport, num_rows, num_cols)
+        current_rows = engine_window_rows(engine, current_grid, window)
+        render_grid(
+            stdscr,
+            current_rows,
+            frame_state,
+            color_pair,
+            options.renderer,
+            options.half_block,
+            viewport,
+            window=window,
+        )
         stdscr.refresh()
 
-        for _ in range_compat(steps):
-            if should_exit(stdscr.getch()):
+        worker = SimulationWorker(
+            engine,
+            current_grid,
+            future_grid,
+            cycle_detector,
+            steps,
+            refresh_time,
+            generation,
+            phase_timings,
+            recording,
+            options.checkpoint,
+            seed,
+        )
+        current_grid = future_grid = None
+        activity = worker.activity
+        rows_window = window
+        worker.request_frame(window)
+        worker.start()
+        frames_rendered = 0
+        rate_started_at = time.monotonic()
+        rate_generation, rate_frames = generation, 0
+        simulation_rate = render_rate = 0.0
+        status = ''
+
+        while True:
+            # The input phase includes the frame delay that `getch` waits out.
+            phase_started_at = time.perf_counter_ns()
+            key_pressed = stdscr.getch()
+            record_phase(phase_timings, 'input', phase_started_at)
+            if should_exit(key_pressed):
                 break
-            state_transition(current_grid, future_grid)
-            if is_repeated_state(recent_states, future_grid):
-                current_grid, future_grid = restart_grids(
-                    len(current_grid),
-                    len(current_grid[0]),
-                )
-                recent_states = deque(maxlen=MAX_TRACKED_STATES)
-                record_state(recent_states, current_grid)
+            controls_changed = True
+            if key_pressed in SAVE_KEYS:
+                worker.request_save()
+            elif key_pressed in SPEED_KEYS:
+                worker.generations_per_tick = SPEED_KEYS[key_pressed]
+            elif key_pressed in PAUSE_KEYS:
+                worker.toggle_pause()
+            elif key_pressed in SINGLE_STEP_KEYS:
+                worker.request_step()
             else:
-                record_state(recent_states, future_grid)
-                current_grid, future_grid = future_grid, current_grid
-            last_memory_log_at = log_memory_usage(last_memory_log_at, len(recent_states))
-            stdscr.addstr(0, 0, print_grid(current_grid), color_pair)
+                controls_changed = update_viewport(
+                    stdscr, viewport, frame_state, key_pressed, num_rows, num_cols
+                )
+                if controls_changed:
+                    window = viewport_window(viewport, num_rows, num_cols)
+                    worker.request_frame(window)
+            # Checked before taking a frame, so the last generation is drawn before exiting.
+            finished = worker.is_finished()
+            frame = take_frame(worker.frame_buffer)
+            if frame is not None:
+                current_rows, generation, activity, rows_window = frame
+            elif finished:
+                break
+            elif not controls_changed:
+                continue
+            if rows_window != window:
+                # The rows were converted for a view that has since moved; the next frame holds
+                # the new one.
+                continue
+
+            phase_started_at = time.perf_counter_ns()
+            render_grid(
+                stdscr,
+                current_rows,
+                frame_state,
+                color_pair,
+                options.renderer,
+                options.half_block,
+                viewport,
+                activity,
+                rows_window,
+            )
+            frames_rendered += 1
+            rate_elapsed = time.monotonic() - rate_started_at
+            if rate_elapsed >= RATE_WINDOW_SECONDS:
+                simulation_rate = (worker.generation - rate_generation) / rate_elapsed
+                render_rate = (frames_rendered - rate_frames) / rate_elapsed
+                rate_started_at += rate_elapsed
+                rate_generation, rate_frames = worker.generation, frames_rendered
+                render_fields = {
+                    'simulation_rate': round(simulation_rate),
+                    'render_rate': round(render_rate),
+                }
+                if options.renderer == 'diff':
+                    render_fields.update(frame_stats(frame_state))
+                worker.render_fields = render_fields
+            status = 'gen {}  pop {} +{} -{}  box {}x{}  speed {}x{}  {:.1f} gen/s  {:.1f} fps'
+            status = status.format(
+                generation,
+                activity.population,
+                activity.births,
+                activity.deaths,
+                activity.bottom - activity.top,
+                activity.right - activity.left,
+                worker.generations_per_tick,
+                ' paused' if worker.paused else '',
+                simulation_rate,
+                render_rate,
+            )
+            draw_status_line(stdscr, viewport, status, color_pair)
+            stdscr.refresh()
+            record_phase(phase_timings, 'render', phase_started_at)
+        if worker.error is not None:
+            raise worker.error
+    except KeyboardInterrupt:
+        pass
+    except Exception:
+        log_unhandled_exception()
+        raise
+    finally:
+        if worker is not None:
+            worker.stop()
+            current_grid, future_grid = worker.current_grid, worker.future_grid
+        if recording is not None:
+            recording.close()
+        release_grids(engine, current_grid, future_grid)
+        log_phase_timings(0.0, phase_timings, force=True)
+
+
+def run_playback(stdscr: curses.window) -> None:
+    """ Plays back a recorded run, from the `--start` generation, at the `--delay` frame rate.
+
+    Args:
+        stdscr (WindowObject): A representation of the screen provided by ncurses' wrapper.
+
+    Returns:
+        None
+
+    """
+    options = parse_cli_options()
+    recording = RecordingReader(options.play)
+    try:
+        stdscr.clear()
+        _, _, steps, refresh_time, foreground_color, background_color = parse_cli_arguments(
+            recording.num_rows,
+            recording.num_cols,
+        )
+        curses.curs_set(0)
+        color_pair = configure_colors(foreground_color, background_color)
+        configure_input(stdscr, refresh_time)
+        frame_state = FrameState()
+        screen_rows, screen_cols = stdscr.getmaxyx()
+        viewport = Viewport(
+            max(1, screen_rows - STATUS_LINE_ROWS),
+            screen_cols,
+            half_block=options.half_block,
+        )
+        frames = itertools.islice(recording.frames(options.start), steps)
+        for generation, packed in enumerate(frames, max(0, options.start)):
+            rows = bitboard_to_rows(
+                bitboard_from_packed(recording.num_rows, recording.num_cols, packed)
+            )
+            render_grid(
+                stdscr,
+                rows,
+                frame_state,
+                color_pair,
+                options.renderer,
+                options.half_block,
+                viewport,
+            )
+            draw_status_line(stdscr, viewport, 'generation {}'.format(generation), color_pair)
             stdscr.refresh()
+            key_pressed = stdscr.getch()
+            if should_exit(key_pressed):
+                break
+            update_viewport(
+                stdscr,
+                viewport,
+                frame_state,
+                key_pressed,
+                recording.num_rows,
+                recording.num_cols,
+            )
     except KeyboardInterrupt:
         pass
     except Exception:
         log_unhandled_exception()
         raise
+    finally:
+        recording.close()
+
+
+def format_report(fields: dict[str, Any]) -> str:
+    """Format report fields as key=value pairs, with floats rounded for reading."""
+    return ' '.join(
+        '{}={:.4f}'.format(name, value) if isinstance(value, float) else '{}={}'.format(name, value)
+        for name, value in fields.items()
+    )
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Run a report or a headless simulation, or the game on curses or an ANSI stream."""
+    options = parse_cli_options(argv)
+    if options.parallel_speedup:
+        rows, cols, *_ = parse_cli_arguments(
+            PARALLEL_SPEEDUP_DEFAULT_SIZE,
+            PARALLEL_SPEEDUP_DEFAULT_SIZE,
+            argv,
+        )
+        print(format_report(parallel_speedup(
+            rows,
+            cols,
+            PARALLEL_SPEEDUP_GENERATIONS,
+            options.workers,
+            options.tile_rows,
+        )))
+        return
+    if options.soup_search:
+        print(format_report(run_soup_search(argv)))
+        return
+    if options.headless:
+        print(format_report(run_headless(argv)))
+        return
+    if options.output == 'ansi':
+        try:
+            stats = run_ansi(argv)
+        except Exception:
+            log_unhandled_exception()
+            raise
+        sys.stderr.write(format_report(stats) + '\n')
+        return
+    wrapper(run_playback if options.play else run_game)
 
 if __name__ == '__main__':
-    wrapper(run_game)
+    main()
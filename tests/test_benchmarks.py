@@ -0,0 +1,58 @@
+import unittest
+
+from benchmarks import benchmark_game
+
+
+class BenchmarkTests(unittest.TestCase):
+    def test_run_benchmarks_covers_the_size_and_density_matrix(self):
+        results = benchmark_game.run_benchmarks(
+            sizes=((4, 5),),
+            densities=(0.25, 0.5),
+            engines=['list', 'bitboard'],
+            repeats=1,
+        )['results']
+        transitions = [result for result in results if result['name'] == 'state_transition']
+
+        self.assertEqual(
+            [(result['engine'], result['density']) for result in transitions],
+            [('list', 0.25), ('bitboard', 0.25), ('list', 0.5), ('bitboard', 0.5)],
+        )
+        self.assertEqual(
+            {result['name'] for result in results},
+            {'rand_init_grid', 'state_transition', 'print_grid', 'reset_engine_cycle_search',
+             'is_engine_cycle'},
+        )
+        self.assertEqual(
+            [
+                (result['engine'], result['density']) for result in results
+                if result['name'] == 'is_engine_cycle'
+            ],
+            [('list', 0.25), ('bitboard', 0.25), ('list', 0.5), ('bitboard', 0.5)],
+        )
+        self.assertTrue(all(result['seconds'] >= 0 for result in results))
+
+    def test_seeded_grid_is_reproducible(self):
+        self.assertEqual(
+            benchmark_game.seeded_grid(6, 7, 0.3),
+            benchmark_game.seeded_grid(6, 7, 0.3),
+        )
+
+    def test_compare_results_flags_slowdowns_above_threshold(self):
+        def run(seconds):
+            return {'results': [
+                {'name': 'state_transition', 'engine': 'list', 'rows': 8, 'cols': 8,
+                 'density': 0.5, 'seconds': seconds[0]},
+                {'name': 'print_grid', 'engine': None, 'rows': 8, 'cols': 8,
+                 'density': 0.5, 'seconds': seconds[1]},
+            ]}
+
+        comparisons = benchmark_game.compare_results(run((1.0, 1.0)), run((1.5, 1.05)), 0.1)
+
+        self.assertEqual(
+            [(comparison['name'], comparison['regression']) for comparison in comparisons],
+            [('state_transition', True), ('print_grid', False)],
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,8 @@
+import functools
+import io
 import sys
 import tempfile
 import unittest
-from collections import deque
 from unittest import mock
 
 import game
@@ -15,6 +16,35 @@ class DummyScreen(object):
         self.timeout_value = value
 
 
+class RecordingScreen(object):
+    def __init__(self, screen_rows=24, screen_cols=80):
+        self.writes = []
+        self.redraw_count = 0
+        self.screen_size = (screen_rows, screen_cols)
+
+    def getmaxyx(self):
+        return self.screen_size
+
+    def addstr(self, row_num, col_num, text, attributes):
+        self.writes.append((row_num, col_num, text))
+
+    def redrawwin(self):
+        self.redraw_count += 1
+
+
+def glider_and_successor(size, generations):
+    """Return a glider on a size x size torus, and its rows the given generations later."""
+    grid = [[0] * size for _ in range(size)]
+    for row_num, col_num in ((0, 1), (1, 2), (2, 0), (2, 1), (2, 2)):
+        grid[row_num][col_num] = 1
+    expected = [row[:] for row in grid]
+    for _ in range(generations):
+        future = [[0] * size for _ in range(size)]
+        game.state_transition(expected, future)
+        expected = future
+    return grid, expected
+
+
 class GameTests(unittest.TestCase):
     def test_rand_init_grid_returns_requested_shape(self):
         grid = game.rand_init_grid(3, 4)
@@ -48,43 +78,61 @@ class GameTests(unittest.TestCase):
 
         self.assertEqual(((1, 0), (0, 1)), signature)
 
-    def test_is_repeated_state_reports_previous_states(self):
-        first_state = [
+    def test_is_cycle_reports_oscillator_period(self):
+        vertical = [
             [0, 1, 0],
             [0, 1, 0],
             [0, 1, 0],
         ]
-        second_state = [
+        horizontal = [
             [0, 0, 0],
             [1, 1, 1],
             [0, 0, 0],
         ]
-        recent_states = deque([game.grid_signature(first_state)], maxlen=game.MAX_TRACKED_STATES)
-
-        self.assertTrue(game.is_repeated_state(recent_states, first_state))
-        self.assertFalse(game.is_repeated_state(recent_states, second_state))
-
-    def test_record_state_adds_signature_to_recent_states(self):
-        state = [
-            [0, 1, 0],
-            [0, 1, 0],
-            [0, 1, 0],
-        ]
-        recent_states = deque(maxlen=game.MAX_TRACKED_STATES)
-
-        game.record_state(recent_states, state)
-
-        self.assertEqual([game.grid_signature(state)], list(recent_states))
-
-    def test_record_state_evicts_states_older_than_limit(self):
-        recent_states = deque(maxlen=game.MAX_TRACKED_STATES)
-
-        for index in range(game.MAX_TRACKED_STATES + 1):
-            game.record_state(recent_states, [[index]])
-
-        self.assertEqual(game.MAX_TRACKED_STATES, len(recent_states))
-        self.assertEqual(game.grid_signature([[1]]), recent_states[0])
-        self.assertEqual(game.grid_signature([[game.MAX_TRACKED_STATES]]), recent_states[-1])
+        cycle_detector = game.CycleDetector()
+        game.reset_cycle_detector(cycle_detector, vertical)
+
+        states = [horizontal, vertical, horizontal]
+        found = [game.is_cycle(cycle_detector, [row[:] for row in state]) for state in states]
+
+        self.assertEqual([False, False, True], found)
+        self.assertEqual(2, cycle_detector.period)
+        self.assertEqual(1, cycle_detector.tracked_state_count)
+
+    def test_is_cycle_finds_long_periods(self):
+        # A glider on an 8x8 torus returns to the same cells every 32 generations.
+        current_grid = [[0] * 8 for _ in range(8)]
+        for row_num, col_num in ((0, 1), (1, 2), (2, 0), (2, 1), (2, 2)):
+            current_grid[row_num][col_num] = 1
+        future_grid = [[0] * 8 for _ in range(8)]
+        cycle_detector = game.CycleDetector()
+        game.reset_cycle_detector(cycle_detector, current_grid)
+
+        for _ in range(200):
+            game.state_transition(current_grid, future_grid)
+            if game.is_cycle(cycle_detector, future_grid):
+                break
+            current_grid, future_grid = future_grid, current_grid
+
+        self.assertEqual(32, cycle_detector.period)
+
+    def test_is_cycle_confirms_hash_matches_against_checkpoint(self):
+        cycle_detector = game.CycleDetector()
+        game.reset_cycle_detector(cycle_detector, [[1, 0]])
+        cycle_detector.keys = (game.array('Q', [0, 0]),)
+
+        self.assertFalse(game.is_cycle(cycle_detector, [[0, 1]]))
+        self.assertTrue(game.is_cycle(cycle_detector, [[0, 1]]))
+
+    def test_zobrist_hash_is_reproducible_and_position_dependent(self):
+        keys = game.zobrist_keys(2, 3)
+
+        self.assertEqual(keys, game.zobrist_keys.__wrapped__(2, 3))
+        self.assertEqual(0, game.zobrist_hash(keys, [[0, 0, 0], [0, 0, 0]]))
+        self.assertNotEqual(
+            game.zobrist_hash(keys, [[1, 0, 0], [0, 0, 0]]),
+            game.zobrist_hash(keys, [[0, 0, 0], [0, 0, 1]]),
+        )
 
     def test_restart_grids_pauses_before_creating_new_grids(self):
         new_grids = ([[1, 0]], [[0, 0]])
@@ -97,15 +145,46 @@ class GameTests(unittest.TestCase):
         make_grids.assert_called_once_with(1, 2)
         self.assertEqual(new_grids, restarted_grids)
 
-    def test_get_memory_usage_kb_parses_ps_output(self):
-        with mock.patch.object(game.subprocess, 'check_output', return_value=' 1234\n') as check_output:
-            memory_usage_kb = game.get_memory_usage_kb()
+    def test_get_memory_usage_kb_reads_resident_pages_from_statm(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            statm_path = temp_dir + '/statm'
+            with open(statm_path, 'w') as statm_file:
+                statm_file.write('5000 300 100 10 0 200 0\n')
+            with mock.patch.object(game.os, 'sysconf', return_value=4096):
+                memory_usage_kb = game.get_memory_usage_kb(statm_path)
+
+        self.assertEqual(1200, memory_usage_kb)
+
+    def test_get_memory_usage_kb_falls_back_without_proc(self):
+        with mock.patch.object(game, 'get_peak_memory_usage_kb', return_value=4321):
+            memory_usage_kb = game.get_memory_usage_kb('/nonexistent/statm')
+
+        self.assertEqual(4321, memory_usage_kb)
 
-        check_output.assert_called_once_with(
-            ['ps', '-o', 'rss=', '-p', str(game.os.getpid())],
-            universal_newlines=True,
+    def test_phase_percentiles_use_nearest_rank_in_microseconds(self):
+        phase_timings = game.PhaseTimings()
+        phase_timings.samples['transition'].extend(sample * 1000 for sample in range(1, 101))
+
+        self.assertEqual(
+            {'transition_p50_us': 50, 'transition_p95_us': 95, 'transition_p99_us': 99},
+            game.phase_percentiles(phase_timings),
         )
-        self.assertEqual(1234, memory_usage_kb)
+
+    def test_log_phase_timings_writes_summary_at_interval_or_when_forced(self):
+        phase_timings = game.PhaseTimings()
+        phase_timings.samples['render'].append(2000)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            log_path = temp_dir + '/game_debug.log'
+            skipped_at = game.log_phase_timings(5.0, phase_timings, log_path, current_time=6.0)
+            forced_at = game.log_phase_timings(5.0, phase_timings, log_path, 6.0, force=True)
+
+            game.drain_debug_log(close_files=True)
+            with open(log_path) as debug_log:
+                log_contents = debug_log.read()
+
+        self.assertEqual((5.0, 6.0), (skipped_at, forced_at))
+        self.assertEqual(1, log_contents.count('phase_timings'))
+        self.assertIn('render_p50_us=2 render_p95_us=2 render_p99_us=2', log_contents)
 
     def test_log_memory_usage_writes_sample_after_interval(self):
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -119,6 +198,7 @@ class GameTests(unittest.TestCase):
                         current_time=game.MEMORY_LOG_INTERVAL_SECONDS,
                     )
 
+            game.drain_debug_log(close_files=True)
             with open(log_path) as debug_log:
                 log_contents = debug_log.read()
 
@@ -126,6 +206,24 @@ class GameTests(unittest.TestCase):
         self.assertIn('rss_kb=2048', log_contents)
         self.assertIn('tracked_states=3', log_contents)
 
+    def test_log_memory_usage_appends_engine_stats(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            log_path = temp_dir + '/game_debug.log'
+            with mock.patch.object(game, 'get_memory_usage_kb', return_value=2048):
+                game.log_memory_usage(
+                    0.0,
+                    3,
+                    log_path=log_path,
+                    current_time=game.MEMORY_LOG_INTERVAL_SECONDS,
+                    extra_fields={'evaluated_cells': 15},
+                )
+
+            game.drain_debug_log(close_files=True)
+            with open(log_path) as debug_log:
+                log_contents = debug_log.read()
+
+        self.assertIn('tracked_states=3 evaluated_cells=15', log_contents)
+
     def test_log_memory_usage_skips_before_interval(self):
         with tempfile.TemporaryDirectory() as temp_dir:
             log_path = temp_dir + '/game_debug.log'
@@ -140,6 +238,23 @@ class GameTests(unittest.TestCase):
         get_memory_usage_kb.assert_not_called()
         self.assertEqual(0.0, last_logged_at)
 
+    def test_debug_log_writer_batches_and_rotates_by_size(self):
+        writer = game.DebugLogWriter(flush_bytes=1, max_bytes=30, backup_count=2)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            log_path = temp_dir + '/game_debug.log'
+            for index in range(8):
+                writer.write('message {} padding'.format(index), log_path)
+            writer.drain(close_files=True)
+
+            with open(log_path + '.2') as oldest_log, open(log_path + '.1') as older_log:
+                backups = [oldest_log.read(), older_log.read()]
+            self.assertFalse(game.os.path.exists(log_path + '.3'))
+
+        self.assertEqual(
+            ['message 4 padding\nmessage 5 padding\n', 'message 6 padding\nmessage 7 padding\n'],
+            backups,
+        )
+
     def test_log_unhandled_exception_writes_traceback(self):
         with tempfile.TemporaryDirectory() as temp_dir:
             log_path = temp_dir + '/game_debug.log'
@@ -149,6 +264,7 @@ class GameTests(unittest.TestCase):
                 with mock.patch.object(game, 'current_timestamp', return_value='2026-04-01T00:00:00'):
                     game.log_unhandled_exception(log_path=log_path)
 
+            game.drain_debug_log(close_files=True)
             with open(log_path) as debug_log:
                 log_contents = debug_log.read()
 
@@ -174,6 +290,535 @@ class GameTests(unittest.TestCase):
 
         self.assertEqual(b'\xe2\x96\x84  \n  \xe2\x96\x84', rendered)
 
+    def test_print_grid_half_block_packs_two_rows_per_line(self):
+        rendered = game.print_grid_half_block([[1, 0, 1, 0], [0, 1, 1, 0], [1, 0, 0, 0]])
+
+        self.assertEqual(
+            u'\u2580\u2584\u2588 \n\u2580   '.encode('UTF-8'),
+            rendered,
+        )
+
+    def test_init_game_sizes_half_block_grid_to_terminal(self):
+        with mock.patch.object(sys, 'argv', ['game.py']):
+            grid_1 = game.init_game(DummyScreen(), half_block=True)[0]
+
+        self.assertEqual(48, len(grid_1))
+        self.assertEqual(79, len(grid_1[0]))
+
+    def test_changed_runs_merges_nearby_changes(self):
+        previous_row = [0, 0, 0, 0, 0, 0, 0, 0, 0]
+        row = [1, 0, 1, 0, 0, 0, 0, 1, 1]
+
+        self.assertEqual([(0, 3), (7, 9)], game.changed_runs(previous_row, row))
+
+    def test_draw_frame_writes_only_changed_runs(self):
+        screen = RecordingScreen()
+        frame_state = game.FrameState()
+        game.draw_frame(screen, [[1, 0], [0, 1]], frame_state, 0)
+        screen.writes = []
+
+        game.draw_frame(screen, [[1, 0], [1, 1]], frame_state, 0)
+
+        self.assertEqual([(1, 0, game.CELL_GLYPHS[1])], screen.writes)
+        self.assertEqual(
+            {'cells_written': 1, 'bytes_written': len(game.CELL_GLYPHS[1])},
+            game.frame_stats(frame_state),
+        )
+
+    def test_draw_frame_repaints_everything_periodically(self):
+        screen = RecordingScreen()
+        frame_state = game.FrameState()
+        for _ in range(game.FULL_REPAINT_INTERVAL_FRAMES + 1):
+            game.draw_frame(screen, [[1, 0], [0, 1]], frame_state, 0)
+        screen.writes = []
+
+        game.draw_frame(screen, [[1, 0], [0, 1]], frame_state, 0)
+
+        self.assertEqual(2, screen.redraw_count)
+        self.assertEqual(
+            [(0, 0, game.print_grid([[1, 0]])), (1, 0, game.print_grid([[0, 1]]))],
+            screen.writes,
+        )
+
+    def test_draw_status_line_needs_a_spare_row(self):
+        screen = RecordingScreen(3, 8)
+        game.draw_status_line(screen, game.Viewport(2, 8), 'generation 5', 0)
+        one_row_screen = RecordingScreen(1, 8)
+        game.draw_status_line(one_row_screen, game.Viewport(1, 8), 'generation 5', 0)
+
+        self.assertEqual([(2, 0, 'generat')], screen.writes)
+        self.assertEqual([], one_row_screen.writes)
+
+    def test_handle_viewport_key_pans_within_the_universe(self):
+        viewport = game.Viewport(10, 20)
+
+        self.assertTrue(game.handle_viewport_key(viewport, game.curses.KEY_RIGHT, 100, 100))
+        self.assertFalse(game.handle_viewport_key(viewport, game.curses.KEY_UP, 100, 100))
+        self.assertEqual((0, 2), (viewport.top, viewport.left))
+        for _ in range(50):
+            game.handle_viewport_key(viewport, game.curses.KEY_DOWN, 100, 100)
+        self.assertEqual(90, viewport.top)
+
+    def test_handle_viewport_key_zooms_out_until_the_universe_fits(self):
+        viewport = game.Viewport(10, 20, top=40, left=40)
+
+        while game.handle_viewport_key(viewport, ord('-'), 100, 100):
+            pass
+
+        self.assertEqual((16, 0, 0), (viewport.zoom, viewport.top, viewport.left))
+        self.assertTrue(game.handle_viewport_key(viewport, ord('+'), 100, 100))
+        self.assertEqual((8, 20, 20), (viewport.zoom, viewport.top, viewport.left))
+
+    def test_viewport_converts_only_visible_cells(self):
+        grid = [
+            [1, 0, 1, 1, 0],
+            [0, 0, 1, 1, 0],
+            [0, 0, 0, 0, 0],
+            [0, 1, 0, 0, 0],
+            [1, 1, 1, 1, 1],
+        ]
+
+        self.assertEqual([[0, 1], [0, 0]], game.visible_rows(grid, game.Viewport(2, 4, top=1, left=1)))
+        self.assertEqual(
+            [[1, 4], [1, 0]],
+            game.block_density_rows(grid, game.Viewport(2, 4, zoom=2)),
+        )
+
+    def test_block_density_rows_skip_blocks_outside_the_bounding_box(self):
+        grid = [[0] * 16 for _ in range(16)]
+        for row_num, col_num in ((5, 6), (6, 7), (7, 5), (7, 6), (7, 7), (9, 12)):
+            grid[row_num][col_num] = 1
+        activity = game.rows_activity(grid)
+
+        for viewport in (game.Viewport(4, 8, zoom=4), game.Viewport(3, 6, top=4, left=4, zoom=2)):
+            self.assertEqual(
+                game.block_density_rows(grid, viewport),
+                game.block_density_rows(grid, viewport, activity),
+            )
+        self.assertEqual(
+            [[0] * 4] * 4,
+            game.block_density_rows(grid, game.Viewport(4, 8, zoom=4), game.Activity(0, 0, 0)),
+        )
+
+    def test_ansi_color_codes_support_names_and_palette_indices(self):
+        self.assertEqual(b'\x1b[0;31;40m', game.ansi_color_codes('red', 'black'))
+        self.assertEqual(b'\x1b[0;38;5;196;48;5;234m', game.ansi_color_codes(196, 234))
+
+    def test_encode_ansi_row_skips_long_blank_runs(self):
+        live = game.CELL_GLYPHS[1]
+
+        self.assertEqual(live + b' ' + live + b' ', game.encode_ansi_row([1, 1]))
+        self.assertEqual(
+            live + b' \x1b[10X\x1b[10C' + live + b' ',
+            game.encode_ansi_row([1, 0, 0, 0, 0, 0, 1]),
+        )
+
+    def test_run_ansi_streams_one_write_per_frame(self):
+        output = io.BytesIO()
+
+        with mock.patch.object(game.time, 'sleep'):
+            stats = game.run_ansi(argv=['6', '8', '3', '0'], output=output)
+
+        self.assertEqual(4, stats['frames'])
+        self.assertEqual(4, output.getvalue().count(b'\x1b[0;32;40m'))
+        self.assertTrue(output.getvalue().startswith(game.ANSI_START_SEQUENCE))
+        self.assertTrue(output.getvalue().endswith(game.ANSI_END_SEQUENCE))
+
+    def test_run_ansi_resumes_the_saved_cycle_search(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            checkpoint_path = temp_dir + '/game_checkpoint.bin'
+            game.save_checkpoint(
+                checkpoint_path, None, [[0, 1], [1, 0]], 2, 2, 0, None, game.CycleDetector()
+            )
+
+            with mock.patch.object(game.time, 'sleep'), \
+                    mock.patch.object(game, 'restore_cycle_detector') as restore_cycle_detector:
+                game.run_ansi(argv=['--resume', checkpoint_path, '2', '2', '0', '0'],
+                              output=io.BytesIO())
+
+        _, restored_path, engine, grid = restore_cycle_detector.call_args.args
+        self.assertEqual(checkpoint_path, restored_path)
+        self.assertEqual([[0, 1], [1, 0]], engine.to_rows(grid))
+
+    def test_take_frame_hands_over_each_wanted_generation_once(self):
+        frame_buffer = game.FrameBuffer()
+        rows = [[1, 0], [0, 1]]
+
+        self.assertTrue(game.publish_frame(frame_buffer, rows, 1))
+        self.assertFalse(game.publish_frame(frame_buffer, [[0, 0], [0, 0]], 2))
+        self.assertEqual((rows, 1, None, None), game.take_frame(frame_buffer))
+        self.assertIsNone(game.take_frame(frame_buffer))
+        self.assertTrue(game.publish_frame(frame_buffer, rows, 3))
+
+    def test_simulation_worker_runs_steps_on_its_own_thread(self):
+        grid, expected = glider_and_successor(6, 4)
+        cycle_detector = game.CycleDetector()
+        game.reset_engine_cycle_search(cycle_detector, game.LIST_ENGINE, grid)
+
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                mock.patch.object(game, 'append_debug_log'):
+            worker = game.SimulationWorker(
+                game.LIST_ENGINE,
+                grid,
+                [[0] * 6 for _ in range(6)],
+                cycle_detector,
+                steps=4,
+                checkpoint_path=temp_dir + '/checkpoint.bin',
+            )
+            worker.save_requested.set()
+            worker.start()
+            worker.thread.join()
+
+            self.assertEqual(0, game.read_checkpoint_header(worker.checkpoint_path).generation)
+        self.assertIsNone(worker.error)
+        self.assertTrue(worker.is_finished())
+        self.assertEqual(
+            (expected, 4, game.rows_activity(expected)._replace(births=2, deaths=2), None),
+            game.take_frame(worker.frame_buffer),
+        )
+
+    def test_step_generations_matches_single_generations_on_every_engine(self):
+        grid, expected = glider_and_successor(8, 7)
+
+        for engine_name in sorted(game.ENGINES):
+            if engine_name == 'numpy' and game.np is None:
+                continue
+            engine = game.select_engine(
+                game.parse_cli_options(argv=['--engine', engine_name, '--workers', '1'])
+            )
+            current_grid = engine.from_cells(8, 8, game.cells_from_packed(
+                8, 8, game.bitboard_to_packed(game.bitboard_from_rows(grid))
+            ))
+            future_grid = engine.from_cells(8, 8, ())
+            cycle_detector = game.CycleDetector()
+            game.reset_engine_cycle_search(cycle_detector, engine, current_grid)
+            try:
+                for generations in (3, 4):
+                    current_grid, future_grid, advanced, _ = game.step_generations(
+                        engine, current_grid, future_grid, generations, cycle_detector
+                    )
+                    self.assertEqual(generations, advanced, engine_name)
+                rows = [list(row) for row in engine.to_rows(current_grid)]
+            finally:
+                game.release_grids(engine, current_grid, future_grid)
+
+            self.assertEqual(expected, rows, engine_name)
+
+    def test_step_generations_stops_and_restarts_at_a_cycle(self):
+        grid = [[0] * 6 for _ in range(6)]
+        grid[2][1] = grid[2][2] = grid[2][3] = 1
+        cycle_detector = game.CycleDetector()
+        game.reset_engine_cycle_search(cycle_detector, game.LIST_ENGINE, grid)
+
+        with mock.patch.object(game, 'RESTART_DELAY_SECONDS', 0):
+            current_grid, _, advanced, activity = game.step_generations(
+                game.LIST_ENGINE, grid, [[0] * 6 for _ in range(6)], 100, cycle_detector
+            )
+
+        self.assertEqual(3, advanced)
+        self.assertEqual(game.rows_activity(current_grid), activity)
+
+        stop_requested = game.threading.Event()
+        stop_requested.set()
+        _, _, advanced, activity = game.step_generations(
+            game.LIST_ENGINE, current_grid, grid, 100, cycle_detector, stop_requested
+        )
+        self.assertEqual(0, advanced)
+        self.assertEqual(game.rows_activity(current_grid), activity)
+        self.assertEqual(game.grid_signature(current_grid), cycle_detector.checkpoint)
+        self.assertEqual(
+            game.zobrist_hash(cycle_detector.keys, current_grid), cycle_detector.checkpoint_hash
+        )
+
+    def test_list_engine_cycle_search_compares_whole_grids_only_at_checkpoints(self):
+        grid, expected = glider_and_successor(8, 10)
+        cycle_detector = game.CycleDetector()
+        game.reset_engine_cycle_search(cycle_detector, game.LIST_ENGINE, grid)
+
+        with mock.patch.object(game, 'grid_signature', wraps=game.grid_signature) as signature:
+            current_grid, _, advanced, _ = game.step_generations(
+                game.LIST_ENGINE, grid, [[0] * 8 for _ in range(8)], 10, cycle_detector
+            )
+
+        self.assertEqual((expected, 10), (current_grid, advanced))
+        # The checkpoint moves after generations 1, 3 and 7.
+        self.assertEqual(3, signature.call_count)
+
+    def test_simulation_worker_fast_forwards_and_single_steps(self):
+        grid, fast_forwarded = glider_and_successor(8, 25)
+        stepped = glider_and_successor(8, 2)[1]
+        workers = []
+        for steps in (25, 2):
+            current_grid = game.bitboard_from_rows(grid)
+            cycle_detector = game.CycleDetector()
+            game.reset_engine_cycle_search(cycle_detector, game.BITBOARD_ENGINE, current_grid)
+            workers.append(game.SimulationWorker(
+                game.BITBOARD_ENGINE,
+                current_grid,
+                game.bitboard_from_rows([[0] * 8 for _ in range(8)]),
+                cycle_detector,
+                steps=steps,
+            ))
+            workers[-1].generations_per_tick = 10
+        workers[1].request_step()
+        workers[1].request_step()
+
+        with mock.patch.object(game, 'append_debug_log'):
+            for worker in workers:
+                worker.start()
+                worker.thread.join()
+
+        self.assertEqual([None, None], [worker.error for worker in workers])
+        self.assertEqual([25, 2], [worker.generation for worker in workers])
+        self.assertEqual([False, True], [worker.paused for worker in workers])
+        self.assertEqual(
+            [fast_forwarded, stepped],
+            [game.bitboard_to_rows(worker.current_grid) for worker in workers],
+        )
+
+    def test_simulation_worker_saves_while_paused(self):
+        grid = [[0, 1, 0], [0, 1, 0], [0, 1, 0]]
+        cycle_detector = game.CycleDetector()
+        game.reset_engine_cycle_search(cycle_detector, game.LIST_ENGINE, grid)
+        saved = game.threading.Event()
+
+        def record_save(line):
+            if 'checkpoint_saved' in line:
+                saved.set()
+
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                mock.patch.object(game, 'append_debug_log', side_effect=record_save):
+            worker = game.SimulationWorker(
+                game.LIST_ENGINE,
+                grid,
+                [[0] * 3 for _ in range(3)],
+                cycle_detector,
+                steps=10,
+                generation=7,
+                checkpoint_path=temp_dir + '/checkpoint.bin',
+            )
+            worker.toggle_pause()
+            worker.start()
+            worker.request_save()
+            self.assertTrue(saved.wait(5))
+            worker.stop()
+
+            header = game.read_checkpoint_header(worker.checkpoint_path)
+        self.assertIsNone(worker.error)
+        self.assertEqual(7, header.generation)
+        self.assertEqual(7, worker.generation)
+
+    def test_every_engine_reports_the_activity_of_each_generation(self):
+        cells = [(5, 6), (6, 7), (7, 5), (7, 6), (7, 7), (15, 20), (15, 21), (15, 22)]
+        engine_names = [
+            'list', 'bitboard', 'flat', 'sparse', 'sparse-unbounded', 'active', 'parallel'
+        ]
+        engine_names += ['numpy'] if game.np else []
+
+        for engine_name in engine_names:
+            engine = game.ENGINES[engine_name]
+            if engine_name == 'parallel':
+                engine = engine._replace(from_cells=functools.partial(
+                    game.shared_from_cells, workers=1, tile_rows=7
+                ))
+            current_grid = engine.from_cells(30, 40, cells)
+            future_grid = engine.from_cells(30, 40, ())
+            try:
+                self.assertEqual(
+                    game.Activity(8, 4, 4, 6, 5, 17, 22),
+                    engine.state_transition(current_grid, future_grid),
+                    engine_name,
+                )
+                for _ in range(12):
+                    previous_rows = [list(row) for row in engine.to_rows(future_grid)]
+                    activity = engine.state_transition(future_grid, current_grid)
+                    current_grid, future_grid = future_grid, current_grid
+                    self.assertEqual(
+                        game.rows_activity(engine.to_rows(future_grid), previous_rows),
+                        activity,
+                        engine_name,
+                    )
+                self.assertIsNone(
+                    engine.state_transition(future_grid, current_grid, count_activity=False)
+                )
+            finally:
+                game.release_grids(engine, current_grid, future_grid)
+
+    def test_flat_grids_match_list_grids_with_and_without_padding(self):
+        for with_border in (False, True):
+            grid = game.rand_init_grid(9, 13, with_border=with_border)
+            for padded in (True, False):
+                current_grid = game.flat_from_rows(grid, padded)
+                future_grid = game.flat_empty_grid(9, 13, padded)
+                expected = [row[:] for row in grid]
+                self.assertEqual(game.print_grid(expected), game.print_grid(current_grid))
+                for _ in range(20):
+                    next_rows = [[0] * 13 for _ in range(9)]
+                    expected_activity = game.state_transition(expected, next_rows, with_border)
+                    expected = next_rows
+                    activity = game.state_transition(current_grid, future_grid, with_border)
+                    current_grid, future_grid = future_grid, current_grid
+
+                    self.assertEqual(expected_activity, activity, (with_border, padded))
+                    self.assertEqual(expected, game.flat_to_rows(current_grid))
+                self.assertEqual(
+                    game.grid_signature(game.flat_from_rows(expected, padded)),
+                    game.grid_signature(current_grid),
+                )
+
+    def test_flat_grids_pack_like_bitboards_with_and_without_padding(self):
+        grid = game.rand_init_grid(9, 13)
+        packed = game.bitboard_to_packed(game.bitboard_from_rows(grid))
+        for padded in (True, False):
+            self.assertEqual(packed, game.flat_to_packed(game.flat_from_rows(grid, padded)))
+
+        unpacked = game.flat_from_packed(9, 13, memoryview(packed))
+
+        self.assertEqual(game.flat_from_rows(grid), unpacked)
+
+    def test_restart_grids_refills_list_and_flat_grids_in_place(self):
+        for engine_name in ('list', 'flat'):
+            engine = game.select_engine(
+                game.parse_cli_options(argv=['--engine', engine_name, '--density', '1'])
+            )
+            grids = engine.from_cells(4, 5, ()), engine.from_cells(4, 5, ())
+
+            with mock.patch.object(game, 'RESTART_DELAY_SECONDS', 0):
+                restarted = game.restart_grids(4, 5, engine, grids)
+
+            self.assertIs(grids[0], restarted[0])
+            self.assertIs(grids[1], restarted[1])
+            self.assertEqual([[1] * 5] * 4, engine.to_rows(restarted[0]), engine_name)
+
+    def test_engine_cycle_search_compares_only_rows_inside_the_bounding_boxes(self):
+        grid = [[0] * 12 for _ in range(12)]
+        for row_num, col_num in ((1, 2), (2, 3), (3, 1), (3, 2), (3, 3)):
+            grid[row_num][col_num] = 1
+        detectors = [game.CycleDetector(), game.CycleDetector()]
+        game.reset_cycle_detector(detectors[0], grid)
+        game.reset_engine_cycle_search(detectors[1], game.LIST_ENGINE, grid)
+
+        found = [[], []]
+        for _ in range(150):
+            future = [[0] * 12 for _ in range(12)]
+            activity = game.state_transition(grid, future)
+            grid = future
+            found[0].append(game.is_cycle(detectors[0], grid))
+            found[1].append(game.is_engine_cycle(detectors[1], game.LIST_ENGINE, grid, activity))
+
+        self.assertEqual(found[0], found[1])
+        self.assertIn(True, found[1])
+        self.assertEqual(detectors[0].state_hash, detectors[1].state_hash)
+
+        cycle_detector = game.CycleDetector()
+        game.reset_engine_cycle_search(cycle_detector, game.LIST_ENGINE, grid)
+        with mock.patch.object(game, 'is_cycle', wraps=game.is_cycle) as is_cycle:
+            _, _, activity = game.next_generation(
+                game.LIST_ENGINE, grid, [[0] * 12 for _ in range(12)], cycle_detector
+            )
+        self.assertIs(activity, is_cycle.call_args.args[2])
+        self.assertEqual(activity, cycle_detector.previous_activity)
+
+    def test_run_soup_reports_when_the_cycle_starts(self):
+        for engine_name in sorted(set(game.ENGINES) - {'sparse-unbounded'}):
+            if engine_name == 'numpy' and game.np is None:
+                continue
+            engine = game.select_engine(
+                game.parse_cli_options(argv=['--engine', engine_name, '--workers', '1'])
+            )
+            task = game.SoupTask(5, 8, 8, 500, engine)
+            game.random.seed(task.seed)
+            grids = engine.make_grids(task.num_rows, task.num_cols)
+            grid = [list(row) for row in engine.to_rows(grids[0])]
+            game.release_grids(engine, *grids)
+            first_seen = {}
+            while game.grid_signature(grid) not in first_seen:
+                first_seen[game.grid_signature(grid)] = len(first_seen)
+                future = [[0] * task.num_cols for _ in range(task.num_rows)]
+                game.state_transition(grid, future)
+                grid = future
+            lifespan = first_seen[game.grid_signature(grid)]
+
+            self.assertEqual(
+                {
+                    'seed': 5,
+                    'lifespan': lifespan,
+                    'period': len(first_seen) - lifespan,
+                    'population': sum(map(sum, grid)),
+                },
+                game.run_soup(task),
+                engine_name,
+            )
+            unsettled = game.run_soup(task._replace(max_generations=3))
+            self.assertEqual((3, 0), (unsettled['lifespan'], unsettled['period']), engine_name)
+
+    def test_soup_search_resumes_after_the_last_complete_result(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for results_path in (temp_dir + '/soups.jsonl', temp_dir + '/soups.csv'):
+                report = game.soup_search(game.BITBOARD_ENGINE, range(3), 8, 8, 200, results_path, 1)
+                with open(results_path, 'a') as results_file:
+                    results_file.write('{"seed": 3, "lif' if results_path.endswith('l') else '3,1')
+                resumed = game.soup_search(game.BITBOARD_ENGINE, range(5), 8, 8, 200, results_path, 1)
+
+                self.assertEqual((3, 0), (report['soups'], report['skipped']))
+                self.assertEqual((2, 3), (resumed['soups'], resumed['skipped']))
+                self.assertEqual(set(range(5)), game.read_soup_seeds(results_path))
+
+    def test_run_headless_reports_simulation_speed(self):
+        report = game.run_headless(argv=['--rows', '6', '--cols', '8', '--steps', '5', '--seed', '7'])
+
+        self.assertEqual((6, 8, 5, 7), (report['rows'], report['cols'], report['steps'], report['seed']))
+        self.assertAlmostEqual(
+            report['generations_per_second'] * 48,
+            report['cells_per_second'],
+        )
+        self.assertGreater(report['peak_rss_kb'], 0)
+
+    def test_seed_random_makes_grids_reproducible(self):
+        game.seed_random(11)
+        first_grid = game.make_grids(5, 5)[0]
+        game.seed_random(11)
+
+        self.assertEqual(first_grid, game.make_grids(5, 5)[0])
+
+    def test_random_bits_follow_density(self):
+        game.seed_random(5)
+
+        self.assertEqual(0, game.random_bits(64, 0))
+        self.assertEqual(2 ** 64 - 1, game.random_bits(64, 1))
+        self.assertAlmostEqual(0.25, bin(game.random_bits(100000, 0.25)).count('1') / 100000, places=2)
+
+    def test_density_reaches_every_engine(self):
+        for engine_name in sorted(game.ENGINES):
+            if engine_name == 'numpy' and game.np is None:
+                continue
+            engine = game.select_engine(
+                game.parse_cli_options(argv=['--engine', engine_name, '--workers', '1', '--density', '1'])
+            )
+            current_grid, future_grid = engine.make_grids(4, 5)
+            rows = [list(row) for row in engine.to_rows(current_grid)]
+            game.release_grids(engine, current_grid, future_grid)
+
+            self.assertEqual([[1] * 5] * 4, rows, engine_name)
+
+    def test_engine_window_rows_match_a_slice_of_every_engine(self):
+        cells = [(0, 1), (1, 2), (2, 0), (2, 1), (2, 2), (4, 5)]
+        window = game.GridWindow(1, 1, 4, 5)
+        expected = [row[1:5] for row in game.list_from_cells(5, 6, cells)[1:4]]
+        for engine_name in sorted(game.ENGINES):
+            if engine_name == 'numpy' and game.np is None:
+                continue
+            engine = game.select_engine(
+                game.parse_cli_options(argv=['--engine', engine_name, '--workers', '1'])
+            )
+            grid = engine.from_cells(5, 6, cells)
+            rows = game.engine_window_rows(engine, grid, window)
+            activity = game.engine_activity(engine, grid)
+            game.release_grids(engine, grid)
+
+            self.assertEqual(expected, rows, engine_name)
+            self.assertEqual(game.Activity(6, 0, 0, 0, 0, 5, 6), activity, engine_name)
+
     def test_should_exit_recognizes_supported_exit_keys(self):
         self.assertTrue(game.should_exit(ord('q')))
         self.assertTrue(game.should_exit(ord('Q')))
@@ -420,6 +1065,439 @@ class GameTests(unittest.TestCase):
 
         self.assertEqual(current, future)
 
+    @unittest.skipIf(game.np is None, 'NumPy is not installed')
+    def test_numpy_state_transition_matches_list_engine(self):
+        for with_border in (False, True):
+            current = game.rand_init_grid(9, 13, with_border=with_border)
+            future = [[0] * 13 for _ in range(9)]
+            numpy_future = game.np.zeros((9, 13), dtype=game.np.uint8)
+
+            game.state_transition(current, future, with_border=with_border)
+            game.numpy_state_transition(
+                game.np.array(current, dtype=game.np.uint8),
+                numpy_future,
+                with_border=with_border,
+            )
+
+            self.assertEqual(future, game.numpy_to_rows(numpy_future))
+
+    def test_bitboard_state_transition_matches_list_engine(self):
+        for with_border in (False, True):
+            current = game.rand_init_grid(9, 13, with_border=with_border)
+            future = [[0] * 13 for _ in range(9)]
+            bitboard_future = game.BitboardGrid(13, [0] * 9)
+
+            game.state_transition(current, future, with_border=with_border)
+            game.bitboard_state_transition(
+                game.bitboard_from_rows(current),
+                bitboard_future,
+                with_border=with_border,
+            )
+
+            self.assertEqual(future, game.bitboard_to_rows(bitboard_future))
+
+    def test_bitboard_grid_round_trips_rows(self):
+        grid = [[1, 0, 0], [0, 1, 1]]
+
+        bitboard = game.bitboard_from_rows(grid)
+
+        self.assertEqual([0b001, 0b110], bitboard.rows)
+        self.assertEqual(grid, game.bitboard_to_rows(bitboard))
+
+    def test_sparse_state_transition_matches_list_engine(self):
+        for with_border in (False, True):
+            current = game.rand_init_grid(9, 13, with_border=with_border)
+            future = [[0] * 13 for _ in range(9)]
+            sparse_future = game.SparseGrid(9, 13, set())
+
+            game.state_transition(current, future, with_border=with_border)
+            game.sparse_state_transition(
+                game.sparse_from_rows(current),
+                sparse_future,
+                with_border=with_border,
+            )
+
+            self.assertEqual(future, game.sparse_to_rows(sparse_future))
+
+    def test_sparse_state_transition_moves_glider_past_unbounded_window(self):
+        glider = {(0, 1), (1, 2), (2, 0), (2, 1), (2, 2)}
+        current_grid = game.SparseGrid(3, 3, set(glider), wrap=False)
+        future_grid = game.SparseGrid(3, 3, set(), wrap=False)
+
+        for _ in range(8):
+            game.sparse_state_transition(current_grid, future_grid)
+            current_grid, future_grid = future_grid, current_grid
+
+        self.assertEqual({(row + 2, col + 2) for row, col in glider}, current_grid.cells)
+
+    def test_hashlife_advance_matches_unbounded_sparse_engine(self):
+        grid = game.rand_init_grid(10, 12)
+        current_grid = game.sparse_from_rows(grid, wrap=False)
+        future_grid = game.SparseGrid(10, 12, set(), wrap=False)
+        for _ in range(37):
+            game.sparse_state_transition(current_grid, future_grid)
+            current_grid, future_grid = future_grid, current_grid
+
+        self.assertEqual(game.sparse_to_rows(current_grid), game.hashlife_advance(grid, 37))
+
+    def test_unbounded_sparse_engine_jumps_with_hashlife_under_its_rule(self):
+        grid = game.rand_init_grid(10, 12)
+        for rule_text in ('B3/S23', 'B36/S23'):
+            engine = game.select_engine(game.parse_cli_options(
+                argv=['--engine', 'sparse-unbounded', '--rule', rule_text]
+            ))
+            current_grid = game.sparse_from_rows(grid, wrap=False)
+            future_grid = game.SparseGrid(10, 12, set(), wrap=False)
+            for _ in range(37):
+                engine.state_transition(current_grid, future_grid)
+                current_grid, future_grid = future_grid, current_grid
+            jumped_grid = game.SparseGrid(10, 12, {(5, 5)}, wrap=False)
+
+            engine.step(game.sparse_from_rows(grid, wrap=False), jumped_grid, 37)
+
+            self.assertEqual(current_grid.cells, jumped_grid.cells, rule_text)
+
+    def test_step_generations_jumps_engines_with_a_step_hook_in_one_call(self):
+        grid, expected = glider_and_successor(8, 7)
+        engine = game.SPARSE_UNBOUNDED_ENGINE
+        current_grid = game.sparse_from_rows(grid, wrap=False)
+        cycle_detector = game.CycleDetector()
+        game.reset_engine_cycle_search(cycle_detector, engine, current_grid)
+
+        signature = mock.Mock(wraps=engine.signature)
+        step = mock.Mock(wraps=engine.step)
+
+        current_grid, _, advanced, activity = game.step_generations(
+            engine._replace(signature=signature, step=step),
+            current_grid,
+            game.SparseGrid(8, 8, set(), wrap=False),
+            7,
+            cycle_detector,
+        )
+
+        self.assertEqual(7, advanced)
+        self.assertEqual(expected, game.sparse_to_rows(current_grid))
+        self.assertEqual(game.rows_activity(expected)._replace(births=2, deaths=2), activity)
+        self.assertEqual(6, step.call_args.args[2])
+        self.assertEqual(1, signature.call_count)
+
+    def test_hashlife_collects_garbage_when_node_limit_is_exceeded(self):
+        grid = game.rand_init_grid(10, 12)
+        universe = game.HashLife(max_nodes=50)
+
+        advanced = universe.advance(grid, 37)
+
+        self.assertEqual(game.hashlife_advance(grid, 37), advanced)
+        self.assertGreater(universe.stats()['collections'], 0)
+
+    def test_hashlife_jumps_a_billion_generations(self):
+        glider = [[0, 1, 0], [0, 0, 1], [1, 1, 1]]
+        universe = game.HashLife()
+
+        node, top, left = universe.advance_node(
+            universe.node_from_rows(glider, 2), 0, 0, 10 ** 9
+        )
+        rows = [[0] * 3 for _ in range(3)]
+        universe.write_rows(node, top - 10 ** 9 // 4, left - 10 ** 9 // 4, rows)
+
+        self.assertEqual(glider, rows)
+        self.assertGreater(universe.stats()['cache_hits'], 0)
+
+    def test_active_state_transition_matches_list_engine(self):
+        for with_border in (False, True):
+            current = game.rand_init_grid(9, 13, with_border=with_border)
+            future = [[0] * 13 for _ in range(9)]
+            active_current = game.ActiveGrid([row[:] for row in current])
+            active_future = game.ActiveGrid([[0] * 13 for _ in range(9)])
+
+            for _ in range(12):
+                game.state_transition(current, future, with_border=with_border)
+                current, future = future, current
+                game.active_state_transition(active_current, active_future, with_border=with_border)
+                active_current, active_future = active_future, active_current
+
+                self.assertEqual(current, active_current.cells)
+
+    def test_active_state_transition_evaluates_only_changed_neighborhoods(self):
+        cells = [[0] * 10 for _ in range(10)]
+        cells[4][3:6] = [1, 1, 1]
+        current_grid = game.ActiveGrid(cells, changed_cells={(4, 3), (4, 5)})
+        future_grid = game.ActiveGrid([row[:] for row in cells])
+
+        game.active_state_transition(current_grid, future_grid)
+
+        self.assertEqual(15, game.active_stats(future_grid)['evaluated_cells'])
+        self.assertEqual({(3, 4), (5, 4), (4, 3), (4, 5)}, future_grid.changed_cells)
+
+    def test_shared_state_transition_matches_list_engine(self):
+        for workers, with_border in ((1, False), (1, True), (2, False), (2, True)):
+            current = game.rand_init_grid(9, 13, with_border=with_border)
+            future = [[0] * 13 for _ in range(9)]
+            shared_current = game.shared_from_rows(current, workers=workers, tile_rows=2)
+            shared_future = game.shared_from_rows(future, workers=workers, tile_rows=2)
+            self.addCleanup(game.shared_release, shared_current)
+            self.addCleanup(game.shared_release, shared_future)
+
+            game.state_transition(current, future, with_border=with_border)
+            game.shared_state_transition(shared_current, shared_future, with_border=with_border)
+
+            self.assertEqual(future, game.shared_to_rows(shared_future))
+
+    def test_row_bands_cover_every_row_once(self):
+        self.assertEqual([(0, 4), (4, 8), (8, 10)], game.row_bands(10, 4))
+
+    def test_select_engine_configures_parallel_workers_and_tile_rows(self):
+        engine = game.select_engine(
+            game.parse_cli_options(argv=['--engine', 'parallel', '--workers', '1', '--tile-rows', '3'])
+        )
+        current_grid, future_grid = engine.make_grids(5, 6)
+        game.release_grids(engine, current_grid, future_grid)
+
+        self.assertEqual((1, 3), (current_grid.workers, current_grid.tile_rows))
+
+    def test_read_pattern_cells_parses_rle_plaintext_and_life_106(self):
+        glider = {(0, 1), (1, 2), (2, 0), (2, 1), (2, 2)}
+        patterns = [
+            '#N Glider\nx = 3, y = 3, rule = B3/S23\nbob$2bo$\n3o!\n',
+            '!Name: Glider\n.O.\n..O\nOOO\n',
+            '#Life 1.06\n1 0\n2 1\n0 2\n1 2\n2 2\n',
+        ]
+
+        for pattern in patterns:
+            self.assertEqual(glider, set(game.read_pattern_cells(io.StringIO(pattern))))
+
+    def test_read_rle_cells_continues_runs_across_lines(self):
+        lines = iter(['x = 14, y = 2\n', '1\n', '2b2o$o!\n', 'ignored'])
+
+        self.assertEqual([(0, 12), (0, 13), (1, 0)], list(game.read_rle_cells(lines)))
+
+    def test_load_pattern_grids_places_pattern_in_every_engine(self):
+        expected = [[0] * 6 for _ in range(5)]
+        for row_num, col_num in ((4, 5), (4, 0), (0, 0), (1, 0), (1, 1), (1, 2)):
+            expected[row_num][col_num] = 1
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pattern_path = temp_dir + '/pattern.rle'
+            with open(pattern_path, 'w') as pattern_file:
+                pattern_file.write('x = 4, y = 3\n2o$bo$b3o!\n')
+
+            for engine_name in sorted(game.ENGINES):
+                if engine_name == 'numpy' and game.np is None:
+                    continue
+                engine = game.ENGINES[engine_name]
+                current_grid, future_grid = game.make_engine_grids(
+                    5, 6, engine, pattern_path, offset=(-1, -1),
+                )
+                self.addCleanup(game.release_grids, engine, current_grid, future_grid)
+
+                if engine_name == 'sparse-unbounded':
+                    self.assertEqual(
+                        {(-1, -1), (-1, 0), (0, 0), (1, 0), (1, 1), (1, 2)},
+                        current_grid.cells,
+                    )
+                else:
+                    self.assertEqual(expected, engine.to_rows(current_grid), engine_name)
+                self.assertEqual([[0] * 6 for _ in range(5)], engine.to_rows(future_grid))
+
+    def test_parse_cli_options_reads_pattern_and_offset(self):
+        options = game.parse_cli_options(argv=['--pattern', 'glider.rle', '--offset=-2,5'])
+
+        self.assertEqual(('glider.rle', (-2, 5)), (options.pattern, options.offset))
+
+    def test_checkpoint_round_trips_grid_and_header_for_every_engine(self):
+        grid = game.rand_init_grid(5, 13)
+        live_cells = [
+            (row_num, col_num)
+            for row_num, row in enumerate(grid)
+            for col_num, cell in enumerate(row)
+            if cell
+        ]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            checkpoint_path = temp_dir + '/game_checkpoint.bin'
+            for engine_name in sorted(game.ENGINES):
+                if engine_name == 'numpy' and game.np is None:
+                    continue
+                engine = game.ENGINES[engine_name]
+                saved_grid = engine.from_cells(5, 13, live_cells)
+                self.addCleanup(game.release_grids, engine, saved_grid)
+                cycle_detector = game.CycleDetector()
+                game.reset_cycle_detector(cycle_detector, grid)
+
+                game.save_checkpoint(checkpoint_path, engine, saved_grid, 5, 13, 42, 7, cycle_detector)
+                current_grid, future_grid = game.make_engine_grids(
+                    1, 1, engine, resume_path=checkpoint_path,
+                )
+                self.addCleanup(game.release_grids, engine, current_grid, future_grid)
+
+                self.assertEqual(grid, engine.to_rows(current_grid), engine_name)
+                self.assertEqual([[0] * 13 for _ in range(5)], engine.to_rows(future_grid))
+            header = game.read_checkpoint_header(checkpoint_path)
+
+        self.assertEqual((5, 13, 42, 7), header[:4])
+
+    def test_load_checkpoint_grids_reports_engine_errors(self):
+        engine = game.BITBOARD_ENGINE._replace(from_packed=mock.Mock(side_effect=KeyError('grid')))
+        with tempfile.TemporaryDirectory() as temp_dir:
+            checkpoint_path = temp_dir + '/game_checkpoint.bin'
+            game.save_checkpoint(
+                checkpoint_path, None, [[0, 1], [1, 0]], 2, 2, 0, None, game.CycleDetector()
+            )
+
+            with self.assertRaises(KeyError):
+                game.load_checkpoint_grids(checkpoint_path, engine)
+
+    def test_restore_cycle_detector_resumes_saved_search(self):
+        vertical = [[0, 1, 0], [0, 1, 0], [0, 1, 0]]
+        horizontal = [[0, 0, 0], [1, 1, 1], [0, 0, 0]]
+        cycle_detector = game.CycleDetector()
+        game.reset_engine_cycle_search(cycle_detector, game.LIST_ENGINE, vertical)
+        game.is_engine_cycle(cycle_detector, game.LIST_ENGINE, horizontal)
+        game.is_engine_cycle(cycle_detector, game.LIST_ENGINE, vertical)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            checkpoint_path = temp_dir + '/game_checkpoint.bin'
+            game.save_checkpoint(checkpoint_path, None, vertical, 3, 3, 2, None, cycle_detector)
+            resumed_detector = game.CycleDetector()
+            game.restore_cycle_detector(
+                resumed_detector, checkpoint_path, game.LIST_ENGINE, vertical
+            )
+            bitboard_detector = game.CycleDetector()
+            game.restore_cycle_detector(
+                bitboard_detector,
+                checkpoint_path,
+                game.BITBOARD_ENGINE,
+                game.bitboard_from_rows(vertical),
+            )
+            seed = game.read_checkpoint_header(checkpoint_path).seed
+
+        self.assertIsNone(seed)
+        self.assertEqual(cycle_detector, resumed_detector)
+        self.assertTrue(game.is_engine_cycle(resumed_detector, game.LIST_ENGINE, horizontal))
+        self.assertTrue(game.is_engine_cycle(
+            bitboard_detector, game.BITBOARD_ENGINE, game.bitboard_from_rows(horizontal)
+        ))
+
+    def test_parse_cli_options_rejects_seeds_that_checkpoints_cannot_store(self):
+        self.assertEqual(-2 ** 63, game.parse_cli_options(argv=['--seed', str(-2 ** 63)]).seed)
+        with self.assertRaises(SystemExit), mock.patch.object(sys, 'stderr', io.StringIO()):
+            game.parse_cli_options(argv=['--seed', str(2 ** 63)])
+
+    def test_read_checkpoint_header_rejects_other_files(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            checkpoint_path = temp_dir + '/game_checkpoint.bin'
+            with open(checkpoint_path, 'wb') as checkpoint_file:
+                checkpoint_file.write(b'x' * game.CHECKPOINT_HEADER.size)
+
+            with self.assertRaises(ValueError):
+                game.read_checkpoint_header(checkpoint_path)
+
+    def test_recording_plays_back_every_generation_from_any_start(self):
+        current = game.rand_init_grid(6, 11)
+        future = [[0] * 11 for _ in range(6)]
+        frames = []
+        with tempfile.TemporaryDirectory() as temp_dir:
+            recording_path = temp_dir + '/run.golrec'
+            recording = game.RecordingWriter(recording_path, 6, 11, keyframe_interval=3)
+            for _ in range(8):
+                frames.append(game.bitboard_to_packed(game.bitboard_from_rows(current)))
+                recording.write_frame(frames[-1])
+                game.state_transition(current, future)
+                current, future = future, current
+            recording.close()
+
+            reader = game.RecordingReader(recording_path)
+            self.addCleanup(reader.close)
+
+            self.assertEqual(8, reader.frame_count)
+            self.assertEqual([0, 3, 6], [generation for generation, _ in reader.keyframes])
+            self.assertEqual(frames, list(reader.frames()))
+            self.assertEqual(frames[5:], list(reader.frames(5)))
+            self.assertEqual([], list(reader.frames(8)))
+
+    def test_recording_reader_rebuilds_index_of_unclosed_recording(self):
+        packed_frames = [bytes([1, 0]), bytes([3, 0]), bytes([3, 1])]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            recording_path = temp_dir + '/run.golrec'
+            recording = game.RecordingWriter(recording_path, 2, 3, keyframe_interval=2)
+            self.addCleanup(recording.recording_file.close)
+            for packed in packed_frames:
+                recording.write_frame(packed)
+            recording.recording_file.flush()
+
+            reader = game.RecordingReader(recording_path)
+            self.addCleanup(reader.close)
+
+            self.assertEqual(3, reader.frame_count)
+            self.assertEqual(packed_frames[1:], list(reader.frames(1)))
+
+    def test_parse_rule_round_trips_b_s_notation(self):
+        rule = game.parse_rule('b36/s23')
+
+        self.assertEqual((frozenset({3, 6}), frozenset({2, 3})), (rule.birth, rule.survival))
+        self.assertEqual('B36/S23', game.format_rule(rule))
+        self.assertEqual(game.CONWAY_RULE, game.parse_rule(game.DEFAULT_RULE))
+        with self.assertRaises(ValueError):
+            game.parse_rule('B9/S23')
+
+    def test_every_engine_applies_the_selected_rule(self):
+        grid = game.rand_init_grid(9, 13)
+        live_cells = [
+            (row_num, col_num)
+            for row_num, row in enumerate(grid) for col_num, cell in enumerate(row) if cell
+        ]
+        for rule_text in ('B36/S23', 'B3678/S34678', 'B2/S', 'B1357/S02468', 'B0124/S3'):
+            rule = game.parse_rule(rule_text)
+            expected = [
+                [
+                    int(game.live_neighbor_count(row_num, col_num, grid)
+                        in (rule.survival if cell else rule.birth))
+                    for col_num, cell in enumerate(row)
+                ]
+                for row_num, row in enumerate(grid)
+            ]
+            for engine_name in sorted(game.ENGINES):
+                if (
+                    engine_name == 'sparse-unbounded'
+                    or engine_name == 'numpy' and game.np is None
+                    or engine_name == 'sparse' and 0 in rule.birth
+                ):
+                    continue
+                engine = game.select_engine(game.parse_cli_options(
+                    argv=['--engine', engine_name, '--workers', '1', '--rule', rule_text]
+                ))
+                current_grid = engine.from_cells(9, 13, live_cells)
+                future_grid = engine.from_cells(9, 13, [])
+                self.addCleanup(game.release_grids, engine, current_grid, future_grid)
+
+                engine.state_transition(current_grid, future_grid)
+
+                self.assertEqual(expected, engine.to_rows(future_grid), (rule_text, engine_name))
+
+    def test_hashlife_and_sparse_engines_run_rules_without_b0_only(self):
+        highlife = game.parse_rule('B36/S23')
+        grid = game.rand_init_grid(10, 12)
+        current_grid = game.sparse_from_rows(grid, wrap=False)
+        future_grid = game.SparseGrid(10, 12, set(), wrap=False)
+        for _ in range(20):
+            game.sparse_state_transition(current_grid, future_grid, rule=highlife)
+            current_grid, future_grid = future_grid, current_grid
+
+        self.assertEqual(
+            game.sparse_to_rows(current_grid), game.hashlife_advance(grid, 20, rule=highlife)
+        )
+        with self.assertRaises(ValueError):
+            game.HashLife(rule=game.parse_rule('B03/S23'))
+        with self.assertRaises(SystemExit), mock.patch.object(sys, 'stderr', io.StringIO()):
+            game.parse_cli_options(argv=['--engine', 'sparse', '--rule', 'B0/S8'])
+
+    def test_parse_engine_normalizes_case(self):
+        self.assertEqual('list', game.parse_engine('List'))
+
+    def test_parse_engine_rejects_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            game.parse_engine('gpu')
+
+    def test_parse_cli_options_defaults_to_list_engine(self):
+        self.assertEqual(game.DEFAULT_ENGINE, game.parse_cli_options(argv=[]).engine)
+
 
 if __name__ == '__main__':
     unittest.main()